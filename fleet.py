@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""AI Video Call Assistant - Fleet entry point for running many meetings."""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from src.meeting.browser_pool import BrowserPool
+from src.meeting.fleet import FleetMeeting, FleetOrchestrator, print_fleet_status
+from src.meeting.ipc_commands import FLEET_SOCKET, IPCCommands
+from utils import is_valid_meeting_code
+
+
+def parse_start_time(start_at: Optional[str]) -> Optional[float]:
+    """Convert an ISO 8601 start time from the schedule to Unix time."""
+    if not start_at:
+        return None
+    return datetime.fromisoformat(start_at).timestamp()
+
+
+def load_meetings(args: argparse.Namespace) -> List[FleetMeeting]:
+    """Build the meeting list from meeting codes and the schedule file."""
+    entries = [{"meeting_code": code} for code in args.meeting_codes]
+    if args.schedule:
+        with open(args.schedule, "r", encoding="utf-8") as f:
+            entries.extend(json.load(f))
+
+    meetings = []
+    for entry in entries:
+        if not is_valid_meeting_code(entry["meeting_code"]):
+            print(f"Invalid meeting code format: {entry['meeting_code']}")
+            sys.exit(1)
+        meetings.append(
+            FleetMeeting(
+                entry["meeting_code"],
+                start_at=parse_start_time(entry.get("start_at")),
+                mic_device=entry.get("mic_device"),
+                speaker_device=entry.get("speaker_device"),
+            )
+        )
+    return meetings
+
+
+def main() -> None:
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Run the AI Video Call Assistant in many Google Meets at once"
+    )
+    parser.add_argument(
+        "meeting_codes", nargs="*", help="Google Meet codes in format: xxx-xxxx-xxx"
+    )
+    parser.add_argument(
+        "--schedule",
+        help="JSON list of meetings with meeting_code and optional start_at "
+        "(ISO 8601), mic_device and speaker_device",
+    )
+    parser.add_argument(
+        "--check-interval", type=float, default=10.0, help="Seconds between checks"
+    )
+    parser.add_argument(
+        "--max-restarts", type=int, default=3, help="Restarts per component"
+    )
+    parser.add_argument(
+        "--browser-pool",
+        type=int,
+        default=0,
+        help="Keep this many warm, logged-in browsers to join from (0 = off)",
+    )
+    parser.add_argument(
+        "--status", action="store_true", help="Print the running fleet's status"
+    )
+    args = parser.parse_args()
+
+    if args.status:
+        response = IPCCommands(socket_path=FLEET_SOCKET).request("status")
+        if not response.get("ok"):
+            print(f"Fleet not reachable: {response.get('result')}")
+            sys.exit(1)
+        print_fleet_status(response["result"])
+        return
+
+    meetings = load_meetings(args)
+    if not meetings:
+        parser.error("give at least one meeting code or a --schedule")
+
+    browser_pool = None
+    if args.browser_pool > 0:
+        browser_pool = BrowserPool(
+            size=args.browser_pool, keep_warm=min(args.browser_pool, len(meetings))
+        )
+        browser_pool.start()
+
+    FleetOrchestrator(
+        meetings,
+        check_interval=args.check_interval,
+        max_restarts=args.max_restarts,
+        browser_pool=browser_pool,
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
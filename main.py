@@ -1,22 +1,33 @@
 #!/usr/bin/env python3
 """AI Video Call Assistant - Main Entry Point."""
 
-from utils import parse_meeting_code, restart_application, run_assistant
+from utils import (
+    create_browser_pool,
+    parse_meeting_code,
+    restart_application,
+    run_assistant,
+)
 
 
 def main() -> None:
     """Main entry point."""
     meeting_code = parse_meeting_code()
+    browser_pool = create_browser_pool()
 
     # Run the assistant in a loop to handle restarts
     while True:
-        result = run_assistant(meeting_code)
+        result = run_assistant(meeting_code, browser_pool)
 
         if result == "restart":
-            restart_application(meeting_code)
+            # With a browser pool, restart in-process to reuse the warm browser
+            if browser_pool is None:
+                restart_application(meeting_code)
         elif result == "quit":
             break
 
+    if browser_pool is not None:
+        browser_pool.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,155 @@
+"""Long-lived voice agent daemon that meetings attach to and detach from.
+
+The daemon keeps the AgentSession (models, STT/TTS connections, VAD) warm
+between meetings. A control socket accepts ``attach``/``detach`` requests
+from the Selenium process; while detached, the session stays started but
+its audio input and output are switched off.
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from livekit.agents import AgentSession
+from livekit.agents.llm import ChatContext
+
+from src.meeting.ipc_commands import AGENT_DAEMON_SOCKET, AsyncIPCClient, IPCCommands
+
+
+class AgentDaemon:
+    """Hands a warm AgentSession to one meeting at a time."""
+
+    def __init__(
+        self,
+        session: AgentSession,
+        agent: Any,
+        meeting_client: AsyncIPCClient,
+        socket_path: Optional[str] = None,
+    ) -> None:
+        """Initialize the daemon.
+
+        Args:
+            session: Started AgentSession to hand to meetings.
+            agent: The VoiceAgent running in the session.
+            meeting_client: IPC client the agent uses to control the meeting.
+            socket_path: Control socket path, defaults to GROQUETTE_AGENT_SOCKET.
+        """
+        self.session = session
+        self.agent = agent
+        self.meeting_client = meeting_client
+        self.socket_path = socket_path or AGENT_DAEMON_SOCKET
+        self.meeting_url: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped = asyncio.Event()
+
+    async def run(self) -> None:
+        """Serve attach/detach requests until a shutdown request arrives."""
+        self._loop = asyncio.get_running_loop()
+        self._set_audio_enabled(False)
+
+        control = IPCCommands(socket_path=self.socket_path, serve=True)
+        thread = threading.Thread(
+            target=self._serve_control, args=(control,), daemon=True
+        )
+        thread.start()
+        print(f"🔥 Voice agent warm, waiting for meetings on {self.socket_path}")
+
+        try:
+            await self._stopped.wait()
+        finally:
+            control.close()
+
+    def _serve_control(self, control: IPCCommands) -> None:
+        """Answer control commands from the Selenium process."""
+        while not self._stopped.is_set():
+            try:
+                cmd_data = control.check_for_command(timeout=1.0)
+            except Exception as e:
+                print(f"Error in agent control handler: {e}")
+                break
+            if not cmd_data:
+                continue
+
+            future = asyncio.run_coroutine_threadsafe(
+                self.handle_command(cmd_data.get("command"), cmd_data["params"]),
+                self._loop,
+            )
+            try:
+                result, ok = future.result(timeout=30)
+            except Exception as e:
+                result, ok = f"Command failed: {e}", False
+            control.send_response(result, cmd_data.get("id"), ok)
+
+    async def handle_command(
+        self, command: str, params: Dict[str, Any]
+    ) -> Tuple[str, bool]:
+        """Run a control command, returning (result, ok)."""
+        if command == "ping":
+            return "pong", True
+        if command == "attach":
+            unsupported = self._unsupported_attach_params(params)
+            if unsupported:
+                # The console session is bound to the system audio devices
+                return (
+                    f"{', '.join(unsupported)} need the multi-meeting worker",
+                    False,
+                )
+            return await self.attach(params), True
+        if command == "detach":
+            return await self.detach(), True
+        if command == "shutdown":
+            await self.detach()
+            self._stopped.set()
+            return "Shutting down", True
+        return "Unknown command", False
+
+    @staticmethod
+    def _unsupported_attach_params(params: Dict[str, Any]) -> List[str]:
+        """Return the attach parameters this daemon cannot honor."""
+        unsupported = [
+            name for name in ("input_device", "output_device") if params.get(name)
+        ]
+        if params.get("audio_transport", "device") != "device":
+            unsupported.append("audio_transport")
+        return unsupported
+
+    async def attach(self, params: Dict[str, Any]) -> str:
+        """Start talking in a meeting."""
+        if self.meeting_url is not None:
+            await self.detach()
+
+        self.meeting_url = params.get("meeting_url")
+        if params.get("ipc_socket"):
+            await self.meeting_client.retarget(params["ipc_socket"])
+
+        self._set_audio_enabled(True)
+        print(f"📞 Voice agent attached to {self.meeting_url}")
+
+        if not await self.meeting_client.subscribe_state():
+            print("⚠️ Meeting state mirror unavailable, using local mute state")
+
+        self.session.generate_reply()
+        return f"Attached to {self.meeting_url}"
+
+    async def detach(self) -> str:
+        """Leave the current meeting but keep the session and models warm."""
+        if self.meeting_url is None:
+            return "Not attached"
+
+        print(f"👋 Voice agent detached from {self.meeting_url}")
+        self.meeting_url = None
+        try:
+            await self.session.interrupt()
+        except Exception as e:
+            print(f"⚠️ Could not interrupt speech: {e}")
+        self._set_audio_enabled(False)
+
+        # The next meeting starts a fresh conversation
+        await self.agent.update_chat_ctx(ChatContext())
+        self.agent.is_muted = False
+        return "Detached"
+
+    def _set_audio_enabled(self, enabled: bool) -> None:
+        """Switch the session's microphone input and speaker output."""
+        self.session.input.set_audio_enabled(enabled)
+        self.session.output.set_audio_enabled(enabled)
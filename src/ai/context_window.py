@@ -0,0 +1,126 @@
+"""Token-budgeted conversation window with a rolling summary of older turns."""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# (chat item id, converted Groq message)
+ConvertedMessage = Tuple[str, Dict[str, str]]
+
+Summarizer = Callable[[str, List[Dict[str, str]]], Awaitable[str]]
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+# Rough per-message overhead for role and formatting tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(message: Dict[str, str]) -> int:
+    """Estimate the token count of a message (~4 characters per token)."""
+    return len(message["content"]) // 4 + MESSAGE_OVERHEAD_TOKENS
+
+
+class ContextWindow:
+    """Keeps the prompt within a token budget.
+
+    The system prompt and the last ``keep_turns`` user turns are sent verbatim.
+    Older turns are folded into a summary that is refreshed in a background
+    task, so a turn never waits on summarization; until the summary catches
+    up, unsummarized older messages are sent as long as they fit the budget.
+    """
+
+    def __init__(
+        self,
+        summarize: Summarizer,
+        token_budget: int = 6000,
+        keep_turns: int = 6,
+    ) -> None:
+        """Initialize the context window.
+
+        Args:
+            summarize: Coroutine taking the previous summary and the messages to
+                fold in, returning the updated summary.
+            token_budget: Maximum estimated prompt tokens sent per request.
+            keep_turns: Number of most recent user turns kept verbatim.
+        """
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self.keep_turns = keep_turns
+        self.summary = ""
+        self._summarized_ids: Set[str] = set()
+        self._summary_task: Optional["asyncio.Task[None]"] = None
+
+    def build(self, messages: List[ConvertedMessage]) -> List[Dict[str, str]]:
+        """Return the messages to send for this turn."""
+        system = [message for _, message in messages if message["role"] == "system"]
+        conversation = [item for item in messages if item[1]["role"] != "system"]
+
+        split = self._recent_start(conversation)
+        older, recent = conversation[:split], conversation[split:]
+
+        pending = [item for item in older if item[0] not in self._summarized_ids]
+        if pending:
+            self._schedule_summary(pending)
+
+        prefix = list(system)
+        if self.summary:
+            prefix.append({"role": "system", "content": SUMMARY_PREFIX + self.summary})
+
+        recent_messages = [message for _, message in recent]
+        budget = self.token_budget - sum(estimate_tokens(m) for m in prefix)
+
+        # Drop the oldest recent messages if even those overflow, but always
+        # keep the latest message so there is something to answer
+        while len(recent_messages) > 1 and _total_tokens(recent_messages) > budget:
+            recent_messages.pop(0)
+        budget -= _total_tokens(recent_messages)
+
+        backfill: List[Dict[str, str]] = []
+        for _, message in reversed(pending):
+            cost = estimate_tokens(message)
+            if cost > budget:
+                break
+            backfill.insert(0, message)
+            budget -= cost
+
+        return prefix + backfill + recent_messages
+
+    def _recent_start(self, conversation: List[ConvertedMessage]) -> int:
+        """Return the index where the last ``keep_turns`` user turns begin."""
+        turns = 0
+        for index in range(len(conversation) - 1, -1, -1):
+            if conversation[index][1]["role"] == "user":
+                turns += 1
+                if turns == self.keep_turns:
+                    return index
+        return 0
+
+    def _schedule_summary(self, pending: List[ConvertedMessage]) -> None:
+        """Fold pending messages into the summary off the hot path."""
+        if self._summary_task is not None and not self._summary_task.done():
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        self._summary_task = loop.create_task(self._update_summary(pending))
+
+    async def _update_summary(self, pending: List[ConvertedMessage]) -> None:
+        """Update the rolling summary with newly evicted messages."""
+        try:
+            summary = await self.summarize(
+                self.summary, [message for _, message in pending]
+            )
+        except Exception as e:
+            print(f"[ERROR] Context summarization failed: {e}")
+            return
+
+        if summary.strip():
+            self.summary = summary.strip()
+            self._summarized_ids.update(item_id for item_id, _ in pending)
+
+
+def _total_tokens(messages: List[Dict[str, str]]) -> int:
+    """Sum the estimated tokens of a message list."""
+    return sum(estimate_tokens(message) for message in messages)
@@ -0,0 +1,76 @@
+"""Local fast-path matcher for meeting-control voice commands."""
+
+import re
+from typing import Dict, List, Optional, Pattern
+
+# Ways STT tends to spell the agent's name
+WAKE_WORD_PATTERN = re.compile(
+    r"\b(groquette|grocket|groket|gro-ket|croquette|croquet)\b", re.IGNORECASE
+)
+
+NEGATION_PATTERN = re.compile(
+    r"\b(don'?t|do not|never|not|no need|stop|shouldn'?t|wait)\b", re.IGNORECASE
+)
+
+# Each pattern must describe the whole command, so chatter around it falls back
+# to the LLM
+INTENT_PATTERNS: Dict[str, List[Pattern[str]]] = {
+    "mute_microphone": [
+        re.compile(
+            r"^(please )?(mute|silence)( yourself| your (mic|microphone))?( please)?$"
+        ),
+        re.compile(r"^(please )?go (on )?mute( please)?$"),
+    ],
+    "unmute_microphone": [
+        re.compile(r"^(please )?unmute( yourself| your (mic|microphone))?( please)?$"),
+    ],
+    "leave_meeting": [
+        re.compile(
+            r"^(please )?(leave|exit|drop off|hang up)( from)?( the)?"
+            r"( call| meeting)?( now)?( please)?$"
+        ),
+    ],
+}
+
+
+class IntentRouter:
+    """Matches short control commands on the final transcript without the LLM."""
+
+    def __init__(self, require_address: bool = True) -> None:
+        """Initialize the router.
+
+        Args:
+            require_address: Only match when the transcript names the agent.
+        """
+        self.require_address = require_address
+
+    def match(self, transcript: str) -> Optional[str]:
+        """Return the function tool name for a transcript, or None to use the LLM.
+
+        Args:
+            transcript: Final STT transcript of the user's turn.
+
+        Returns:
+            Name of the matching meeting-control tool, or None when the
+            transcript is not addressed to the agent or is ambiguous.
+        """
+        if self.require_address and not WAKE_WORD_PATTERN.search(transcript):
+            return None
+        if NEGATION_PATTERN.search(transcript):
+            return None
+
+        command = self._normalize(transcript)
+        matches = [
+            intent
+            for intent, patterns in INTENT_PATTERNS.items()
+            if any(pattern.match(command) for pattern in patterns)
+        ]
+
+        return matches[0] if len(matches) == 1 else None
+
+    def _normalize(self, transcript: str) -> str:
+        """Strip the wake word, greetings and punctuation from a transcript."""
+        text = WAKE_WORD_PATTERN.sub(" ", transcript.lower())
+        text = re.sub(r"[^\w\s'-]", " ", text)
+        text = re.sub(r"^\s*(hey|hi|ok|okay|so)\b", " ", text)
+        return " ".join(text.split())
@@ -1,14 +1,119 @@
 """Custom LLM component for voice agent using Groq's compound-beta model."""
 
+import hashlib
+import json
 import os
-from typing import Any, Dict, List, Optional
+import re
+import sys
+import time
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 from livekit.agents.llm import ChatChunk, ChatContext, ChoiceDelta, LLM, LLMStream
 from livekit.agents.types import DEFAULT_API_CONNECT_OPTIONS
 
+# Add the project root to the path when running as a standalone script
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai.context_window import ContextWindow, ConvertedMessage  # noqa: E402
+
 load_dotenv()
 
+# Keep-alive pool for the Groq HTTP client, sized for a single meeting's turns
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE_CONNECTIONS = 5
+KEEPALIVE_EXPIRY = 60.0
+
+# Phrases that mean the user wants fresh information, so cached answers are stale
+FRESH_SEARCH_PATTERN = re.compile(
+    r"\b(latest|today|tonight|tomorrow|yesterday|now|current(ly)?|news|"
+    r"weather|price|stock|score|search|look up|this week)\b",
+    re.IGNORECASE,
+)
+
+SUMMARY_INSTRUCTIONS = (
+    "You maintain a running summary of a meeting conversation for an AI "
+    "facilitator. Merge the new messages into the existing summary. Keep names, "
+    "decisions, open questions and who has presented. Reply with the updated "
+    "summary only, in at most 150 words."
+)
+
+ERROR_RESPONSE = (
+    "I apologize, but I encountered an error processing your request. "
+    "Please try again."
+)
+
+
+class ResponseCache:
+    """In-process LRU/TTL cache of completed responses keyed on the conversation."""
+
+    def __init__(self, max_entries: int = 128, ttl: float = 600.0) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of responses kept before LRU eviction.
+            ttl: Seconds a cached response stays valid.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, str, Optional[Any]]]" = (
+            OrderedDict()
+        )
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict[str, str]]) -> str:
+        """Hash the normalized message list together with the model name."""
+        normalized = [
+            [
+                message["role"],
+                re.sub(r"[^\w\s]", "", " ".join(message["content"].lower().split())),
+            ]
+            for message in messages
+        ]
+        payload = json.dumps([model, normalized], separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def needs_fresh_search(messages: List[Dict[str, str]]) -> bool:
+        """Check whether the latest user turn asks for up-to-date information."""
+        for message in reversed(messages):
+            if message["role"] == "user":
+                return bool(FRESH_SEARCH_PATTERN.search(message["content"]))
+        return False
+
+    def get(self, key: str) -> Optional[Tuple[str, Optional[Any]]]:
+        """Return the cached (content, executed_tools) for a key, if still fresh."""
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    def put(self, key: str, content: str, executed_tools: Optional[Any]) -> None:
+        """Store a completed response, evicting the least recently used entries."""
+        if not content.strip():
+            return
+
+        self._entries[key] = (time.monotonic(), content, executed_tools)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
 
 class CustomGroqLLM(LLM):
     """Custom Groq LLM that extracts executed_tools from compound-beta responses."""
@@ -18,25 +123,86 @@ class CustomGroqLLM(LLM):
         model: str = "compound-beta",
         api_key: Optional[str] = None,
         room: Any = None,
+        streaming: bool = True,
+        response_cache: Optional[ResponseCache] = None,
+        token_budget: int = 6000,
+        keep_turns: int = 6,
+        summary_model: str = "llama-3.1-8b-instant",
     ) -> None:
-        """Initialize the CustomGroqLLM instance."""
+        """Initialize the CustomGroqLLM instance.
+
+        Args:
+            model: Groq model name.
+            api_key: Groq API key, defaults to GROQ_API_KEY from the environment.
+            room: Optional LiveKit room the LLM is attached to.
+            streaming: Emit one chunk per Groq delta instead of waiting for the
+                full completion, so TTS can start on the first sentence.
+            response_cache: Optional cache for repeated prompts. Pass
+                ``bypass_cache=True`` to chat() to force a live request.
+            token_budget: Maximum estimated prompt tokens sent per request.
+            keep_turns: Number of most recent user turns sent verbatim; older
+                turns are folded into a rolling summary.
+            summary_model: Groq model used to update the rolling summary.
+        """
         super().__init__()
-        self.model = model
+        self._model = model
         self.api_key = api_key or os.getenv("GROQ_API_KEY")
         self.room = room
+        self.streaming = streaming
+        self.response_cache = response_cache
+        self.summary_model = summary_model
+        self.context_window = ContextWindow(
+            self._summarize, token_budget=token_budget, keep_turns=keep_turns
+        )
+        self._converted: Dict[str, Optional[Dict[str, str]]] = {}
+        self._client: Optional[Any] = None
 
         if not self.api_key:
             raise ValueError("GROQ_API_KEY not found in environment variables")
 
-        try:
-            from groq import Groq
+    @property
+    def model(self) -> str:
+        """Groq model name."""
+        return self._model
+
+    @property
+    def client(self) -> Any:
+        """Pooled AsyncGroq client, created on first use.
 
-            self._client = Groq(api_key=self.api_key)
+        The HTTP pool binds to the event loop it is first used on, so it is
+        not created before a loop is running.
+        """
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self) -> Any:
+        """Build an AsyncGroq client with keep-alive connections."""
+        try:
+            import httpx
+            from groq import AsyncGroq
+
+            return AsyncGroq(
+                api_key=self.api_key,
+                http_client=httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=MAX_CONNECTIONS,
+                        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                        keepalive_expiry=KEEPALIVE_EXPIRY,
+                    ),
+                ),
+            )
         except ImportError:
             raise ImportError(
                 "groq package is required. Install with: pip install groq"
             )
 
+    async def aclose(self) -> None:
+        """Close the pooled Groq HTTP connections."""
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
     def chat(
         self,
         *,
@@ -50,18 +216,28 @@ class CustomGroqLLM(LLM):
         return ChatContextManager(self, chat_ctx, conn_options, fnc_ctx, tools, kwargs)
 
     def _convert_messages(self, chat_ctx: ChatContext) -> List[Dict[str, str]]:
-        """Convert ChatContext items to Groq format, filtering out empty messages."""
-        messages = []
+        """Convert ChatContext items to Groq format, filtering out empty messages.
+
+        Conversions are cached per chat item id, so only items added since the
+        previous turn are extracted, and the result is trimmed to the token
+        budget by the context window.
+        """
+        converted: List[ConvertedMessage] = []
+        previous = self._converted
+        self._converted = {}
 
         for message in chat_ctx.items:
-            if not (hasattr(message, "role") and hasattr(message, "content")):
-                continue
+            item_id = str(getattr(message, "id", None) or id(message))
+            if item_id in previous:
+                groq_message = previous[item_id]
+            else:
+                groq_message = self._convert_message(message)
+            self._converted[item_id] = groq_message
 
-            content = self._extract_content(message.content)
-            if not content.strip():
-                continue
+            if groq_message is not None:
+                converted.append((item_id, groq_message))
 
-            messages.append({"role": str(message.role), "content": content})
+        messages = self.context_window.build(converted)
 
         # Compound-beta requires the last message to be from user role
         if self.model == "compound-beta" and messages:
@@ -75,6 +251,37 @@ class CustomGroqLLM(LLM):
 
         return messages
 
+    def _convert_message(self, message: Any) -> Optional[Dict[str, str]]:
+        """Convert a single chat item, returning None if it carries no text."""
+        if not (hasattr(message, "role") and hasattr(message, "content")):
+            return None
+
+        content = self._extract_content(message.content)
+        if not content.strip():
+            return None
+
+        return {"role": str(message.role), "content": content}
+
+    async def _summarize(self, summary: str, messages: List[Dict[str, str]]) -> str:
+        """Fold messages into the rolling conversation summary."""
+        transcript = "\n".join(
+            f"{message['role']}: {message['content']}" for message in messages
+        )
+        response = await self.client.chat.completions.create(
+            model=self.summary_model,
+            messages=[
+                {"role": "system", "content": SUMMARY_INSTRUCTIONS},
+                {
+                    "role": "user",
+                    "content": f"Existing summary:\n{summary or '(none)'}\n\n"
+                    f"New messages:\n{transcript}",
+                },
+            ],
+            max_tokens=300,
+            stream=False,
+        )
+        return response.choices[0].message.content or ""
+
     def _extract_content(self, content_obj: Any) -> str:
         """Extract text content from various content object types."""
         if isinstance(content_obj, str):
@@ -116,9 +323,29 @@ class ChatContextManager:
         """Enter the async context manager."""
         messages = self.llm._convert_messages(self.chat_ctx)
         request_id = "unknown_request_id"
+        cache_key = self._lookup_cache_key(messages)
+
+        self.stream = self._serve_from_cache(cache_key)
+        if self.stream is not None:
+            return self.stream
+
+        on_complete = partial(self._store_in_cache, cache_key) if cache_key else None
 
         try:
-            response = self.llm._client.chat.completions.create(
+            if self.llm.streaming:
+                response_stream = await self.llm.client.chat.completions.create(
+                    model=self.llm.model,
+                    messages=messages,
+                    stream=True,
+                )
+                self.stream = self._create_stream(
+                    request_id,
+                    response_stream=response_stream,
+                    on_complete=on_complete,
+                )
+                return self.stream
+
+            response = await self.llm.client.chat.completions.create(
                 model=self.llm.model,
                 messages=messages,
                 stream=False,
@@ -129,71 +356,119 @@ class ChatContextManager:
             executed_tools = getattr(choice.message, "executed_tools", None)
 
             if executed_tools:
-                search_results = self._extract_search_results(executed_tools)
+                search_results = _extract_search_results(executed_tools)
                 if search_results:
                     print(f"[DEBUG] Extracted {len(search_results)} search results")
 
-            self.stream = CustomGroqLLMStream(
-                llm=self.llm,
-                chat_ctx=self.chat_ctx,
-                fnc_ctx=self.fnc_ctx,
-                conn_options=self.conn_options,
-                request_id=request_id,
+            if on_complete is not None:
+                on_complete(choice.message.content or "", executed_tools)
+
+            self.stream = self._create_stream(
+                request_id,
                 content=choice.message.content,
                 executed_tools=executed_tools,
-                tools=self.tools,
             )
             return self.stream
 
         except Exception as e:
             print(f"[ERROR] Groq API call failed: {e}")
-            self.stream = CustomGroqLLMStream(
-                llm=self.llm,
-                chat_ctx=self.chat_ctx,
-                fnc_ctx=self.fnc_ctx,
-                conn_options=self.conn_options,
-                request_id=request_id,
-                content="I apologize, but I encountered an error processing your request. Please try again.",
-                executed_tools=None,
-                tools=self.tools,
-            )
+            self.stream = self._create_stream(request_id, content=ERROR_RESPONSE)
             return self.stream
 
+    def _serve_from_cache(
+        self, cache_key: Optional[str]
+    ) -> Optional["CustomGroqLLMStream"]:
+        """Return a stream replaying a cached response, or None on a miss."""
+        if cache_key is None:
+            return None
+        cached = self.llm.response_cache.get(cache_key)
+        if cached is None:
+            return None
+        print("[DEBUG] Serving response from cache")
+        content, executed_tools = cached
+        return self._create_stream(
+            f"cached_{cache_key[:12]}",
+            content=content,
+            executed_tools=executed_tools,
+        )
+
+    def _lookup_cache_key(self, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Return the cache key for this request, or None if the cache is bypassed."""
+        cache = self.llm.response_cache
+        if cache is None or self.kwargs.get("bypass_cache"):
+            return None
+        if ResponseCache.needs_fresh_search(messages):
+            return None
+        return ResponseCache.make_key(self.llm.model, messages)
+
+    def _store_in_cache(
+        self, cache_key: str, content: str, executed_tools: Optional[Any]
+    ) -> None:
+        """Cache a finished response unless it relied on live web search."""
+        if executed_tools and _extract_search_results(executed_tools):
+            return
+        self.llm.response_cache.put(cache_key, content, executed_tools)
+
+    def _create_stream(
+        self,
+        request_id: str,
+        content: Optional[str] = None,
+        executed_tools: Optional[Any] = None,
+        response_stream: Optional[AsyncIterator[Any]] = None,
+        on_complete: Optional[Callable[[str, Optional[Any]], None]] = None,
+    ) -> "CustomGroqLLMStream":
+        """Build a CustomGroqLLMStream bound to this chat request."""
+        return CustomGroqLLMStream(
+            llm=self.llm,
+            chat_ctx=self.chat_ctx,
+            fnc_ctx=self.fnc_ctx,
+            conn_options=self.conn_options,
+            request_id=request_id,
+            content=content,
+            executed_tools=executed_tools,
+            tools=self.tools,
+            response_stream=response_stream,
+            on_complete=on_complete,
+        )
+
     async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Exit the async context manager."""
         pass
 
-    def _extract_search_results(self, executed_tools: Any) -> List[Dict[str, Any]]:
-        """Extract search results from executed tools."""
-        results = []
-        try:
-            for tool in executed_tools:
-                if (
-                    hasattr(tool, "type")
-                    and tool.type == "search"
-                    and hasattr(tool, "search_results")
-                    and tool.search_results
-                    and hasattr(tool.search_results, "results")
-                ):
-                    for result in tool.search_results.results:
-                        if all(
-                            hasattr(result, attr) for attr in ["title", "url", "score"]
-                        ):
-                            results.append(
-                                {
-                                    "title": result.title,
-                                    "url": result.url,
-                                    "score": result.score,
-                                }
-                            )
-        except Exception as e:
-            print(f"[ERROR] Error extracting search results: {e}")
 
-        return results
+def _extract_search_results(executed_tools: Any) -> List[Dict[str, Any]]:
+    """Extract search results from executed tools."""
+    results = []
+    try:
+        for tool in executed_tools:
+            if (
+                hasattr(tool, "type")
+                and tool.type == "search"
+                and hasattr(tool, "search_results")
+                and tool.search_results
+                and hasattr(tool.search_results, "results")
+            ):
+                for result in tool.search_results.results:
+                    if all(hasattr(result, attr) for attr in ["title", "url", "score"]):
+                        results.append(
+                            {
+                                "title": result.title,
+                                "url": result.url,
+                                "score": result.score,
+                            }
+                        )
+    except Exception as e:
+        print(f"[ERROR] Error extracting search results: {e}")
+
+    return results
 
 
 class CustomGroqLLMStream(LLMStream):
-    """Custom stream implementation for our Groq LLM."""
+    """Custom stream implementation for our Groq LLM.
+
+    Wraps either a finished completion (``content``) or a live Groq response
+    stream, in which case every delta is forwarded as its own ChatChunk.
+    """
 
     def __init__(
         self,
@@ -202,9 +477,11 @@ class CustomGroqLLMStream(LLMStream):
         fnc_ctx: Optional[Any],
         conn_options: Optional[Any],
         request_id: str,
-        content: str,
+        content: Optional[str] = None,
         executed_tools: Optional[Any] = None,
         tools: Optional[Any] = None,
+        response_stream: Optional[AsyncIterator[Any]] = None,
+        on_complete: Optional[Callable[[str, Optional[Any]], None]] = None,
     ) -> None:
         """Initialize the CustomGroqLLMStream."""
         actual_conn_options = conn_options or DEFAULT_API_CONNECT_OPTIONS
@@ -216,6 +493,9 @@ class CustomGroqLLMStream(LLMStream):
         self.content = content
         self.executed_tools = executed_tools
         self.fnc_ctx = fnc_ctx
+        self._response_stream = response_stream
+        self._on_complete = on_complete
+        self._content_parts: List[str] = []
         self._sent = False
 
     async def _run(self) -> None:
@@ -224,6 +504,9 @@ class CustomGroqLLMStream(LLMStream):
 
     async def __anext__(self) -> ChatChunk:
         """Get the next chunk in the async iteration."""
+        if self._response_stream is not None:
+            return await self._next_streamed_chunk()
+
         if self._sent:
             raise StopAsyncIteration
 
@@ -234,18 +517,81 @@ class CustomGroqLLMStream(LLMStream):
             delta=ChoiceDelta(role="assistant", content=self.content),
         )
 
+    async def _next_streamed_chunk(self) -> ChatChunk:
+        """Pull Groq deltas until one carries content, then wrap it."""
+        while True:
+            try:
+                chunk = await self._response_stream.__anext__()
+            except StopAsyncIteration:
+                self._finish_stream()
+                raise StopAsyncIteration
+            except Exception as e:
+                print(f"[ERROR] Groq stream failed: {e}")
+                self._response_stream = None
+                self._sent = True
+                if self._content_parts:
+                    raise StopAsyncIteration
+                # Nothing was spoken yet, fall back to the apology message
+                self.content = ERROR_RESPONSE
+                return ChatChunk(
+                    id=self.request_id,
+                    delta=ChoiceDelta(role="assistant", content=self.content),
+                )
+
+            self.request_id = getattr(chunk, "id", None) or self.request_id
+            if not chunk.choices:
+                continue
+
+            delta = chunk.choices[0].delta
+            executed_tools = getattr(delta, "executed_tools", None)
+            if executed_tools:
+                self.executed_tools = (self.executed_tools or []) + list(executed_tools)
+
+            if not delta.content:
+                continue
+
+            self._content_parts.append(delta.content)
+            return ChatChunk(
+                id=self.request_id,
+                delta=ChoiceDelta(role="assistant", content=delta.content),
+            )
+
+    def _finish_stream(self) -> None:
+        """Assemble the full answer and report executed tools once streaming ends."""
+        self._response_stream = None
+        # Every delta went out already, later calls only end the iteration
+        self._sent = True
+        self.content = "".join(self._content_parts)
+
+        if self.executed_tools:
+            search_results = _extract_search_results(self.executed_tools)
+            if search_results:
+                print(f"[DEBUG] Extracted {len(search_results)} search results")
+
+        if self._on_complete is not None:
+            self._on_complete(self.content, self.executed_tools)
+
+    async def aclose(self) -> None:
+        """Release the Groq response when the stream is dropped, e.g. on barge-in."""
+        response_stream, self._response_stream = self._response_stream, None
+        self._sent = True
+        if response_stream is not None and hasattr(response_stream, "close"):
+            try:
+                await response_stream.close()
+            except Exception as e:
+                print(f"[ERROR] Error closing Groq stream: {e}")
+        await super().aclose()
+
     def __aiter__(self) -> "CustomGroqLLMStream":
         """Return the async iterator."""
         return self
 
 
-# Create the LLM component instance
-llm_component = CustomGroqLLM()
-
-
 if __name__ == "__main__":
     print("🧠 Custom Groq LLM Component - compound-beta with tool extraction")
     print("=" * 60)
     print("✅ Model: compound-beta")
-    print("✅ Features: executed_tools extraction, search results forwarding")
+    print(
+        "✅ Features: token streaming, executed_tools extraction, search results forwarding"
+    )
     print("🔧 Custom implementation for LiveKit Agents compatibility")
@@ -0,0 +1,145 @@
+"""Process-wide registry of heavy models shared across agent sessions."""
+
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+def _rss_bytes() -> Optional[int]:
+    """Return the resident memory of this process, if it can be measured."""
+    try:
+        import psutil
+
+        return int(psutil.Process().memory_info().rss)
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return int(peak if sys.platform == "darwin" else peak * 1024)
+    except ImportError:
+        return None
+
+
+def _load_vad() -> Any:
+    """Load the Silero VAD model."""
+    from livekit.plugins import silero
+
+    return silero.VAD.load()
+
+
+def _load_turn_detector() -> Any:
+    """Load the English end-of-turn detector."""
+    from livekit.plugins.turn_detector.english import EnglishModel
+
+    return EnglishModel()
+
+
+class ModelRegistry:
+    """Loads each registered model once per process and shares it.
+
+    Models are loaded lazily on first get() (or eagerly with preload()), and
+    the load time and resident memory growth of each load are recorded.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        # Optional models that failed to load, with the error
+        self._errors: Dict[str, str] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        """Register a loader for a model name."""
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        """Return the shared model, loading it on first use.
+
+        Raises:
+            KeyError: If no loader is registered for the name.
+        """
+        if name in self._models:
+            return self._models[name]
+
+        with self._registry_lock:
+            if name not in self._loaders:
+                raise KeyError(f"No model registered as '{name}'")
+            lock = self._locks[name]
+
+        with lock:
+            if name not in self._models:
+                self._models[name] = self._load(name)
+        return self._models[name]
+
+    def get_optional(self, name: str) -> Optional[Any]:
+        """Return the shared model, or None if it cannot be loaded.
+
+        A failed load is remembered, so later calls return None at once
+        instead of retrying the load and warning again.
+        """
+        if name in self._errors:
+            return None
+        try:
+            return self.get(name)
+        except Exception as e:
+            with self._registry_lock:
+                if name in self._errors:
+                    return None
+                self._errors[name] = str(e)
+            print(f"⚠️ Optional model '{name}' unavailable: {e}")
+            return None
+
+    def preload(self, *names: str) -> None:
+        """Load models ahead of the first session, e.g. during prewarm."""
+        for name in names:
+            self.get(name)
+
+    def _load(self, name: str) -> Any:
+        """Run a loader and record its load time and memory growth."""
+        rss_before = _rss_bytes()
+        start_time = time.perf_counter()
+        model = self._loaders[name]()
+        load_time = time.perf_counter() - start_time
+        rss_after = _rss_bytes()
+
+        rss_delta = None
+        if rss_before is not None and rss_after is not None:
+            rss_delta = rss_after - rss_before
+        self._stats[name] = {"load_time": load_time, "rss_delta": rss_delta}
+
+        memory = "unknown" if rss_delta is None else f"{rss_delta / 1e6:+.1f} MB"
+        print(f"📦 Loaded {name} in {load_time:.2f}s ({memory} RSS)")
+        return model
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return load time (s) and RSS growth (bytes) of each loaded model.
+
+        Optional models that failed to load are listed with their error.
+        """
+        stats = {name: dict(stats) for name, stats in self._stats.items()}
+        for name, error in self._errors.items():
+            stats[name] = {"error": error}
+        return stats
+
+
+# Shared by every agent session in this worker process
+model_registry = ModelRegistry()
+model_registry.register("vad", _load_vad)
+model_registry.register("turn_detector", _load_turn_detector)
@@ -0,0 +1,389 @@
+"""Worker that hosts many concurrent meetings in one agent process.
+
+Every meeting gets its own AgentSession on a single event loop. The VAD
+model, the Groq plugins (and with them the HTTP connection pools) are
+created once and shared by all sessions. Each session has its own IPC
+client, pointed at the Selenium process of its meeting, and its own audio
+route: a pair of audio devices, or a DevTools channel that talks to the
+meeting's browser page directly. New meetings are refused while the host is
+short on CPU or memory.
+
+The worker answers the same control protocol as the single-meeting agent
+daemon, so MeetJoiner attaches to it without changes.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from dotenv import load_dotenv
+from livekit.agents import AgentSession
+
+# Allow running as a standalone script, like voice_agent.py
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai.model_registry import model_registry  # noqa: E402
+from src.ai.voice_agent import create_groq_plugins, VoiceAgent  # noqa: E402
+from src.audio.blackhole import device_registry  # noqa: E402
+from src.audio.echo_gate import create_echo_gate  # noqa: E402
+from src.audio.page_transport import (  # noqa: E402
+    PageAudioChannel,
+    PageAudioInput,
+    PageAudioOutput,
+)
+from src.audio.session_io import (  # noqa: E402
+    DeviceAudioInput,
+    DeviceAudioOutput,
+    resolve_device,
+    SAMPLE_RATE,
+)
+from src.meeting.ipc_commands import (  # noqa: E402
+    AGENT_DAEMON_SOCKET,
+    AsyncIPCClient,
+    IPCCommands,
+)
+
+load_dotenv()
+
+MAX_SESSIONS = int(os.getenv("GROQUETTE_MAX_SESSIONS", "16"))
+MIN_FREE_MEMORY_MB = float(os.getenv("GROQUETTE_MIN_FREE_MEMORY_MB", "512"))
+MAX_CPU_PERCENT = float(os.getenv("GROQUETTE_MAX_CPU_PERCENT", "85"))
+
+
+def _cpu_percent() -> Optional[float]:
+    """Return host CPU usage in percent, if it can be measured."""
+    try:
+        import psutil
+
+        return float(psutil.cpu_percent(interval=None))
+    except ImportError:
+        pass
+
+    try:
+        # One-minute load average relative to the number of cores
+        return os.getloadavg()[0] / (os.cpu_count() or 1) * 100
+    except (AttributeError, OSError):
+        return None
+
+
+def _available_memory_mb() -> Optional[float]:
+    """Return the memory available to new sessions in MB, if it can be measured."""
+    try:
+        import psutil
+
+        return psutil.virtual_memory().available / 1e6
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024 / 1e6
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+class MeetingSession:
+    """One meeting hosted by the worker."""
+
+    def __init__(
+        self,
+        meeting_url: str,
+        session: AgentSession,
+        agent: VoiceAgent,
+        meeting_client: AsyncIPCClient,
+        audio_input: Union[DeviceAudioInput, PageAudioInput],
+        audio_output: Union[DeviceAudioOutput, PageAudioOutput],
+    ) -> None:
+        """Initialize the meeting session."""
+        self.meeting_url = meeting_url
+        self.session = session
+        self.agent = agent
+        self.meeting_client = meeting_client
+        self.audio_input = audio_input
+        self.audio_output = audio_output
+        self.started_at = time.time()
+
+    def status(self) -> Dict[str, Any]:
+        """Return a machine-readable summary of the session."""
+        return {
+            "meeting_url": self.meeting_url,
+            "ipc_socket": self.meeting_client.socket_path,
+            "input_device": self.audio_input.device,
+            "output_device": self.audio_output.device,
+            "uptime": time.time() - self.started_at,
+            "is_muted": self.agent.is_muted,
+            "audio": {
+                "input": self.audio_input.stats(),
+                "output": self.audio_output.stats(),
+            },
+        }
+
+    async def close(self) -> None:
+        """Stop the session and release its devices and IPC connection."""
+        try:
+            await self.session.aclose()
+        finally:
+            self.audio_input.close()
+            self.audio_output.close()
+            await self.meeting_client.close()
+
+
+class MultiMeetingWorker:
+    """Runs one AgentSession per attached meeting on a shared event loop."""
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        max_sessions: int = MAX_SESSIONS,
+        min_free_memory_mb: float = MIN_FREE_MEMORY_MB,
+        max_cpu_percent: float = MAX_CPU_PERCENT,
+    ) -> None:
+        """Initialize the worker.
+
+        Args:
+            socket_path: Control socket path, defaults to GROQUETTE_AGENT_SOCKET.
+            max_sessions: Hard limit on concurrent meetings.
+            min_free_memory_mb: Refuse new meetings below this much free memory.
+            max_cpu_percent: Refuse new meetings above this CPU usage.
+        """
+        self.socket_path = socket_path or AGENT_DAEMON_SOCKET
+        self.max_sessions = max_sessions
+        self.min_free_memory_mb = min_free_memory_mb
+        self.max_cpu_percent = max_cpu_percent
+        self.sessions: Dict[str, MeetingSession] = {}
+        self._plugins: Dict[str, Any] = {}
+        self._page_channels: Dict[str, PageAudioChannel] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped = asyncio.Event()
+
+    async def run(self) -> None:
+        """Load shared models and serve control requests until shutdown."""
+        groq_api_key = os.getenv("GROQ_API_KEY")
+        if not groq_api_key:
+            print("❌ GROQ_API_KEY not found in environment variables")
+            return
+
+        self._loop = asyncio.get_running_loop()
+        model_registry.preload("vad")
+        self._plugins = create_groq_plugins(groq_api_key)
+        _cpu_percent()  # Prime psutil's CPU sampling
+
+        control = IPCCommands(socket_path=self.socket_path, serve=True)
+        thread = threading.Thread(
+            target=self._serve_control, args=(control,), daemon=True
+        )
+        thread.start()
+        print(
+            f"🔥 Multi-meeting worker ready for up to {self.max_sessions} "
+            f"meetings on {self.socket_path}"
+        )
+
+        try:
+            await self._stopped.wait()
+        finally:
+            control.close()
+            for meeting_url in list(self.sessions):
+                await self.detach({"meeting_url": meeting_url})
+
+    def _serve_control(self, control: IPCCommands) -> None:
+        """Answer control commands from Selenium processes."""
+        while not self._stopped.is_set():
+            try:
+                cmd_data = control.check_for_command(timeout=1.0)
+            except Exception as e:
+                print(f"Error in worker control handler: {e}")
+                break
+            if not cmd_data:
+                continue
+
+            future = asyncio.run_coroutine_threadsafe(
+                self.handle_command(cmd_data.get("command"), cmd_data["params"]),
+                self._loop,
+            )
+            try:
+                result, ok = future.result(timeout=30)
+            except Exception as e:
+                result, ok = f"Command failed: {e}", False
+            control.send_response(result, cmd_data.get("id"), ok)
+
+    async def handle_command(
+        self, command: str, params: Dict[str, Any]
+    ) -> Tuple[Any, bool]:
+        """Run a control command, returning (result, ok)."""
+        if command == "ping":
+            return "pong", True
+        if command == "attach":
+            return await self.attach(params)
+        if command == "detach":
+            return await self.detach(params)
+        if command == "status":
+            return self.status(), True
+        if command == "shutdown":
+            self._stopped.set()
+            return "Shutting down", True
+        return "Unknown command", False
+
+    def check_admission(self) -> Tuple[bool, str]:
+        """Decide whether the host has headroom for another meeting."""
+        if len(self.sessions) >= self.max_sessions:
+            return False, f"Worker is full ({self.max_sessions} meetings)"
+
+        free_mb = _available_memory_mb()
+        if free_mb is not None and free_mb < self.min_free_memory_mb:
+            return False, f"Only {free_mb:.0f} MB memory available"
+
+        cpu = _cpu_percent()
+        if cpu is not None and cpu > self.max_cpu_percent:
+            return False, f"CPU usage at {cpu:.0f}%"
+
+        return True, "OK"
+
+    async def attach(self, params: Dict[str, Any]) -> Tuple[str, bool]:
+        """Start a session for a meeting.
+
+        Params:
+            meeting_url: Meeting the session belongs to.
+            ipc_socket: IPC socket of the meeting's Selenium process.
+            input_device: Device ID or name the meeting audio arrives on.
+            output_device: Device ID or name the agent speaks into.
+            audio_transport: "device" (default) or "page".
+            page_audio_endpoint: DevTools WebSocket URL of the meeting page,
+                for "page".
+        """
+        meeting_url = params.get("meeting_url")
+        if not meeting_url or not params.get("ipc_socket"):
+            return "attach needs a meeting_url and an ipc_socket", False
+        if meeting_url in self.sessions:
+            await self.detach({"meeting_url": meeting_url})
+
+        admitted, reason = self.check_admission()
+        if not admitted:
+            print(f"🚫 Refusing {meeting_url}: {reason}")
+            return f"Refused: {reason}", False
+
+        route, error = await self._create_audio_route(meeting_url, params)
+        if error:
+            return error, False
+        audio_input, audio_output = route
+
+        meeting_client = AsyncIPCClient(params["ipc_socket"])
+
+        session: AgentSession = AgentSession(
+            vad=model_registry.get("vad"), **self._plugins
+        )
+        session.input.audio = audio_input
+        session.output.audio = audio_output
+        agent = VoiceAgent(meeting_client=meeting_client)
+
+        meeting = MeetingSession(
+            meeting_url, session, agent, meeting_client, audio_input, audio_output
+        )
+        try:
+            await session.start(agent=agent)
+        except Exception:
+            await meeting.close()
+            if meeting_url in self._page_channels:
+                await self._page_channels.pop(meeting_url).close()
+            raise
+
+        self.sessions[meeting_url] = meeting
+        print(f"📞 Attached to {meeting_url} ({len(self.sessions)} active)")
+        session.generate_reply()
+        return f"Attached to {meeting_url}", True
+
+    async def _create_audio_route(
+        self, meeting_url: str, params: Dict[str, Any]
+    ) -> Tuple[Optional[Tuple[Any, Any]], Optional[str]]:
+        """Open the audio input and output of a meeting, as attach() asks.
+
+        Returns:
+            The (input, output) pair and None, or None and the reason the
+            route cannot be created.
+        """
+        if params.get("audio_transport", "device") == "page":
+            endpoint = params.get("page_audio_endpoint")
+            if not endpoint:
+                return None, "attach with page audio needs a page_audio_endpoint"
+            channel = PageAudioChannel(endpoint)
+            try:
+                await channel.start()
+            except ConnectionError as e:
+                return None, str(e)
+            self._page_channels[meeting_url] = channel
+            audio_input, audio_output = channel.input, channel.output
+        else:
+            input_device = resolve_device(params.get("input_device"), "input")
+            output_device = resolve_device(params.get("output_device"), "output")
+            in_use = self._devices_in_use()
+            if input_device in in_use or output_device in in_use:
+                return None, "Refused: audio devices already used by another meeting"
+
+            # Sharing one device, the agent would hear and answer itself
+            echo_gate = create_echo_gate(input_device, output_device, SAMPLE_RATE)
+            audio_input = DeviceAudioInput(input_device, echo_gate=echo_gate)
+            audio_output = DeviceAudioOutput(output_device, echo_gate=echo_gate)
+            audio_input.start()
+            audio_output.start()
+
+        return (audio_input, audio_output), None
+
+    async def detach(self, params: Dict[str, Any]) -> Tuple[str, bool]:
+        """Stop the session of a meeting.
+
+        Without a meeting_url, the only active session is detached.
+        """
+        meeting_url = params.get("meeting_url")
+        if meeting_url is None and len(self.sessions) == 1:
+            meeting_url = next(iter(self.sessions))
+
+        meeting = self.sessions.pop(meeting_url, None)
+        if meeting is None:
+            return "Not attached", True
+
+        await meeting.close()
+        channel = self._page_channels.pop(meeting_url, None)
+        if channel is not None:
+            await channel.close()
+        print(f"👋 Detached from {meeting_url} ({len(self.sessions)} active)")
+        return "Detached", True
+
+    def status(self) -> Dict[str, Any]:
+        """Return per-meeting status and host headroom."""
+        return {
+            "sessions": [meeting.status() for meeting in self.sessions.values()],
+            "max_sessions": self.max_sessions,
+            "cpu_percent": _cpu_percent(),
+            "available_memory_mb": _available_memory_mb(),
+            "models": model_registry.stats(),
+            "audio_devices": device_registry.stats(),
+        }
+
+    def _devices_in_use(self) -> set:
+        """Return the audio device IDs held by active sessions."""
+        devices = set()
+        for meeting in self.sessions.values():
+            devices.add(meeting.audio_input.device)
+            devices.add(meeting.audio_output.device)
+        devices.discard(None)
+        return devices
+
+
+def run_multi_worker() -> None:
+    """Run the multi-meeting worker until it receives a shutdown request."""
+    print("🎯 Starting multi-meeting voice agent worker...")
+    try:
+        asyncio.run(MultiMeetingWorker().run())
+    except KeyboardInterrupt:
+        print("\n🛑 Worker stopped by user")
+
+
+if __name__ == "__main__":
+    run_multi_worker()
@@ -4,16 +4,20 @@ import asyncio
 import os
 import sys
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Set
 
 from dotenv import load_dotenv
 from livekit import agents, rtc
-from livekit.agents import Agent, AgentSession, function_tool, JobProcess, RunContext
-
-# from livekit.plugins.turn_detector.english import EnglishModel
-from livekit.plugins import groq, silero
-
-# from llm import CustomGroqLLM
+from livekit.agents import (
+    Agent,
+    AgentSession,
+    function_tool,
+    JobProcess,
+    llm,
+    RunContext,
+    StopResponse,
+)
+from livekit.plugins import groq
 
 # Add parent directory to path for imports when running as standalone script
 # Get the absolute path to the project root (Groquette directory)
@@ -21,28 +25,60 @@ current_file = Path(__file__).resolve()
 project_root = current_file.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+from src.ai.agent_daemon import AgentDaemon
+from src.ai.intent_router import IntentRouter
+from src.ai.model_registry import model_registry
 from src.audio.blackhole import set_mic_to_blackhole, set_speaker_to_blackhole
-from src.meeting.ipc_commands import IPCCommands
+from src.meeting.ipc_commands import AsyncIPCClient
 
 load_dotenv()
 
 # Initialize IPC for communication with Selenium process
-ipc = IPCCommands()
+ipc = AsyncIPCClient()
+
+# Set by MeetJoiner when it spawns the long-lived, pre-warmed agent
+DAEMON_MODE = bool(os.getenv("GROQUETTE_AGENT_DAEMON"))
+
+# Opt into the end-of-turn model instead of plain VAD turn detection
+USE_TURN_DETECTOR = bool(os.getenv("GROQUETTE_TURN_DETECTOR"))
+
+# Results reported right away, before the Selenium process acknowledges
+OPTIMISTIC_RESULTS = {
+    "mute_microphone": "Microphone muted",
+    "unmute_microphone": "Microphone unmuted",
+    "leave_meeting": "Leaving the meeting",
+}
+MUTE_STATES = {"mute_microphone": True, "unmute_microphone": False}
 
 
 class VoiceAgent(Agent):
     """Simple voice agent for Google Meet calls using Groq's complete AI stack."""
 
-    def __init__(self) -> None:
-        """Initialize the voice agent."""
+    def __init__(self, meeting_client: Optional[AsyncIPCClient] = None) -> None:
+        """Initialize the voice agent.
+
+        Args:
+            meeting_client: IPC client for this agent's meeting, defaults to the
+                process-wide client used by the single-meeting worker.
+        """
         instructions = self._load_system_prompt()
         if instructions is None:
             instructions = "You are a helpful AI assistant in a video call."
 
+        self.meeting_client = meeting_client or ipc
         self.is_muted = False  # Track mute state
+        self._mute_version = 0  # Bumped on every optimistic mute change
+        self._command_tasks: Set[asyncio.Task] = set()
+        self.intent_router = IntentRouter()
+
+        turn_detection: Any = "vad"
+        if USE_TURN_DETECTOR:
+            turn_detection = model_registry.get_optional("turn_detector") or "vad"
 
         super().__init__(
-            instructions=instructions, vad=silero.VAD.load(), turn_detection="vad"
+            instructions=instructions,
+            vad=model_registry.get("vad"),
+            turn_detection=turn_detection,
         )
 
     @function_tool()
@@ -57,8 +93,7 @@ class VoiceAgent(Agent):
             A dictionary containing the result of the command.
         """
         reason = "Muted by voice agent"
-        result = ipc.send_command("mute_microphone")
-        self.is_muted = True
+        result = await self._run_meeting_command("mute_microphone")
         return {"result": result}
 
     @function_tool()
@@ -75,8 +110,7 @@ class VoiceAgent(Agent):
             A dictionary containing the result of the command.
         """
         reason = "Unmuted by voice agent"
-        result = ipc.send_command("unmute_microphone")
-        self.is_muted = False
+        result = await self._run_meeting_command("unmute_microphone")
         return {"result": result}
 
     @function_tool()
@@ -93,6 +127,10 @@ class VoiceAgent(Agent):
             A dictionary containing the result of the command.
         """
         reason = "Checked microphone status by voice agent"
+        mirrored = self.meeting_client.state.get("mic_muted")
+        # Trust the live Meet UI unless a command is still being applied
+        if mirrored is not None and not self._command_tasks:
+            self.is_muted = mirrored
         return {"result": self.is_muted}
 
     @function_tool()
@@ -107,9 +145,61 @@ class VoiceAgent(Agent):
             A dictionary containing the result of the command.
         """
         reason = "Left meeting by voice agent"
-        result = ipc.send_command("leave_meeting")
+        result = await self._run_meeting_command("leave_meeting")
         return {"result": result}
 
+    async def on_enter(self) -> None:
+        """Start mirroring the live meeting state pushed by the Selenium process."""
+        if DAEMON_MODE:
+            # The daemon subscribes when it is attached to a meeting
+            return
+        if not await self.meeting_client.subscribe_state():
+            print("⚠️ Meeting state mirror unavailable, using local mute state")
+
+    async def on_user_turn_completed(
+        self, turn_ctx: llm.ChatContext, new_message: llm.ChatMessage
+    ) -> None:
+        """Run addressed meeting-control commands locally, skipping the LLM."""
+        command = self.intent_router.match(new_message.text_content or "")
+        if command is None:
+            return
+
+        print(f"⚡ Fast-path command: {command}")
+        await self._run_meeting_command(command)
+        raise StopResponse()
+
+    async def _run_meeting_command(self, command: str) -> str:
+        """Apply a meeting command optimistically and confirm it in the background.
+
+        The Selenium side clicks through the Meet UI while the agent keeps
+        talking and listening; if it reports a failure, the local mute state
+        is rolled back unless a newer command has changed it since.
+        """
+        previous_muted = self.is_muted
+        if command in MUTE_STATES:
+            self.is_muted = MUTE_STATES[command]
+            self._mute_version += 1
+
+        task = asyncio.create_task(
+            self._confirm_meeting_command(command, previous_muted, self._mute_version)
+        )
+        self._command_tasks.add(task)
+        task.add_done_callback(self._command_tasks.discard)
+
+        return OPTIMISTIC_RESULTS.get(command, "Command sent")
+
+    async def _confirm_meeting_command(
+        self, command: str, previous_muted: bool, mute_version: int
+    ) -> None:
+        """Reconcile local state with the Selenium process acknowledgement."""
+        response = await self.meeting_client.request(command)
+        if response.get("ok"):
+            return
+
+        print(f"⚠️ {command} failed: {response.get('result')}")
+        if command in MUTE_STATES and mute_version == self._mute_version:
+            self.is_muted = previous_muted
+
     def _load_system_prompt(self) -> Optional[str]:
         """Load system prompt from file."""
         try:
@@ -121,6 +211,29 @@ class VoiceAgent(Agent):
             return "You are a helpful AI assistant in a video call."
 
 
+def create_groq_plugins(groq_api_key: str) -> Dict[str, Any]:
+    """Create the Groq STT, LLM and TTS plugins for an AgentSession.
+
+    The plugins hold the HTTP connection pools, so a worker hosting several
+    sessions creates them once and passes the same instances to each.
+    """
+    return {
+        "stt": groq.STT(
+            model="whisper-large-v3-turbo", language="en", api_key=groq_api_key
+        ),
+        # Not src.ai.llm.CustomGroqLLM: it does not pass the agent's function
+        # tools to Groq, so the agent could no longer mute or leave the meeting
+        "llm": groq.LLM(
+            model="meta-llama/llama-4-maverick-17b-128e-instruct",
+            # "llama-3.3-70b-versatile",
+            api_key=groq_api_key,
+        ),
+        "tts": groq.TTS(
+            model="playai-tts", voice="Arista-PlayAI", api_key=groq_api_key
+        ),
+    }
+
+
 async def entrypoint(ctx: agents.JobContext) -> None:
     """Main entrypoint for the voice agent configured for console operation."""
     try:
@@ -148,25 +261,18 @@ async def entrypoint(ctx: agents.JobContext) -> None:
         await ctx.connect()
         print("✅ Connected to room successfully")
 
-        session: AgentSession = AgentSession(
-            stt=groq.STT(
-                model="whisper-large-v3-turbo", language="en", api_key=groq_api_key
-            ),
-            llm=groq.LLM(
-                model="meta-llama/llama-4-maverick-17b-128e-instruct",
-                # "llama-3.3-70b-versatile",
-                api_key=groq_api_key,
-            ),
-            tts=groq.TTS(
-                model="playai-tts", voice="Arista-PlayAI", api_key=groq_api_key
-            ),
-        )
+        session: AgentSession = AgentSession(**create_groq_plugins(groq_api_key))
 
         # Create and start the agent
         agent = VoiceAgent()
         print("🚀 Starting agent session...")
         await session.start(agent=agent, room=ctx.room)
 
+        if DAEMON_MODE:
+            # Stay warm and silent until MeetJoiner attaches us to a meeting
+            await AgentDaemon(session, agent, ipc).run()
+            return
+
         # Generate initial greeting
         print("👋 Generating initial greeting...")
         await session.generate_reply()
@@ -189,8 +295,11 @@ async def entrypoint(ctx: agents.JobContext) -> None:
 
 
 def prewarm(proc: JobProcess) -> None:
-    """Load the VAD model during prewarm for faster startup."""
-    proc.userdata["vad"] = silero.VAD.load()
+    """Load the shared models during prewarm for faster startup."""
+    model_registry.preload("vad")
+    if USE_TURN_DETECTOR:
+        model_registry.get_optional("turn_detector")
+    proc.userdata["vad"] = model_registry.get("vad")
 
 
 def run_agent() -> None:
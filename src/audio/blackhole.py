@@ -1,22 +1,275 @@
 """Audio device selector for BlackHole virtual audio driver.
 
 Provides functions to set microphone and speaker to BlackHole devices.
+Device lookups go through a process-wide registry that enumerates the
+PortAudio devices once and only scans again when it is invalidated. PortAudio
+keeps the device list it saw at startup, so hardware changes are detected
+and reported as a stale list rather than silently missed.
 """
 
+import argparse
 import logging
+import os
+import sys
+import threading
 import time
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import sounddevice as sd
 
+from .latency import get_stream_profile
+from .loopback import run_loopback_diagnostics, write_report
+from .ring_buffer import AudioRingBuffer
+
 logger = logging.getLogger(__name__)
 
+# Seconds between checks of the (cheap) hotplug signature
+HOTPLUG_CHECK_INTERVAL = 2.0
+
+# Where audio hardware and drivers show up, per platform
+_LINUX_SOUND_PATHS = ("/proc/asound/cards", "/dev/snd")
+_MACOS_DRIVER_PATHS = ("/Library/Audio/Plug-Ins/HAL",)
+
+
+def _hotplug_signature() -> Optional[Tuple[Any, ...]]:
+    """Return a cheap fingerprint of the attached audio hardware.
+
+    Reads the ALSA card list on Linux and the CoreAudio driver directory on
+    macOS (which changes when e.g. BlackHole is installed), without touching
+    PortAudio. Returns None where no such source exists, in which case only
+    an explicit invalidation rescans.
+    """
+    if sys.platform.startswith("linux"):
+        paths = _LINUX_SOUND_PATHS
+    elif sys.platform == "darwin":
+        paths = _MACOS_DRIVER_PATHS
+    else:
+        return None
+
+    signature = []
+    for path in paths:
+        try:
+            if os.path.isdir(path):
+                signature.append(tuple(sorted(os.listdir(path))))
+            else:
+                with open(path, "r") as f:
+                    signature.append(f.read())
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class DeviceRegistry:
+    """Cached PortAudio device list, indexed by direction and name.
+
+    The device list is enumerated once and lookups are answered from the
+    cache. A scan runs again after invalidate(). The hotplug signature is
+    checked at most every ``check_interval`` seconds; when it changes, the
+    list is marked stale, since a scan cannot see new hardware until
+    PortAudio is reinitialized. Concurrent callers share one scan, and a
+    failed scan keeps the last good device list.
+    """
+
+    def __init__(
+        self,
+        check_interval: float = HOTPLUG_CHECK_INTERVAL,
+        rescan_on_hotplug: bool = False,
+    ) -> None:
+        """Initialize an empty registry; the first lookup scans.
+
+        Args:
+            check_interval: Seconds between hotplug signature checks.
+            rescan_on_hotplug: Reinitialize PortAudio and rescan when the
+                hardware changes. Off by default because it breaks open
+                streams, such as those of other meetings in a worker; only
+                enable it where no streams stay open between lookups.
+        """
+        self.check_interval = check_interval
+        self.rescan_on_hotplug = rescan_on_hotplug
+        self._devices: Optional[List[Dict[str, Any]]] = None
+        self._by_direction: Dict[str, List[Tuple[str, int]]] = {}
+        self._matches: Dict[Tuple[str, str], Optional[int]] = {}
+        # Hotplug signature when PortAudio last enumerated the hardware
+        self._signature: Optional[Tuple[Any, ...]] = None
+        self._stale = False
+        self._checked_at = 0.0
+        self._scanned_at: Optional[float] = None
+        self._scan_time: Optional[float] = None
+        self._scans = 0
+        self._rescan = False
+        self._scan_failed = False
+        self._lock = threading.Lock()
+
+    def devices(self) -> List[Dict[str, Any]]:
+        """Return the cached devices, each with its PortAudio ``index``."""
+        self._refresh_if_needed()
+        return list(self._devices or [])
+
+    def get(self, device_id: int) -> Optional[Dict[str, Any]]:
+        """Return one cached device by ID, or None if it does not exist."""
+        devices = self.devices()
+        if 0 <= device_id < len(devices):
+            return devices[device_id]
+        return None
+
+    def find(self, pattern: str, device_type: str = "input") -> Optional[int]:
+        """Return the first device whose name contains pattern.
+
+        Args:
+            pattern: Case-insensitive part of the device name.
+            device_type: "input" for microphone, "output" for speaker.
+        """
+        self._refresh_if_needed()
+        key = (pattern.lower(), device_type)
+        with self._lock:
+            if key not in self._matches:
+                self._matches[key] = next(
+                    (
+                        index
+                        for name, index in self._by_direction.get(device_type, [])
+                        if key[0] in name
+                    ),
+                    None,
+                )
+            return self._matches[key]
+
+    def invalidate(self, rescan: bool = False) -> None:
+        """Drop the cache so the next lookup scans again.
+
+        Args:
+            rescan: Also reinitialize PortAudio, which otherwise keeps the
+                device list it saw at startup. Only do this with no audio
+                streams open.
+        """
+        with self._lock:
+            self._devices = None
+            self._rescan = self._rescan or rescan
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the cached device names and when and how fast they were scanned.
+
+        ``stale`` is True when the hardware changed after PortAudio last
+        enumerated it, i.e. the device list may be stale.
+        """
+        self._refresh_if_needed()
+        return {
+            "devices": {
+                direction: [name for name, _ in devices]
+                for direction, devices in self._by_direction.items()
+            },
+            "scans": self._scans,
+            "scanned_at": self._scanned_at,
+            "scan_time": self._scan_time,
+            "stale": self._stale,
+        }
+
+    def _refresh_if_needed(self) -> None:
+        """Scan if the cache is empty or the last scan failed, and check hotplug."""
+        now = time.monotonic()
+        with self._lock:
+            if self._devices is not None:
+                if now - self._checked_at < self.check_interval:
+                    return
+                self._checked_at = now
+                if not self._scan_failed and not self._hardware_changed():
+                    return
+            self._scan()
+
+    def _hardware_changed(self) -> bool:
+        """Check whether a rescan should pick up changed hardware (lock held).
+
+        Without rescan_on_hotplug, PortAudio cannot be reinitialized under
+        open streams, so a change only marks the device list stale.
+        """
+        if _hotplug_signature() == self._signature:
+            self._stale = False
+            return False
+        if not self.rescan_on_hotplug:
+            if not self._stale:
+                logger.warning(
+                    "Audio hardware changed, device list may be stale until "
+                    "the audio devices are rescanned with no streams open"
+                )
+            self._stale = True
+            return False
+        logger.info("Audio hardware changed, reinitializing PortAudio")
+        self._rescan = True
+        return True
+
+    def _scan(self) -> None:
+        """Enumerate the devices and rebuild the indexes (lock held)."""
+        start_time = time.perf_counter()
+        enumerated = self._scans == 0
+        try:
+            if self._rescan:
+                enumerated = _reinitialize_portaudio()
+            devices = [dict(device) for device in sd.query_devices()]
+        except Exception as e:
+            # Keep serving the last good list, retry after check_interval
+            logger.error(f"Error enumerating audio devices: {e}")
+            if self._devices is None:
+                self._devices = []
+            self._scan_failed = True
+            return
+        finally:
+            self._rescan = False
+            self._checked_at = time.monotonic()
+
+        if enumerated:
+            # PortAudio's list now matches the attached hardware
+            self._signature = _hotplug_signature()
+            self._stale = False
+        for index, device in enumerate(devices):
+            device["index"] = index
+        self._devices = devices
+        self._by_direction = {
+            direction: [
+                (device["name"].lower(), device["index"])
+                for device in devices
+                if device[f"max_{direction}_channels"] > 0
+            ]
+            for direction in ("input", "output")
+        }
+        self._matches = {}
+        self._scan_failed = False
+        self._scans += 1
+        self._scanned_at = time.time()
+        self._scan_time = time.perf_counter() - start_time
+        logger.info(
+            f"Found {len(devices)} audio devices in {self._scan_time * 1000:.0f} ms"
+        )
+
+
+def _reinitialize_portaudio() -> bool:
+    """Restart PortAudio so it enumerates the attached hardware again.
+
+    sounddevice has no public API for this, so its private _terminate() and
+    _initialize() are used if this version has them. Any open stream stops
+    working.
+
+    Returns:
+        Whether PortAudio was reinitialized.
+    """
+    terminate = getattr(sd, "_terminate", None)
+    initialize = getattr(sd, "_initialize", None)
+    if terminate is None or initialize is None:
+        logger.warning("This sounddevice version cannot reinitialize PortAudio")
+        return False
+    terminate()
+    initialize()
+    return True
+
+
+# Shared by the agent, the worker sessions and the diagnostics
+device_registry = DeviceRegistry()
+
 
 def list_audio_devices() -> None:
     """List all available audio devices for debugging."""
     print("\n=== AUDIO DEVICES ===")
     try:
-        devices = sd.query_devices()
+        devices = device_registry.devices()
         print(f"Total devices found: {len(devices)}")
         for i, device in enumerate(devices):
             print(f"Device {i}: {device['name']}")
@@ -43,28 +296,23 @@ def find_blackhole_device(device_type: str = "input") -> Optional[int]:
     Returns:
         Device ID if found, None otherwise
     """
-    try:
-        devices = sd.query_devices()
-        for i, device in enumerate(devices):
-            device_name = device["name"].lower()
-
-            # Look for BlackHole in device name
-            if "blackhole" in device_name:
-                if device_type == "input" and device["max_input_channels"] > 0:
-                    logger.info(
-                        f"Found BlackHole input device: {device['name']} (ID: {i})"
-                    )
-                    return i
-                elif device_type == "output" and device["max_output_channels"] > 0:
-                    logger.info(
-                        f"Found BlackHole output device: {device['name']} (ID: {i})"
-                    )
-                    return i
+    device_id = device_registry.find("blackhole", device_type)
+    if device_id is not None:
+        logger.info(f"Found BlackHole {device_type} device (ID: {device_id})")
+    return device_id
 
-    except Exception as e:
-        logger.error(f"Error finding BlackHole device: {e}")
 
-    return None
+def find_audio_device(name: str, device_type: str = "input") -> Optional[int]:
+    """Find an audio device whose name contains the given text.
+
+    Args:
+        name: Case-insensitive part of the device name, e.g. "BlackHole 16ch"
+        device_type: "input" for microphone, "output" for speaker
+
+    Returns:
+        Device ID if found, None otherwise
+    """
+    return device_registry.find(name, device_type)
 
 
 def set_mic_to_blackhole() -> Optional[int]:
@@ -78,8 +326,8 @@ def set_mic_to_blackhole() -> Optional[int]:
     if blackhole_input is not None:
         try:
             # Verify the device works by checking its properties
-            device_info = sd.query_devices(blackhole_input)
-            if device_info["max_input_channels"] > 0:
+            device_info = device_registry.get(blackhole_input)
+            if device_info and device_info["max_input_channels"] > 0:
                 # Set as default input device
                 sd.default.device[0] = blackhole_input
                 logger.info(
@@ -110,8 +358,8 @@ def set_speaker_to_blackhole() -> Optional[int]:
     if blackhole_output is not None:
         try:
             # Verify the device works by checking its properties
-            device_info = sd.query_devices(blackhole_output)
-            if device_info["max_output_channels"] > 0:
+            device_info = device_registry.get(blackhole_output)
+            if device_info and device_info["max_output_channels"] > 0:
                 # Set as default output device
                 sd.default.device[1] = blackhole_output
                 logger.info(
@@ -131,12 +379,32 @@ def set_speaker_to_blackhole() -> Optional[int]:
     return None
 
 
-def create_blackhole_input_stream(callback, **kwargs):
+def _stream_settings(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Resolve stream arguments, filling gaps from the stream profile."""
+    profile = get_stream_profile(kwargs.get("profile"))
+    samplerate = kwargs.get("samplerate", 24000)
+    # 100 ms blocks unless the profile or the caller asks for smaller ones
+    block_duration = profile.get("block_duration", 0.1)
+    return {
+        "dtype": kwargs.get("dtype", "int16"),
+        "channels": kwargs.get("channels", 1),
+        "samplerate": samplerate,
+        "blocksize": kwargs.get("blocksize", int(samplerate * block_duration)),
+        "latency": kwargs.get("latency", profile.get("latency")),
+    }
+
+
+def create_blackhole_input_stream(
+    callback=None, ring_buffer: Optional[AudioRingBuffer] = None, **kwargs
+):
     """Create an input stream using BlackHole device.
 
     Args:
         callback: Audio callback function
-        **kwargs: Additional arguments for InputStream
+        ring_buffer: Ring to record into instead of a callback; the
+            standard way to hand device audio to the agent
+        **kwargs: Additional arguments for InputStream, and ``profile``
+            to pick a stream profile other than GROQUETTE_AUDIO_PROFILE
 
     Returns:
         InputStream object or None if failed
@@ -144,27 +412,29 @@ def create_blackhole_input_stream(callback, **kwargs):
     blackhole_input = find_blackhole_device("input")
     if blackhole_input is None:
         return None
+    if ring_buffer is not None:
+        callback = ring_buffer.input_callback
 
     try:
         return sd.InputStream(
             callback=callback,
             device=blackhole_input,
-            dtype=kwargs.get("dtype", "int16"),
-            channels=kwargs.get("channels", 1),
-            samplerate=kwargs.get("samplerate", 24000),
-            blocksize=kwargs.get("blocksize", 2400),
+            **_stream_settings(kwargs),
         )
     except Exception as e:
         logger.error(f"Failed to create BlackHole input stream: {e}")
         return None
 
 
-def create_blackhole_output_stream(callback, **kwargs):
+def create_blackhole_output_stream(
+    callback=None, ring_buffer: Optional[AudioRingBuffer] = None, **kwargs
+):
     """Create an output stream using BlackHole device.
 
     Args:
         callback: Audio callback function
-        **kwargs: Additional arguments for OutputStream
+        ring_buffer: Ring to play from instead of a callback
+        **kwargs: Additional arguments for OutputStream, and ``profile``
 
     Returns:
         OutputStream object or None if failed
@@ -172,27 +442,51 @@ def create_blackhole_output_stream(callback, **kwargs):
     blackhole_output = find_blackhole_device("output")
     if blackhole_output is None:
         return None
+    if ring_buffer is not None:
+        callback = ring_buffer.output_callback
 
     try:
         return sd.OutputStream(
             callback=callback,
             device=blackhole_output,
-            dtype=kwargs.get("dtype", "int16"),
-            channels=kwargs.get("channels", 1),
-            samplerate=kwargs.get("samplerate", 24000),
-            blocksize=kwargs.get("blocksize", 2400),
+            **_stream_settings(kwargs),
         )
     except Exception as e:
         logger.error(f"Failed to create BlackHole output stream: {e}")
         return None
 
 
-def test_blackhole_devices() -> None:
-    """Test BlackHole device selection and basic audio functionality."""
+def test_blackhole_devices(
+    diagnostics: bool = False,
+    soak_seconds: float = 10.0,
+    report_path: Optional[str] = None,
+    profile: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Test BlackHole device selection and basic audio functionality.
+
+    Args:
+        diagnostics: Also measure loopback latency, dropouts and xruns by
+            playing a probe on the output and recording it on the input.
+        soak_seconds: How long the diagnostics keep measuring.
+        report_path: File to write the JSON diagnostics report to, printed
+            to stdout if omitted.
+        profile: Stream profile to test, defaults to GROQUETTE_AUDIO_PROFILE.
+
+    Returns:
+        The diagnostics report, or None if diagnostics did not run.
+    """
     logging.basicConfig(level=logging.INFO)
 
     print("Testing BlackHole device selection...")
+    # Nothing is open yet, so PortAudio can safely pick up new hardware
+    device_registry.invalidate(rescan=True)
     list_audio_devices()
+    stats = device_registry.stats()
+    if stats["scan_time"] is not None:
+        print(
+            f"📇 Device registry: {stats['scans']} scan(s), "
+            f"last took {stats['scan_time'] * 1000:.0f} ms"
+        )
 
     mic_id = set_mic_to_blackhole()
     speaker_id = set_speaker_to_blackhole()
@@ -200,6 +494,13 @@ def test_blackhole_devices() -> None:
     _test_microphone(mic_id)
     _test_speaker(speaker_id)
 
+    if not diagnostics:
+        return None
+    if mic_id is None or speaker_id is None:
+        print("❌ Loopback diagnostics need both BlackHole devices")
+        return None
+    return _test_loopback(mic_id, speaker_id, soak_seconds, report_path, profile)
+
 
 def _test_microphone(mic_id: Optional[int]) -> None:
     """Test microphone recording from BlackHole input."""
@@ -213,26 +514,22 @@ def _test_microphone(mic_id: Optional[int]) -> None:
         duration = 1.0
         sample_rate = 24000
 
-        recorded_audio = []
-
-        def audio_callback(indata, frames_, time_, status):
-            if status:
-                print(f"Status: {status}")
-            recorded_audio.extend(indata[:, 0])
+        # Sized with headroom so the recording never overruns
+        recording = AudioRingBuffer(int(sample_rate * duration * 2), dtype=np.float32)
 
         with sd.InputStream(
             device=mic_id,
             samplerate=sample_rate,
             channels=1,
             dtype="float32",
-            callback=audio_callback,
+            callback=recording.input_callback,
         ):
             print("🎤 Recording 1 second of audio from BlackHole input...")
             time.sleep(duration)
 
-        if recorded_audio:
+        if recording.available:
             print(
-                f"✅ Successfully recorded {len(recorded_audio)} samples from BlackHole input"
+                f"✅ Successfully recorded {recording.available} samples from BlackHole input"
             )
         else:
             print("⚠️ No audio data received from BlackHole input")
@@ -249,8 +546,6 @@ def _test_speaker(speaker_id: Optional[int]) -> None:
 
     print(f"✅ Speaker set to BlackHole (Device ID: {speaker_id})")
 
-    import numpy as np
-
     try:
         duration = 1.0
         sample_rate = 24000
@@ -267,5 +562,59 @@ def _test_speaker(speaker_id: Optional[int]) -> None:
         print(f"⚠️ Could not play test tone: {e}")
 
 
+def _test_loopback(
+    mic_id: int,
+    speaker_id: int,
+    soak_seconds: float,
+    report_path: Optional[str],
+    profile: Optional[str],
+) -> Optional[Dict[str, Any]]:
+    """Run the loopback diagnostics with the helper streams' settings."""
+    settings = _stream_settings({"dtype": "float32", "profile": profile})
+    print(
+        f"⏱️ Measuring loopback for {soak_seconds:.0f}s "
+        f"({settings['blocksize']} frame blocks)..."
+    )
+    try:
+        report = run_loopback_diagnostics(mic_id, speaker_id, settings, soak_seconds)
+    except Exception as e:
+        print(f"⚠️ Could not run loopback diagnostics: {e}")
+        return None
+
+    write_report(report, report_path)
+    latency = report["round_trip_latency"]
+    if latency is not None:
+        print(
+            f"⏱️ Round trip {latency['mean_ms']:.1f} ms "
+            f"(max {latency['max_ms']:.1f}, jitter {latency['jitter_ms']:.1f}), "
+            f"{report['dropouts']} dropout(s), {sum(report['xruns'].values())} xrun(s)"
+        )
+    if report["passed"]:
+        print("✅ Loopback diagnostics passed")
+    else:
+        print("❌ Loopback diagnostics failed")
+    return report
+
+
 if __name__ == "__main__":
-    test_blackhole_devices()
+    parser = argparse.ArgumentParser(description="Test the BlackHole audio devices")
+    parser.add_argument(
+        "--diagnostics",
+        action="store_true",
+        help="Measure loopback latency, dropouts and xruns",
+    )
+    parser.add_argument(
+        "--soak", type=float, default=10.0, help="Seconds to run the diagnostics"
+    )
+    parser.add_argument("--report", help="Write the JSON report to this file")
+    parser.add_argument("--profile", help="Stream profile to test, e.g. low_latency")
+    args = parser.parse_args()
+
+    report = test_blackhole_devices(
+        diagnostics=args.diagnostics,
+        soak_seconds=args.soak,
+        report_path=args.report,
+        profile=args.profile,
+    )
+    if report is not None and not report["passed"]:
+        sys.exit(1)
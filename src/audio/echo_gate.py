@@ -0,0 +1,289 @@
+"""Self-echo gating for sessions that hear their own speech.
+
+When the agent's microphone and speaker are the same virtual device (e.g.
+BlackHole 2ch for both), everything the agent says comes straight back on
+its input. Left alone, the echo wastes STT calls, triggers false VAD turns
+and can make the bot answer itself.
+
+The output stream feeds the gate every block it plays, so the gate knows
+exactly what is playing. Both streams run on the device's sample clock, so
+an echoed sample shows up a fixed number of input samples after it was
+played. The gate finds that delay by cross-correlation. In ``cancel`` mode
+it then subtracts the aligned reference from each input frame, muting
+frames that are only echo and keeping whatever the meeting says over the
+agent. ``gate`` mode simply mutes the input while the agent is audible.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .blackhole import device_registry
+from .pipeline import float32_to_int16, int16_to_float32
+
+ECHO_GATE_MODES = ("cancel", "gate", "off")
+
+REFERENCE_SECONDS = 2.0  # Played audio kept for alignment
+MAX_ECHO_DELAY = 0.5  # Longest output-to-input delay searched for
+ESTIMATE_SECONDS = 0.25  # Input audio correlated per delay estimate
+ESTIMATE_INTERVAL = 5  # Frames between attempts while the delay is unknown
+MIN_CORRELATION = 0.6  # Weakest correlation accepted as the echo
+# Echo return loss enhancement below which the delay is considered lost
+MIN_ERLE_DB = 6.0
+MAX_MISSES = 5
+# Residual quieter than this (about -50 dBFS) is muted as pure echo
+RESIDUAL_LEVEL = 0.003
+
+
+def get_echo_gate_mode(name: Optional[str] = None) -> str:
+    """Return an echo gate mode, by default the one GROQUETTE_ECHO_GATE names.
+
+    Raises:
+        ValueError: If the mode does not exist.
+    """
+    name = (name or os.getenv("GROQUETTE_ECHO_GATE", "cancel")).lower()
+    if name not in ECHO_GATE_MODES:
+        raise ValueError(
+            f"Unknown echo gate mode '{name}', expected one of {list(ECHO_GATE_MODES)}"
+        )
+    return name
+
+
+def shares_echo_path(input_device: Optional[int], output_device: Optional[int]) -> bool:
+    """Check whether audio played on the output comes back on the input."""
+    if input_device is None or output_device is None:
+        return False
+    if input_device == output_device:
+        return True
+    # Duplex drivers may list their input and output as separate devices
+    input_info = device_registry.get(input_device)
+    output_info = device_registry.get(output_device)
+    return bool(
+        input_info and output_info and input_info["name"] == output_info["name"]
+    )
+
+
+def create_echo_gate(
+    input_device: Optional[int],
+    output_device: Optional[int],
+    sample_rate: int,
+    mode: Optional[str] = None,
+) -> Optional["EchoGate"]:
+    """Create a gate for a device pair, or None if it cannot hear itself."""
+    mode = get_echo_gate_mode(mode)
+    if mode == "off" or not shares_echo_path(input_device, output_device):
+        return None
+    print(f"🔇 Echo gate ({mode}) on shared audio device {input_device}")
+    return EchoGate(sample_rate, mode)
+
+
+class EchoGate:
+    """Suppresses the agent's own playback in its input frames.
+
+    play() is called from the output stream's PortAudio thread and
+    process() from the input side; like AudioRingBuffer, each side only
+    advances its own counter, so no lock is needed.
+    """
+
+    def __init__(self, sample_rate: int, mode: str = "cancel") -> None:
+        """Initialize the gate.
+
+        Args:
+            sample_rate: Sample rate of both the output and input streams.
+            mode: ``cancel`` to subtract the echo, ``gate`` to mute the
+                input while the agent is audible.
+        """
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.max_delay = int(sample_rate * MAX_ECHO_DELAY)
+        # Played samples, indexed by output sample count modulo the size
+        self._reference = np.zeros(int(sample_rate * REFERENCE_SECONDS), np.float32)
+        self._played = 0
+        self._audible_until = 0
+        # Recent input for delay estimation, indexed like the reference
+        self._recent = np.zeros(int(sample_rate * ESTIMATE_SECONDS), np.float32)
+        self._captured = 0
+
+        self.delay: Optional[int] = None
+        self._since_estimate = ESTIMATE_INTERVAL
+        self._misses = 0
+        self._buffers: Dict[str, np.ndarray] = {}
+
+        self.frames = 0
+        self.echo_frames = 0
+        self.suppressed_frames = 0
+        self.cancelled_frames = 0
+        self.unmatched_frames = 0
+        self.estimates = 0
+        self._erle_db = 0.0
+        self._erle_frames = 0
+
+    # Output side
+
+    def play(self, samples: np.ndarray) -> None:
+        """Record an int16 block handed to the output device."""
+        count = len(samples)
+        start = self._played % len(self._reference)
+        first = min(count, len(self._reference) - start)
+        int16_to_float32(samples[:first, 0], self._reference[start : start + first])
+        if count > first:
+            int16_to_float32(samples[first:, 0], self._reference[: count - first])
+        self._played += count
+        if samples.any():
+            self._audible_until = self._played
+
+    # Input side
+
+    def skip(self, count: int) -> None:
+        """Account for input samples dropped before process() saw them."""
+        self._captured += count
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Remove the agent's echo from an int16 input frame, in place."""
+        count = len(samples)
+        frame = int16_to_float32(samples, self._buffer("frame", count))
+        self._remember(frame)
+        start = self._captured
+        self._captured += count
+        self.frames += 1
+
+        # Echo can only arrive while or shortly after the agent is audible
+        if self._played - self._audible_until > self.max_delay + count:
+            return samples
+        self.echo_frames += 1
+
+        if self.mode == "gate":
+            samples[:] = 0
+            self.suppressed_frames += 1
+            return samples
+
+        if self.delay is None:
+            self._since_estimate += 1
+            if self._since_estimate >= ESTIMATE_INTERVAL:
+                self._estimate_delay()
+            if self.delay is None:
+                self.unmatched_frames += 1
+                return samples
+
+        reference = self._reference_segment(start - self.delay, count, "reference")
+        reference_energy = float(np.dot(reference, reference))
+        if reference_energy < 1e-9:
+            # A pause in the agent's speech lines up with this frame
+            return samples
+
+        gain = min(max(float(np.dot(frame, reference)) / reference_energy, 0.0), 4.0)
+        residual = self._buffer("residual", count)
+        np.multiply(reference, np.float32(gain), out=residual)
+        np.subtract(frame, residual, out=residual)
+        frame_energy = float(np.dot(frame, frame))
+        residual_energy = float(np.dot(residual, residual))
+
+        erle_db = 10 * np.log10((frame_energy + 1e-12) / (residual_energy + 1e-12))
+        if erle_db >= MIN_ERLE_DB:
+            self._misses = 0
+            self._erle_frames += 1
+            self._erle_db += (erle_db - self._erle_db) / self._erle_frames
+        else:
+            # Either someone talks over the agent, or a clock slip or dropout
+            # moved the echo. The fitted gain keeps a misaligned reference
+            # from removing much, so keep subtracting while looking again
+            self._misses += 1
+            if self._misses >= MAX_MISSES:
+                self._misses = 0
+                self._estimate_delay()
+
+        if np.sqrt(residual_energy / count) < RESIDUAL_LEVEL:
+            samples[:] = 0
+            self.suppressed_frames += 1
+            return samples
+        # Keep whatever the meeting says over the agent
+        float32_to_int16(residual, samples, self._buffer("scaled", count))
+        self.cancelled_frames += 1
+        return samples
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the echo delay, frame counts and mean echo reduction."""
+        return {
+            "mode": self.mode,
+            "delay_ms": (
+                None if self.delay is None else self.delay / self.sample_rate * 1000
+            ),
+            "frames": self.frames,
+            "echo_frames": self.echo_frames,
+            "suppressed_frames": self.suppressed_frames,
+            "cancelled_frames": self.cancelled_frames,
+            "unmatched_frames": self.unmatched_frames,
+            "erle_db": float(self._erle_db),
+            "estimates": self.estimates,
+        }
+
+    def _remember(self, frame: np.ndarray) -> None:
+        """Write a frame into the recent input, before it is counted."""
+        size = len(self._recent)
+        end = self._captured + len(frame)
+        frame = frame[-size:]
+        start = (end - len(frame)) % size
+        first = min(len(frame), size - start)
+        self._recent[start : start + first] = frame[:first]
+        self._recent[: len(frame) - first] = frame[first:]
+
+    def _estimate_delay(self) -> None:
+        """Find the echo delay by correlating recent input with the reference."""
+        self._since_estimate = 0
+        self.estimates += 1
+        window = len(self._recent)
+        end = self._captured
+        if end < window:
+            return
+        # Unroll the recent input, oldest first
+        recent = self._buffer("recent", window)
+        oldest = end % window
+        recent[: window - oldest] = self._recent[oldest:]
+        recent[window - oldest :] = self._recent[:oldest]
+        # Reference samples that could have produced the recent input
+        reference = self._reference_segment(
+            end - window - self.max_delay, window + self.max_delay, "search"
+        )
+
+        size = 1 << int(np.ceil(np.log2(len(reference) + window)))
+        spectrum = np.fft.rfft(reference, size) * np.conj(np.fft.rfft(recent, size))
+        correlation = np.fft.irfft(spectrum, size)[: self.max_delay + 1]
+        energy = np.cumsum(np.concatenate(([0.0], reference.astype(np.float64) ** 2)))
+        windows = (
+            energy[window : window + self.max_delay + 1] - energy[: self.max_delay + 1]
+        )
+        recent_energy = float(np.dot(recent, recent))
+        scores = correlation / np.sqrt(np.maximum(windows * recent_energy, 1e-12))
+
+        offset = int(np.argmax(scores))
+        # Keep the current delay unless the echo is clearly elsewhere
+        if scores[offset] >= MIN_CORRELATION:
+            self.delay = self.max_delay - offset
+
+    def _reference_segment(self, start: int, count: int, name: str) -> np.ndarray:
+        """Copy played samples [start, start + count) into a work buffer.
+
+        Samples not played yet, or too old to be kept, read as silence.
+        """
+        out = self._buffer(name, count)
+        out[:] = 0
+        size = len(self._reference)
+        first = max(start, self._played - size, 0)
+        last = min(start + count, self._played)
+        position = first
+        while position < last:
+            offset = position % size
+            chunk = min(last - position, size - offset)
+            out[position - start : position - start + chunk] = self._reference[
+                offset : offset + chunk
+            ]
+            position += chunk
+        return out
+
+    def _buffer(self, name: str, count: int) -> np.ndarray:
+        """Return a reusable float32 work buffer of count samples."""
+        buffer = self._buffers.get(name)
+        if buffer is None or len(buffer) < count:
+            buffer = self._buffers[name] = np.empty(count, dtype=np.float32)
+        return buffer[:count]
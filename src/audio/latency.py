@@ -0,0 +1,156 @@
+"""Low-latency audio stream profiles, jitter buffering and latency metering.
+
+Every device hop buffers at least one block before any processing happens,
+so the block size sets a floor on turn-taking latency. The low-latency
+profile uses 10 ms blocks and asks PortAudio for its low latency setting.
+Small blocks leave no slack when synthesis stalls, so output then goes
+through an adaptive jitter buffer that holds back a small prebuffer and
+grows it only after playback actually runs dry.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .ring_buffer import AudioRingBuffer
+
+# Overrides applied on top of each caller's own block size and latency
+STREAM_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "low_latency": {"block_duration": 0.01, "latency": "low", "jitter_buffer": True},
+}
+
+
+def get_stream_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """Return a stream profile, by default the one GROQUETTE_AUDIO_PROFILE names.
+
+    Raises:
+        ValueError: If the profile does not exist.
+    """
+    name = name or os.getenv("GROQUETTE_AUDIO_PROFILE", "default")
+    if name not in STREAM_PROFILES:
+        raise ValueError(
+            f"Unknown audio profile '{name}', expected one of {sorted(STREAM_PROFILES)}"
+        )
+    return STREAM_PROFILES[name]
+
+
+class AdaptiveJitterBuffer:
+    """Plays from a ring after a prebuffer that adapts to underruns.
+
+    Each segment starts playing once ``target`` seconds of audio are
+    buffered. If playback runs dry while audio is still expected, the target
+    grows by ``step`` and playback pauses to rebuffer. After ``decay_after``
+    seconds of clean playback the target shrinks by ``step`` again.
+    """
+
+    def __init__(
+        self,
+        ring: AudioRingBuffer,
+        sample_rate: int,
+        min_delay: float = 0.02,
+        max_delay: float = 0.2,
+        step: float = 0.02,
+        decay_after: float = 10.0,
+    ) -> None:
+        """Initialize the jitter buffer.
+
+        Args:
+            ring: Ring the producer writes synthesized audio into.
+            sample_rate: Sample rate of the ring's frames.
+            min_delay: Smallest prebuffer in seconds.
+            max_delay: Largest prebuffer in seconds.
+            step: Seconds the prebuffer grows or shrinks by.
+            decay_after: Seconds of clean playback before it shrinks.
+        """
+        self.ring = ring
+        self.min_frames = int(min_delay * sample_rate)
+        self.max_frames = int(max_delay * sample_rate)
+        self.step_frames = int(step * sample_rate)
+        self.decay_frames = int(decay_after * sample_rate)
+        self.sample_rate = sample_rate
+        self.target = self.min_frames
+        self.rebuffers = 0
+        self._buffering = True
+        self._clean_frames = 0
+
+    def fill_output(self, outdata: np.ndarray, expect_data: bool = True) -> int:
+        """Fill a PortAudio output block, see AudioRingBuffer.fill_output.
+
+        Args:
+            outdata: The callback's output array.
+            expect_data: More audio is coming; when False (e.g. the segment
+                was flushed) whatever is buffered plays without waiting.
+        """
+        if self._buffering:
+            if expect_data and self.ring.available < self.target:
+                outdata[:] = 0
+                return 0
+            self._buffering = False
+
+        count = self.ring.fill_output(outdata, expect_data)
+        if expect_data and count < len(outdata):
+            # Ran dry mid-segment: hold back more audio from now on
+            self.target = min(self.target + self.step_frames, self.max_frames)
+            self.rebuffers += 1
+            self._buffering = True
+            self._clean_frames = 0
+        elif count == 0:
+            # Idle, prebuffer the next segment
+            self._buffering = True
+        else:
+            self._clean_frames += count
+            if self._clean_frames >= self.decay_frames:
+                self.target = max(self.target - self.step_frames, self.min_frames)
+                self._clean_frames = 0
+        return count
+
+    def stats(self) -> Dict[str, float]:
+        """Return the current prebuffer in ms and the number of rebuffers."""
+        return {
+            "target_ms": self.target / self.sample_rate * 1000,
+            "rebuffers": self.rebuffers,
+        }
+
+
+class LatencyMeter:
+    """Measures device latency from PortAudio callback timestamps.
+
+    The timestamps say when a block was captured at the ADC or will be
+    played at the DAC, relative to the callback, which is the latency the
+    device actually adds rather than the one PortAudio was configured for.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty meter."""
+        self.count = 0
+        self.last = 0.0
+        self.mean = 0.0
+        self.max = 0.0
+
+    def record_input(self, time_info: Any) -> None:
+        """Record the latency of an input block from its callback time info."""
+        self._record(time_info.currentTime - time_info.inputBufferAdcTime)
+
+    def record_output(self, time_info: Any) -> None:
+        """Record the latency of an output block from its callback time info."""
+        self._record(time_info.outputBufferDacTime - time_info.currentTime)
+
+    def _record(self, latency: float) -> None:
+        """Update the running statistics."""
+        # Some host APIs report no timestamps
+        if latency <= 0:
+            return
+        self.count += 1
+        self.last = latency
+        self.mean += (latency - self.mean) / self.count
+        self.max = max(self.max, latency)
+
+    def stats(self) -> Dict[str, float]:
+        """Return the last, mean and maximum latency in ms."""
+        return {
+            "last_ms": self.last * 1000,
+            "mean_ms": self.mean * 1000,
+            "max_ms": self.max * 1000,
+        }
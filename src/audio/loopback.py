@@ -0,0 +1,253 @@
+"""Loopback latency and glitch diagnostics for a virtual audio device pair.
+
+Plays a repeating probe through the output device and records the input
+device in the same duplex stream, so both sides share one sample clock:
+a short chirp per period, followed by a steady tone. Cross-correlating each
+period's recording with the chirp gives the round-trip latency. With the
+recording aligned, silent stretches inside the tone are dropouts. Stream
+xruns come from the PortAudio callback flags. Together they catch
+mis-sized buffers and overloaded hosts before they show up as laggy bots.
+"""
+
+import json
+import platform
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import sounddevice as sd
+
+from .ring_buffer import AudioRingBuffer
+
+PROBE_PERIOD = 1.0  # One latency measurement per second
+CHIRP_DURATION = 0.1
+CHIRP_BAND = (300.0, 6000.0)
+CHIRP_LEVEL = 0.5
+TONE_FREQUENCY = 1000.0
+TONE_LEVEL = 0.25
+# Weakest normalized correlation accepted as a detected chirp
+MIN_CORRELATION = 0.5
+# Blocks quieter than this within the aligned tone count as dropouts
+DROPOUT_BLOCK = 0.001
+DROPOUT_LEVEL = 0.02
+# Worst round-trip latency that still passes
+MAX_LATENCY_MS = 250.0
+
+XRUN_FLAGS = (
+    "input_overflow",
+    "input_underflow",
+    "output_overflow",
+    "output_underflow",
+)
+
+
+def make_probe(sample_rate: int) -> np.ndarray:
+    """Build one probe period: a logarithmic chirp, then a steady tone.
+
+    The signal never falls silent, so any silence in the recording is a
+    dropout rather than part of the probe.
+    """
+    period = np.zeros(int(sample_rate * PROBE_PERIOD), dtype=np.float32)
+    chirp = make_chirp(sample_rate)
+    period[: len(chirp)] = chirp
+
+    t = np.arange(len(period) - len(chirp)) / sample_rate
+    period[len(chirp) :] = TONE_LEVEL * np.sin(2 * np.pi * TONE_FREQUENCY * t)
+    return period
+
+
+def make_chirp(sample_rate: int) -> np.ndarray:
+    """Return the chirp at the start of each probe period."""
+    start, end = CHIRP_BAND
+    t = np.arange(int(sample_rate * CHIRP_DURATION)) / sample_rate
+    rate = np.log(end / start) / CHIRP_DURATION
+    chirp = np.sin(2 * np.pi * start * (np.exp(rate * t) - 1) / rate)
+    return (CHIRP_LEVEL * chirp * np.hanning(len(t))).astype(np.float32)
+
+
+def find_chirp(recording: np.ndarray, chirp: np.ndarray) -> Dict[str, float]:
+    """Locate the chirp in a recording by FFT cross-correlation.
+
+    Returns:
+        Dict with the sample offset of the best match and its normalized
+        correlation (1.0 is a perfect copy at any level).
+    """
+    size = 1 << int(np.ceil(np.log2(len(recording) + len(chirp))))
+    spectrum = np.fft.rfft(recording, size) * np.conj(np.fft.rfft(chirp, size))
+    correlation = np.fft.irfft(spectrum, size)[: len(recording) - len(chirp) + 1]
+    offset = int(np.argmax(np.abs(correlation)))
+
+    # Normalize by the energy of the matched stretch of recording
+    energy = np.cumsum(np.concatenate(([0.0], recording.astype(np.float64) ** 2)))
+    window = energy[offset + len(chirp)] - energy[offset]
+    norm = np.sqrt(window * np.sum(chirp.astype(np.float64) ** 2))
+    score = float(abs(correlation[offset]) / norm) if norm > 0 else 0.0
+    return {"offset": offset, "correlation": score}
+
+
+def count_dropouts(recording: np.ndarray, sample_rate: int) -> Dict[str, float]:
+    """Count stretches of silence in a recording that should be all tone.
+
+    Returns:
+        Dict with the number of silent stretches and their total duration.
+    """
+    block = max(1, int(sample_rate * DROPOUT_BLOCK))
+    usable = len(recording) // block * block
+    blocks = recording[:usable].reshape(-1, block)
+    silent = np.sqrt(np.mean(blocks**2, axis=1)) < DROPOUT_LEVEL
+    # A dropout starts wherever a silent block follows a loud one
+    starts = np.count_nonzero(silent[1:] & ~silent[:-1]) + int(silent[:1].sum())
+    return {
+        "count": int(starts),
+        "duration_ms": float(silent.sum() * block / sample_rate * 1000),
+    }
+
+
+class LoopbackProbe:
+    """Duplex stream callback that plays the probe and records the input."""
+
+    def __init__(self, sample_rate: int) -> None:
+        """Preallocate the probe and a recording ring with 2 s of headroom."""
+        self.signal = make_probe(sample_rate)
+        self.recording = AudioRingBuffer(sample_rate * 2, dtype=np.float32)
+        self.position = 0
+        self.xruns = {flag: 0 for flag in XRUN_FLAGS}
+
+    def callback(
+        self,
+        indata: np.ndarray,
+        outdata: np.ndarray,
+        frames: int,
+        time_: Any,
+        status: Any,
+    ) -> None:
+        """Record the input block and play the next block of the probe."""
+        if status:
+            for flag in XRUN_FLAGS:
+                if getattr(status, flag, False):
+                    self.xruns[flag] += 1
+        self.recording.write(indata)
+
+        written = 0
+        while written < frames:
+            start = self.position % len(self.signal)
+            count = min(frames - written, len(self.signal) - start)
+            outdata[written : written + count, 0] = self.signal[start : start + count]
+            written += count
+            self.position += count
+
+
+def run_loopback_diagnostics(
+    input_device: Optional[int],
+    output_device: Optional[int],
+    stream_settings: Dict[str, Any],
+    soak_seconds: float = 10.0,
+) -> Dict[str, Any]:
+    """Measure round-trip latency, dropouts and xruns of a device loopback.
+
+    Args:
+        input_device: Device that records what the output device plays,
+            e.g. the BlackHole input.
+        output_device: Device the probe is played on.
+        stream_settings: samplerate, blocksize and latency to test, as
+            resolved for the helper streams.
+        soak_seconds: How long to keep measuring; longer soaks catch
+            occasional glitches on a loaded host.
+
+    Returns:
+        A JSON-serializable report, with ``passed`` summarizing it.
+    """
+    sample_rate = int(stream_settings["samplerate"])
+    probe = LoopbackProbe(sample_rate)
+    chirp = make_chirp(sample_rate)
+    period = len(probe.signal)
+    periods = max(1, int(np.ceil(soak_seconds / PROBE_PERIOD)))
+
+    # Analyze two periods at a time: a chirp emitted at the start of the
+    # window arrives within one period, followed by a full period of probe
+    window = np.zeros(2 * period, dtype=np.float32)
+    latencies = []
+    detected = 0
+    dropouts = 0
+    dropout_ms = 0.0
+
+    stream = sd.Stream(
+        device=(input_device, output_device),
+        samplerate=sample_rate,
+        channels=1,
+        dtype="float32",
+        blocksize=stream_settings.get("blocksize", 0),
+        latency=stream_settings.get("latency"),
+        callback=probe.callback,
+    )
+    with stream:
+        filled = 0
+        for _ in range(periods):
+            while filled < len(window):
+                filled += probe.recording.read_into(window[filled:, None])
+                if filled < len(window):
+                    time.sleep(0.05)
+
+            match = find_chirp(window[: period + len(chirp)], chirp)
+            if match["correlation"] >= MIN_CORRELATION:
+                detected += 1
+                latencies.append(match["offset"] / sample_rate * 1000)
+                # The rest of this period is tone that must not drop out
+                start = match["offset"] + len(chirp)
+                result = count_dropouts(
+                    window[start : match["offset"] + period], sample_rate
+                )
+                dropouts += result["count"]
+                dropout_ms += result["duration_ms"]
+
+            window[:period] = window[period:]
+            filled = period
+        reported_latency = stream.latency
+
+    latency = None
+    if latencies:
+        values = np.array(latencies)
+        latency = {
+            "min_ms": float(values.min()),
+            "mean_ms": float(values.mean()),
+            "max_ms": float(values.max()),
+            "jitter_ms": float(values.std()),
+        }
+    xruns = sum(probe.xruns.values())
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "input_device": input_device,
+        "output_device": output_device,
+        "sample_rate": sample_rate,
+        "blocksize": stream_settings.get("blocksize"),
+        "latency_setting": stream_settings.get("latency"),
+        "reported_latency_ms": [value * 1000 for value in reported_latency],
+        "soak_seconds": periods * PROBE_PERIOD,
+        "probes": periods,
+        "probes_detected": detected,
+        "round_trip_latency": latency,
+        "dropouts": dropouts,
+        "dropout_ms": dropout_ms,
+        "xruns": probe.xruns,
+        "recording_overruns": probe.recording.overruns,
+        "passed": (
+            detected == periods
+            and dropouts == 0
+            and xruns == 0
+            and probe.recording.overruns == 0
+            and latency["max_ms"] <= MAX_LATENCY_MS
+        ),
+    }
+
+
+def write_report(report: Dict[str, Any], path: Optional[str] = None) -> None:
+    """Write a diagnostics report as JSON to a file, or print it."""
+    text = json.dumps(report, indent=2)
+    if path is None:
+        print(text)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+    print(f"📝 Loopback report written to {path}")
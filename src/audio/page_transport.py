@@ -0,0 +1,291 @@
+"""Agent side of the page audio transport.
+
+The worker connects to each meeting's browser page over the Chrome DevTools
+protocol. Runtime bindings deliver the meeting audio captured in the page,
+and the agent's speech is streamed back to the page's synthetic microphone
+by evaluating calls into the page script. See src/meeting/page_audio.py for
+the page script and the message format.
+"""
+
+import asyncio
+import base64
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from livekit import rtc
+from livekit.agents.voice.io import AudioInput, AudioOutput, AudioOutputCapabilities
+
+from src.meeting.devtools import CONNECT_TIMEOUT, DevToolsConnection
+from src.meeting.page_audio import (
+    PAGE_AUDIO_BINDING,
+    PAGE_AUDIO_SAMPLE_RATE,
+    PAGE_REPORT_BINDING,
+)
+
+from .pipeline import AudioFormat, AudioPipeline, SPEECH_SAMPLE_RATE
+
+MAX_QUEUED_FRAMES = 50  # About 1 s of meeting audio before old frames are dropped
+
+# Sends a batch of messages to the page script
+PageSender = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+class PageAudioInput(AudioInput):
+    """Meeting audio captured in the page, as session input frames."""
+
+    # Page audio uses no sound device, see MultiMeetingWorker._devices_in_use
+    device = None
+
+    def __init__(
+        self,
+        label: str = "Meeting page audio",
+        session_rate: int = SPEECH_SAMPLE_RATE,
+    ) -> None:
+        """Initialize the input.
+
+        Args:
+            session_rate: Sample rate of the frames handed to the session.
+        """
+        super().__init__(label=label)
+        self._queue: "asyncio.Queue[Optional[rtc.AudioFrame]]" = asyncio.Queue(
+            maxsize=MAX_QUEUED_FRAMES
+        )
+        self._pipeline = AudioPipeline(
+            AudioFormat(PAGE_AUDIO_SAMPLE_RATE), AudioFormat(session_rate)
+        )
+
+    def push(self, data: Optional[bytes]) -> None:
+        """Queue PCM from the page, dropping the oldest frame if behind."""
+        frame = None
+        if data is not None:
+            samples = self._pipeline.process(np.frombuffer(data, dtype=np.int16))
+            frame = rtc.AudioFrame(
+                samples.tobytes(), self._pipeline.target.sample_rate, 1, len(samples)
+            )
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(frame)
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        """Return the next meeting audio frame."""
+        frame = await self._queue.get()
+        if frame is None:
+            raise StopAsyncIteration
+        return frame
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of frames waiting for the session."""
+        return {"available": self._queue.qsize()}
+
+    def close(self) -> None:
+        """End the frame stream."""
+        self.push(None)
+
+
+class PageAudioOutput(AudioOutput):
+    """Streams a session's speech to the page's synthetic microphone.
+
+    Audio and segment markers go out in order through one sender task, in
+    batches of whatever queued up meanwhile; the page reports playback
+    progress and the end of each segment back.
+    """
+
+    device = None
+
+    def __init__(self, label: str = "Meeting page microphone") -> None:
+        """Initialize the output."""
+        super().__init__(
+            label=label,
+            capabilities=AudioOutputCapabilities(pause=False),
+            sample_rate=PAGE_AUDIO_SAMPLE_RATE,
+        )
+        self._outgoing: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._sender: Optional[asyncio.Task] = None
+        self._segment_id = 0
+        self._segment_active = False
+        self._pushed_duration = 0.0
+        self._played_samples = 0
+
+    @property
+    def connected(self) -> bool:
+        """Whether a page is connected to play the audio."""
+        return self._sender is not None
+
+    def connect(self, send: PageSender) -> None:
+        """Start streaming to a page, replacing any earlier connection."""
+        self.disconnect()
+        self._sender = asyncio.create_task(self._send_loop(send))
+
+    def disconnect(self) -> None:
+        """Stop streaming; a segment still playing counts as interrupted."""
+        if self._sender is not None:
+            self._sender.cancel()
+            self._sender = None
+        self.interrupt()
+
+    def interrupt(self) -> None:
+        """Drop unsent audio and end the segment, e.g. after a page reload."""
+        self._drain_outgoing()
+        self._finish_segment(self._segment_id, interrupted=True)
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        """Send a synthesized frame to the page."""
+        await super().capture_frame(frame)
+
+        started = not self._segment_active
+        if started:
+            self._segment_id += 1
+            self._segment_active = True
+            self._pushed_duration = 0.0
+            self._played_samples = 0
+            self._send({"type": "start", "segment": self._segment_id})
+        data = base64.b64encode(frame.data.cast("B")).decode("ascii")
+        self._send({"type": "audio", "data": data})
+        self._pushed_duration += frame.duration
+
+        if started:
+            self.on_playback_started(created_at=time.time())
+
+    def flush(self) -> None:
+        """Mark the current segment complete; it finishes once it has played."""
+        super().flush()
+        if not self._segment_active:
+            return
+        if self.connected:
+            self._send({"type": "end", "segment": self._segment_id})
+        else:
+            # Nothing will report back, the audio went nowhere
+            self._finish_segment(self._segment_id, interrupted=False)
+
+    def clear_buffer(self) -> None:
+        """Stop playback immediately, e.g. when the user interrupts."""
+        self._drain_outgoing()
+        self._send({"type": "clear"})
+        self._finish_segment(self._segment_id, interrupted=True)
+
+    def handle_report(self, report: Dict[str, Any]) -> None:
+        """Apply a progress or finished report from the page."""
+        if report.get("segment") != self._segment_id:
+            return
+        self._played_samples = int(report.get("played", 0))
+        if report.get("type") == "finished":
+            self._finish_segment(self._segment_id, interrupted=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return whether a page is connected and how much is unsent."""
+        return {"connected": self.connected, "unsent": self._outgoing.qsize()}
+
+    def close(self) -> None:
+        """Stop streaming to the page."""
+        self.disconnect()
+
+    def _finish_segment(self, segment_id: int, interrupted: bool) -> None:
+        """Report the end of a segment once."""
+        if not self._segment_active or segment_id != self._segment_id:
+            return
+        self._segment_active = False
+        position = min(self._played_samples / self.sample_rate, self._pushed_duration)
+        self.on_playback_finished(playback_position=position, interrupted=interrupted)
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        """Queue a message behind the audio sent so far."""
+        if self.connected:
+            self._outgoing.put_nowait(message)
+
+    def _drain_outgoing(self) -> None:
+        """Drop everything not yet sent to the page."""
+        while not self._outgoing.empty():
+            self._outgoing.get_nowait()
+
+    async def _send_loop(self, send: PageSender) -> None:
+        """Send queued audio and markers to the page in order."""
+        try:
+            while True:
+                batch = [await self._outgoing.get()]
+                while not self._outgoing.empty():
+                    batch.append(self._outgoing.get_nowait())
+                await send(batch)
+        except ConnectionError:
+            # The browser went away; the meeting is reattached after a restart
+            pass
+
+
+class PageAudioChannel:
+    """DevTools connection to one meeting's page, carrying its audio.
+
+    Owns the session input and output of the meeting. Bindings added here
+    survive page reloads, so one connection lasts as long as the browser.
+    """
+
+    def __init__(self, endpoint: str) -> None:
+        """Initialize the channel.
+
+        Args:
+            endpoint: DevTools WebSocket URL of the meeting page.
+        """
+        self.endpoint = endpoint
+        self.input = PageAudioInput()
+        self.output = PageAudioOutput()
+        self._devtools = DevToolsConnection(
+            endpoint, self._handle_event, on_close=self._on_disconnect
+        )
+
+    async def start(self) -> None:
+        """Connect to the page and install the audio bindings.
+
+        Raises:
+            ConnectionError: If the page cannot be reached.
+        """
+        try:
+            await asyncio.wait_for(self._install(), CONNECT_TIMEOUT)
+        except (ConnectionError, RuntimeError, asyncio.TimeoutError) as e:
+            await self.close()
+            raise ConnectionError(f"Cannot reach the meeting page: {e}") from e
+
+        self.output.connect(self._deliver)
+        print("🎧 Page audio connected")
+
+    async def _install(self) -> None:
+        """Open the DevTools connection and add the bindings the page calls."""
+        await self._devtools.connect()
+        for binding in (PAGE_AUDIO_BINDING, PAGE_REPORT_BINDING):
+            await self._devtools.command("Runtime.addBinding", {"name": binding})
+        # Reports navigations, see _handle_event
+        await self._devtools.command("Runtime.enable")
+
+    async def close(self) -> None:
+        """Stop the audio in both directions and disconnect from the page."""
+        self.output.close()
+        self.input.close()
+        await self._devtools.close()
+
+    async def _deliver(self, messages: List[Dict[str, Any]]) -> None:
+        """Hand a batch of messages to the page script."""
+        expression = (
+            "window.__groquettePageAudio && "
+            f"window.__groquettePageAudio.receive({json.dumps(messages)})"
+        )
+        try:
+            await self._devtools.command("Runtime.evaluate", {"expression": expression})
+        except RuntimeError:
+            # The page is between documents; the navigation interrupts the
+            # segment anyway
+            pass
+
+    def _on_disconnect(self) -> None:
+        """Stop sending once the browser has gone away."""
+        self.output.disconnect()
+        print("🎧 Page audio disconnected")
+
+    def _handle_event(self, method: str, params: Dict[str, Any]) -> None:
+        """Route binding calls from the page script to the session."""
+        if method == "Runtime.bindingCalled":
+            if params.get("name") == PAGE_AUDIO_BINDING:
+                self.input.push(base64.b64decode(params["payload"]))
+            elif params.get("name") == PAGE_REPORT_BINDING:
+                self.output.handle_report(json.loads(params["payload"]))
+        elif method == "Runtime.executionContextsCleared":
+            # The page navigated or reloaded, and its queued audio is gone
+            self.output.interrupt()
@@ -0,0 +1,252 @@
+"""Explicit sample rate, sample format and channel layout conversion.
+
+Meeting audio changes shape several times: devices and the page transport
+run at 24 kHz int16, Meet at 48 kHz, Silero VAD and Whisper at 16 kHz. Left
+implicit, every consumer (VAD stream, STT stream) resamples the same audio
+again on its own. An AudioPipeline converts once, at the edge, with
+polyphase filters that are designed once per rate pair and cached, and with
+work buffers that are reused from frame to frame.
+
+Results are views into the pipeline's buffers and stay valid until the
+next call; copy them (e.g. with ``tobytes()``) to keep them.
+"""
+
+from functools import lru_cache
+from math import gcd
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import numpy as np
+from livekit import rtc
+
+# Silero VAD and Whisper both run at 16 kHz
+SPEECH_SAMPLE_RATE = 16000
+
+# Sinc zero crossings on each side of the filter's centre
+ZERO_CROSSINGS = 16
+KAISER_BETA = 8.0
+MAX_CACHED_LAYOUTS = 32
+
+
+class AudioFormat(NamedTuple):
+    """Sample rate, channel count and sample type of an audio stream."""
+
+    sample_rate: int
+    channels: int = 1
+    dtype: type = np.int16
+
+
+@lru_cache(maxsize=None)
+def polyphase_filter(
+    up: int, down: int, zero_crossings: int = ZERO_CROSSINGS
+) -> np.ndarray:
+    """Design the anti-aliasing filter for resampling by up/down.
+
+    A Kaiser-windowed sinc low-pass just below the lower of the two Nyquist
+    rates, split into ``up`` phases. Cached, so every stream with the same
+    rate pair shares one filter bank.
+
+    Returns:
+        Float32 array of shape (up, taps per phase); row p holds the taps
+        applied at phase p, newest input sample first.
+    """
+    taps_per_phase = -(-2 * zero_crossings * max(up, down) // up)
+    taps = up * taps_per_phase
+    cutoff = 0.5 / max(up, down) * 0.95
+    n = np.arange(taps) - (taps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(taps, KAISER_BETA)
+    # Zero insertion divides the signal energy by `up`
+    h *= up / h.sum()
+    return h.reshape(taps_per_phase, up).T.astype(np.float32)
+
+
+class PolyphaseResampler:
+    """Streaming rational resampler for float32 frames of shape (n, channels).
+
+    Keeps the last input samples between calls, so consecutive frames are
+    filtered as one continuous signal without edge clicks.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int, channels: int = 1) -> None:
+        """Initialize the resampler.
+
+        Args:
+            input_rate: Sample rate of the frames passed to process().
+            output_rate: Sample rate of the frames it returns.
+            channels: Channels per frame.
+        """
+        divisor = gcd(input_rate, output_rate)
+        self.up = output_rate // divisor
+        self.down = input_rate // divisor
+        self.channels = channels
+        self.bank = polyphase_filter(self.up, self.down)
+        self.history = self.bank.shape[1] - 1
+
+        # Input buffer: the kept history followed by the new frame
+        self._input = np.zeros((self.history, channels), dtype=np.float32)
+        self._gather = np.empty((0, self.bank.shape[1], channels), dtype=np.float32)
+        self._output = np.empty((0, channels), dtype=np.float32)
+        # Position of the next output in the upsampled input buffer
+        self._position = self.history * self.up
+        self._layouts: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        """Resample a frame, returning a view of the output buffer."""
+        length = self.history + len(frames)
+        if len(self._input) < length:
+            grown = np.zeros((length, self.channels), dtype=np.float32)
+            grown[: self.history] = self._input[: self.history]
+            self._input = grown
+        self._input[self.history : length] = frames
+
+        indices, coefficients = self._layout(length, self._position)
+        count = len(indices)
+        if len(self._gather) < count:
+            self._gather = np.empty(
+                (count, self.bank.shape[1], self.channels), dtype=np.float32
+            )
+            self._output = np.empty((count, self.channels), dtype=np.float32)
+
+        gather = self._gather[:count]
+        output = self._output[:count]
+        np.take(self._input[:length], indices, axis=0, out=gather, mode="clip")
+        np.einsum("mkc,mk->mc", gather, coefficients, out=output)
+
+        # Keep the newest samples as history for the next frame
+        self._input[: self.history] = self._input[length - self.history : length]
+        self._position += count * self.down - (length - self.history) * self.up
+        return output
+
+    def _layout(self, length: int, position: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the gather indices and taps for a buffer length and position.
+
+        Steady frame sizes cycle through a handful of layouts, so they are
+        computed once and cached.
+        """
+        key = (length, position)
+        layout = self._layouts.get(key)
+        if layout is None:
+            count = max(0, (length * self.up - 1 - position) // self.down + 1)
+            upsampled = position + np.arange(count) * self.down
+            newest = upsampled // self.up
+            indices = newest[:, None] - np.arange(self.bank.shape[1])[None, :]
+            coefficients = self.bank[upsampled % self.up]
+            if len(self._layouts) >= MAX_CACHED_LAYOUTS:
+                self._layouts.clear()
+            layout = self._layouts[key] = (indices, coefficients)
+        return layout
+
+
+class AudioPipeline:
+    """Converts frames from one AudioFormat to another.
+
+    Converts to float32, downmixes, resamples, upmixes and converts to the
+    target sample type, skipping every step that is not needed.
+    """
+
+    def __init__(self, source: AudioFormat, target: AudioFormat) -> None:
+        """Initialize the pipeline.
+
+        Raises:
+            ValueError: If the channel layouts cannot be converted; only
+                mono to N channels and N channels to mono are supported.
+        """
+        if source.channels != target.channels and 1 not in (
+            source.channels,
+            target.channels,
+        ):
+            raise ValueError(
+                f"Cannot convert {source.channels} to {target.channels} channels"
+            )
+        self.source = source
+        self.target = target
+        # Resample as few channels as possible
+        resample_channels = min(source.channels, target.channels)
+        self._resampler = None
+        if source.sample_rate != target.sample_rate:
+            self._resampler = PolyphaseResampler(
+                source.sample_rate, target.sample_rate, resample_channels
+            )
+        self._buffers: Dict[str, np.ndarray] = {}
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        """Convert samples of shape (n, channels) or (n,) for mono."""
+        frames = frames.reshape(-1, self.source.channels)
+        samples = self._to_float(frames)
+        if self.target.channels < self.source.channels:
+            samples = self._remix(samples, self.target.channels)
+        if self._resampler is not None:
+            samples = self._resampler.process(samples)
+        if self.target.channels > self.source.channels:
+            samples = self._remix(samples, self.target.channels)
+        return self._from_float(samples)
+
+    def process_frame(self, frame: rtc.AudioFrame) -> rtc.AudioFrame:
+        """Convert an int16 LiveKit frame into a new frame in the target format."""
+        converted = self.process(np.frombuffer(frame.data, dtype=np.int16))
+        if converted.dtype != np.int16:
+            converted = self._to_int16(converted, "frame")
+        return rtc.AudioFrame(
+            converted.tobytes(),
+            self.target.sample_rate,
+            self.target.channels,
+            len(converted),
+        )
+
+    def _to_float(self, frames: np.ndarray) -> np.ndarray:
+        """Convert input samples to float32."""
+        if frames.dtype == np.float32:
+            return frames
+        return int16_to_float32(frames, self._buffer("float", frames.shape, np.float32))
+
+    def _from_float(self, samples: np.ndarray) -> np.ndarray:
+        """Convert float32 samples to the target sample type."""
+        if np.dtype(self.target.dtype) == np.float32:
+            return samples
+        return self._to_int16(samples, "int")
+
+    def _to_int16(self, samples: np.ndarray, name: str) -> np.ndarray:
+        """Convert float32 samples to int16 in the named work buffer."""
+        return float32_to_int16(
+            samples,
+            self._buffer(name, samples.shape, np.int16),
+            self._buffer("scaled", samples.shape, np.float32),
+        )
+
+    def _remix(self, samples: np.ndarray, channels: int) -> np.ndarray:
+        """Downmix to mono by averaging, or copy mono to every channel."""
+        out = self._buffer(f"remix{channels}", (len(samples), channels), np.float32)
+        if channels == 1:
+            np.mean(samples, axis=1, keepdims=True, out=out)
+        else:
+            out[:] = samples
+        return out
+
+    def _buffer(self, name: str, shape: Tuple[int, ...], dtype: type) -> np.ndarray:
+        """Return a reusable work buffer of at least shape, as a view of shape."""
+        buffer = self._buffers.get(name)
+        if buffer is None or len(buffer) < shape[0]:
+            buffer = self._buffers[name] = np.empty(shape, dtype=dtype)
+        return buffer[: shape[0]]
+
+
+def int16_to_float32(samples: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """Scale int16 samples to float32 in [-1, 1) into out."""
+    np.multiply(samples, np.float32(1 / 32768), out=out, casting="unsafe")
+    return out
+
+
+def float32_to_int16(
+    samples: np.ndarray, out: np.ndarray, scratch: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Scale, round and clip float32 samples to int16 into out.
+
+    Args:
+        samples: Float32 samples, nominally in [-1, 1].
+        out: Int16 array of the same shape.
+        scratch: Float32 work array of the same shape, allocated if omitted.
+    """
+    scaled = np.multiply(samples, np.float32(32768), out=scratch)
+    np.rint(scaled, out=scaled)
+    np.clip(scaled, -32768, 32767, out=scaled)
+    np.copyto(out, scaled, casting="unsafe")
+    return out
@@ -0,0 +1,209 @@
+"""Preallocated single-producer/single-consumer ring buffer for audio.
+
+PortAudio calls stream callbacks on its own thread, where allocating Python
+objects (per-sample lists, new byte strings, queue items) invites GC pauses
+and audible glitches. The ring is allocated once; the callback side only
+copies into or out of it, and the other side reads zero-copy views or
+awaits data from asyncio.
+
+Only one thread may write and one thread may read. The write and read
+positions are plain integers that each side alone advances, so no lock is
+needed under the GIL.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Fixed-size SPSC ring of audio frames (samples x channels)."""
+
+    def __init__(self, capacity: int, channels: int = 1, dtype: Any = np.int16) -> None:
+        """Allocate the ring.
+
+        Args:
+            capacity: Frames the ring holds.
+            channels: Samples per frame.
+            dtype: Sample type, e.g. np.int16 or np.float32.
+        """
+        self.capacity = capacity
+        self.channels = channels
+        self._data = np.zeros((capacity, channels), dtype=dtype)
+        # Total frames written and read; positions are taken modulo capacity
+        self._write_index = 0
+        self._read_index = 0
+        # Set by the producer, honored by the consumer, see discard()
+        self._discard_until = 0
+        self.overruns = 0
+        self.underruns = 0
+        self.closed = False
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._readable = asyncio.Event()
+        self._wanted = 0
+
+    @property
+    def available(self) -> int:
+        """Frames ready to read."""
+        return self._write_index - max(self._read_index, self._discard_until)
+
+    @property
+    def free(self) -> int:
+        """Frames that can be written without dropping any."""
+        return self.capacity - (self._write_index - self._read_index)
+
+    # Producer side
+
+    def write(self, frames: np.ndarray) -> int:
+        """Copy frames in, dropping what does not fit (counted as overruns).
+
+        Safe to call from a PortAudio callback: nothing is allocated.
+
+        Returns:
+            Frames written.
+        """
+        count = min(len(frames), self.free)
+        if count < len(frames):
+            self.overruns += len(frames) - count
+
+        start = self._write_index % self.capacity
+        first = min(count, self.capacity - start)
+        self._data[start : start + first] = frames[:first].reshape(first, self.channels)
+        if count > first:
+            self._data[: count - first] = frames[first:count].reshape(
+                count - first, self.channels
+            )
+        self._write_index += count
+
+        wanted = self._wanted
+        if wanted and self.available >= wanted and self._loop is not None:
+            self._wanted = 0
+            self._loop.call_soon_threadsafe(self._readable.set)
+        return count
+
+    def discard(self) -> None:
+        """Drop everything written so far, e.g. when playback is interrupted.
+
+        The consumer skips the frames on its next read, so this is safe to
+        call from the producer.
+        """
+        self._discard_until = self._write_index
+
+    def close(self) -> None:
+        """Mark the stream ended and wake a waiting reader."""
+        self.closed = True
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._readable.set)
+
+    # Consumer side
+
+    def peek(self, frames: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return up to ``frames`` readable frames as two zero-copy views.
+
+        The second view is non-empty when the data wraps around the end of
+        the ring. Call advance() once done with them.
+        """
+        self._apply_discard()
+        count = min(frames, self.available)
+        start = self._read_index % self.capacity
+        first = min(count, self.capacity - start)
+        return self._data[start : start + first], self._data[: count - first]
+
+    def advance(self, frames: int) -> None:
+        """Mark frames returned by peek() as consumed."""
+        self._read_index += min(frames, self.available)
+
+    def skip(self, frames: int) -> None:
+        """Drop the oldest readable frames, e.g. to cap input latency."""
+        self._apply_discard()
+        self.advance(frames)
+
+    def read_into(self, out: np.ndarray) -> int:
+        """Copy up to len(out) frames into out.
+
+        Returns:
+            Frames copied.
+        """
+        head, tail = self.peek(len(out))
+        out[: len(head)] = head
+        out[len(head) : len(head) + len(tail)] = tail
+        count = len(head) + len(tail)
+        self.advance(count)
+        return count
+
+    def fill_output(self, outdata: np.ndarray, expect_data: bool = True) -> int:
+        """Fill a PortAudio output block, padding with silence.
+
+        Args:
+            outdata: The callback's output array.
+            expect_data: Count missing frames as underruns, i.e. playback ran
+                dry while audio was still expected.
+
+        Returns:
+            Frames of real audio written.
+        """
+        count = self.read_into(outdata)
+        outdata[count:] = 0
+        if expect_data and count < len(outdata):
+            self.underruns += len(outdata) - count
+        return count
+
+    async def wait_readable(self, frames: int) -> bool:
+        """Wait until ``frames`` frames can be read.
+
+        Returns:
+            False if the ring was closed before that many arrived.
+        """
+        self._loop = asyncio.get_running_loop()
+        while self.available < frames and not self.closed:
+            self._readable.clear()
+            self._wanted = frames
+            # Re-check after publishing the wanted count, so a write racing
+            # with it cannot be missed
+            if self.available >= frames:
+                break
+            await self._readable.wait()
+        self._wanted = 0
+        return self.available >= frames
+
+    async def read(self, frames: int) -> Optional[np.ndarray]:
+        """Wait for and return a copy of the next ``frames`` frames.
+
+        Returns:
+            The frames, or None once the ring is closed and drained.
+        """
+        if not await self.wait_readable(frames):
+            return None
+        out = np.empty((frames, self.channels), dtype=self._data.dtype)
+        self.read_into(out)
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        """Return fill level and overrun/underrun counts in frames."""
+        return {
+            "capacity": self.capacity,
+            "available": self.available,
+            "overruns": self.overruns,
+            "underruns": self.underruns,
+        }
+
+    def _apply_discard(self) -> None:
+        """Skip frames the producer discarded."""
+        if self._discard_until > self._read_index:
+            self._read_index = self._discard_until
+
+    # Ready-made PortAudio callbacks
+
+    def input_callback(
+        self, indata: np.ndarray, frames: int, time_: Any, status: Any
+    ) -> None:
+        """sounddevice InputStream callback that writes into the ring."""
+        self.write(indata)
+
+    def output_callback(
+        self, outdata: np.ndarray, frames: int, time_: Any, status: Any
+    ) -> None:
+        """sounddevice OutputStream callback that plays from the ring."""
+        self.fill_output(outdata, expect_data=not self.closed)
@@ -0,0 +1,295 @@
+"""Per-session audio input and output bound to a specific sound device.
+
+The LiveKit console I/O always uses the process-wide default devices, so
+only one session per process can have audio. These classes give each
+AgentSession its own device pair, which lets one worker process route many
+meetings through separate virtual devices.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import sounddevice as sd
+from livekit import rtc
+from livekit.agents.voice.io import AudioInput, AudioOutput, AudioOutputCapabilities
+
+from .blackhole import find_audio_device, find_blackhole_device
+from .echo_gate import EchoGate
+from .latency import AdaptiveJitterBuffer, get_stream_profile, LatencyMeter
+from .pipeline import AudioFormat, AudioPipeline, SPEECH_SAMPLE_RATE
+from .ring_buffer import AudioRingBuffer
+
+SAMPLE_RATE = 24000
+FRAME_DURATION = 0.02  # 20 ms blocks
+MAX_QUEUED_FRAMES = 50  # 1 s of microphone audio before old frames are dropped
+OUTPUT_BUFFER_SECONDS = 30  # Synthesized speech buffered ahead of playback
+
+Device = Union[int, str, None]
+
+
+def resolve_device(device: Device, device_type: str = "input") -> Optional[int]:
+    """Resolve a device ID, a device name, or None (BlackHole) to a device ID."""
+    if isinstance(device, int):
+        return device
+    if device:
+        return find_audio_device(device, device_type)
+    return find_blackhole_device(device_type)
+
+
+class DeviceAudioInput(AudioInput):
+    """Streams microphone frames from one input device into a session.
+
+    Frames are converted to the speech models' sample rate once here, rather
+    than separately by the VAD and the STT stream.
+    """
+
+    def __init__(
+        self,
+        device: Optional[int] = None,
+        sample_rate: int = SAMPLE_RATE,
+        label: str = "Meeting microphone",
+        profile: Optional[str] = None,
+        session_rate: int = SPEECH_SAMPLE_RATE,
+        echo_gate: Optional[EchoGate] = None,
+    ) -> None:
+        """Initialize the input; call start() from the session's event loop.
+
+        Args:
+            sample_rate: Sample rate the device is opened at.
+            profile: Stream profile, defaults to GROQUETTE_AUDIO_PROFILE.
+            session_rate: Sample rate of the frames handed to the session.
+            echo_gate: Gate shared with the output playing on the same
+                device, removing the agent's own speech before VAD and STT.
+        """
+        super().__init__(label=label)
+        self.device = device
+        self.sample_rate = sample_rate
+        self.profile = get_stream_profile(profile)
+        self.frame_samples = int(sample_rate * FRAME_DURATION)
+        self._ring = AudioRingBuffer(self.frame_samples * MAX_QUEUED_FRAMES * 2)
+        self._block = np.empty((self.frame_samples, 1), dtype=np.int16)
+        self._pipeline = AudioPipeline(
+            AudioFormat(sample_rate), AudioFormat(session_rate)
+        )
+        self._latency = LatencyMeter()
+        self._echo_gate = echo_gate
+        self._gated_overruns = 0
+        self._stream: Optional[sd.InputStream] = None
+
+    def start(self) -> None:
+        """Open the input device."""
+        block_duration = self.profile.get("block_duration", FRAME_DURATION)
+        self._stream = sd.InputStream(
+            device=self.device,
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="int16",
+            blocksize=int(self.sample_rate * block_duration),
+            latency=self.profile.get("latency"),
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def _callback(self, indata: np.ndarray, frames: int, time_: Any, status) -> None:
+        """Record a device block into the ring."""
+        self._latency.record_input(time_)
+        self._ring.write(indata)
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        """Return the next microphone frame."""
+        # Drop the oldest audio if the session falls behind
+        backlog = self._ring.available - self.frame_samples * MAX_QUEUED_FRAMES
+        if backlog > 0:
+            self._ring.skip(backlog)
+
+        if not await self._ring.wait_readable(self.frame_samples):
+            raise StopAsyncIteration
+        self._ring.read_into(self._block)
+        if self._echo_gate is not None:
+            self._gate_block(max(backlog, 0))
+        samples = self._pipeline.process(self._block)
+        return rtc.AudioFrame(
+            samples.tobytes(), self._pipeline.target.sample_rate, 1, len(samples)
+        )
+
+    def _gate_block(self, skipped: int) -> None:
+        """Remove the agent's echo from the block just read.
+
+        The gate follows the device's sample clock, so it is first told
+        about the audio skipped to catch up and the audio the full ring
+        dropped since the last block.
+        """
+        overruns = self._ring.overruns
+        self._echo_gate.skip(skipped + overruns - self._gated_overruns)
+        self._gated_overruns = overruns
+        self._echo_gate.process(self._block[:, 0])
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the input ring's fill level and overruns, and device latency."""
+        stats: Dict[str, Any] = {
+            **self._ring.stats(),
+            "device_latency": self._latency.stats(),
+        }
+        if self._echo_gate is not None:
+            stats["echo_gate"] = self._echo_gate.stats()
+        return stats
+
+    def close(self) -> None:
+        """Close the input device and end the frame stream."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self._ring.close()
+
+
+class DeviceAudioOutput(AudioOutput):
+    """Plays a session's speech on one output device."""
+
+    def __init__(
+        self,
+        device: Optional[int] = None,
+        sample_rate: int = SAMPLE_RATE,
+        label: str = "Meeting speaker",
+        profile: Optional[str] = None,
+        echo_gate: Optional[EchoGate] = None,
+    ) -> None:
+        """Initialize the output; call start() from the session's event loop.
+
+        Args:
+            profile: Stream profile, defaults to GROQUETTE_AUDIO_PROFILE.
+            echo_gate: Gate told about every block played, see
+                DeviceAudioInput.
+        """
+        super().__init__(
+            label=label,
+            capabilities=AudioOutputCapabilities(pause=False),
+            sample_rate=sample_rate,
+        )
+        self.device = device
+        self.profile = get_stream_profile(profile)
+        self._ring = AudioRingBuffer(int(sample_rate * OUTPUT_BUFFER_SECONDS))
+        # Small blocks leave no slack, so absorb synthesis stalls adaptively
+        self._jitter: Optional[AdaptiveJitterBuffer] = None
+        if self.profile.get("jitter_buffer"):
+            self._jitter = AdaptiveJitterBuffer(self._ring, sample_rate)
+        self._latency = LatencyMeter()
+        self._echo_gate = echo_gate
+        self._lock = threading.Lock()
+        self._segment_id = 0
+        self._segment_active = False
+        self._flushed = False
+        self._pushed_duration = 0.0
+        # Samples played since start; only the PortAudio callback advances it
+        self._played_samples = 0
+        self._segment_start = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stream: Optional[sd.OutputStream] = None
+
+    def start(self) -> None:
+        """Open the output device."""
+        self._loop = asyncio.get_running_loop()
+        block_duration = self.profile.get("block_duration", FRAME_DURATION)
+        self._stream = sd.OutputStream(
+            device=self.device,
+            samplerate=self.sample_rate,
+            channels=1,
+            dtype="int16",
+            blocksize=int(self.sample_rate * block_duration),
+            latency=self.profile.get("latency"),
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        """Queue a synthesized frame for playback."""
+        await super().capture_frame(frame)
+
+        with self._lock:
+            started = not self._segment_active
+            if started:
+                self._segment_id += 1
+                self._segment_active = True
+                self._pushed_duration = 0.0
+                self._segment_start = self._played_samples
+            self._pushed_duration += frame.duration
+            segment_id = self._segment_id
+
+        if started:
+            self.on_playback_started(created_at=time.time())
+
+        # Wait for room while the ring is full, unless playback was cleared
+        samples = np.frombuffer(frame.data, dtype=np.int16)
+        while len(samples) and self._segment_active and segment_id == self._segment_id:
+            samples = samples[self._ring.write(samples[: self._ring.free]) :]
+            if len(samples):
+                await asyncio.sleep(FRAME_DURATION)
+
+    def flush(self) -> None:
+        """Mark the current segment complete; it finishes once it has played."""
+        super().flush()
+        with self._lock:
+            if not self._segment_active:
+                return
+            self._flushed = True
+            drained = not self._ring.available
+            segment_id = self._segment_id
+        if drained:
+            self._finish_segment(segment_id, interrupted=False)
+
+    def clear_buffer(self) -> None:
+        """Stop playback immediately, e.g. when the user interrupts."""
+        self._ring.discard()
+        with self._lock:
+            segment_id = self._segment_id
+        self._finish_segment(segment_id, interrupted=True)
+
+    def _finish_segment(self, segment_id: int, interrupted: bool) -> None:
+        """Report the end of a segment once, on the event loop."""
+        with self._lock:
+            if not self._segment_active or segment_id != self._segment_id:
+                return
+            self._segment_active = False
+            self._flushed = False
+            played = self._played_samples - self._segment_start
+            position = min(played / self.sample_rate, self._pushed_duration)
+        self.on_playback_finished(playback_position=position, interrupted=interrupted)
+
+    def _callback(self, outdata: np.ndarray, frames: int, time_: Any, status) -> None:
+        """Fill a device block from the ring, padding with silence.
+
+        Takes no lock: the segment state is only read here, and the played
+        sample counter is only advanced here.
+        """
+        self._latency.record_output(time_)
+        # Read first, so a newer segment is never finished by mistake
+        segment_id = self._segment_id
+        # Running dry mid-segment means synthesis fell behind playback
+        expect_data = self._segment_active and not self._flushed
+        source = self._jitter or self._ring
+        self._played_samples += source.fill_output(outdata, expect_data)
+        if self._echo_gate is not None:
+            self._echo_gate.play(outdata)
+
+        # _finish_segment resets _flushed and ignores repeats
+        if self._flushed and not self._ring.available:
+            self._loop.call_soon_threadsafe(self._finish_segment, segment_id, False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the output ring's fill level and underruns, and device latency."""
+        stats: Dict[str, Any] = {
+            **self._ring.stats(),
+            "device_latency": self._latency.stats(),
+        }
+        if self._jitter is not None:
+            stats["jitter_buffer"] = self._jitter.stats()
+        return stats
+
+    def close(self) -> None:
+        """Close the output device."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        self._ring.close()
@@ -0,0 +1,285 @@
+"""Low-footprint audio-only browser mode for meeting bots.
+
+The bot never looks at video, yet a normal Meet tab decodes and renders
+every participant's stream. Audio-only mode trims Chrome down: it runs
+headless where possible without GPU or images, blocks resources the bot
+does not need, detaches remote video from the page and switches Meet's
+receive resolution to audio only once in the call. It also measures what
+each browser costs.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .ui_actuator import SELECTORS
+
+AUDIO_ONLY_CHROME_ARGS = [
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--disable-accelerated-video-decode",
+    "--blink-settings=imagesEnabled=false",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--renderer-process-limit=2",
+    "--window-size=1024,768",
+]
+
+# Requests the bot has no use for: avatars, fonts, emoji images and telemetry
+BLOCKED_URL_PATTERNS = [
+    "*lh3.googleusercontent.com/*",
+    "*fonts.gstatic.com/*",
+    "*fonts.googleapis.com/*",
+    "*ssl.gstatic.com/*/emoji/*",
+    "*play.google.com/log*",
+    "*google-analytics.com/*",
+]
+
+# Detaches remote video from <video> elements so Chrome stops rendering it
+VIDEO_SUPPRESSION_SCRIPT = """
+(() => {
+    if (window.__groquetteAudioOnly) return;
+    window.__groquetteAudioOnly = true;
+
+    const detach = (video) => {
+        if (video.srcObject) {
+            video.srcObject = null;
+        }
+        video.style.display = 'none';
+    };
+    const sweep = () => document.querySelectorAll('video').forEach(detach);
+    const observe = () => {
+        sweep();
+        new MutationObserver(sweep).observe(document.documentElement, {
+            childList: true, subtree: true,
+        });
+    };
+    if (document.documentElement) {
+        observe();
+    } else {
+        document.addEventListener('DOMContentLoaded', observe);
+    }
+})();
+"""
+
+# Receive resolutions in Meet's settings, from cheapest to most expensive
+RECEIVE_RESOLUTIONS = [
+    "Audio only",
+    "Standard definition (360p), one video at a time",
+    "Standard definition (360p)",
+]
+
+
+def is_audio_only_enabled() -> bool:
+    """Check whether GROQUETTE_AUDIO_ONLY asks for the audio-only profile."""
+    return os.getenv("GROQUETTE_AUDIO_ONLY", "").lower() in ("1", "true", "yes")
+
+
+def is_headless_enabled() -> bool:
+    """Check whether audio-only browsers should run headless (the default)."""
+    return os.getenv("GROQUETTE_HEADLESS", "1").lower() in ("1", "true", "yes")
+
+
+def add_audio_only_options(opt: Options, headless: bool = True) -> None:
+    """Add the audio-only Chrome flags to the driver options."""
+    if headless:
+        opt.add_argument("--headless=new")
+    for arg in AUDIO_ONLY_CHROME_ARGS:
+        opt.add_argument(arg)
+
+
+def install_audio_only_mode(driver: webdriver.Chrome) -> None:
+    """Block unneeded resources and suppress video in every future document."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument",
+            {"source": VIDEO_SUPPRESSION_SCRIPT},
+        )
+        print("🔇 Audio-only browser mode installed")
+    except Exception as e:
+        print(f"Could not install audio-only mode: {e}")
+
+
+def set_lowest_receive_resolution(driver: webdriver.Chrome) -> Optional[str]:
+    """Set Meet's receive resolution to audio only, or the lowest available.
+
+    Returns:
+        The selected resolution, or None if the settings could not be changed.
+    """
+    wait = WebDriverWait(driver, 5, poll_frequency=0.1)
+    try:
+        wait.until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, SELECTORS["more_options"]))
+        ).click()
+        wait.until(
+            EC.element_to_be_clickable(
+                (By.XPATH, "//li[@role='menuitem'][.//span[text()='Settings']]")
+            )
+        ).click()
+        wait.until(
+            EC.element_to_be_clickable(
+                (By.XPATH, "//button[@role='tab'][.//span[text()='Video']]")
+            )
+        ).click()
+        wait.until(
+            EC.element_to_be_clickable(
+                (
+                    By.XPATH,
+                    "//*[@aria-label][contains(@aria-label, 'Receive resolution')]",
+                )
+            )
+        ).click()
+
+        options = wait.until(
+            EC.visibility_of_all_elements_located(
+                (By.CSS_SELECTOR, 'li[role="option"]')
+            )
+        )
+        labels = [option.text.strip() for option in options]
+        for resolution in RECEIVE_RESOLUTIONS:
+            if resolution in labels:
+                options[labels.index(resolution)].click()
+                print(f"📉 Receive resolution set to: {resolution}")
+                return resolution
+
+        print(f"⚠️ No low receive resolution among: {labels}")
+        return None
+    except TimeoutException:
+        print("⚠️ Could not open Meet video settings")
+        return None
+    except Exception as e:
+        print(f"Could not set receive resolution: {e}")
+        return None
+    finally:
+        _close_settings(driver)
+
+
+def _close_settings(driver: webdriver.Chrome) -> None:
+    """Close the settings dialog if it is open."""
+    try:
+        for button in driver.find_elements(By.CSS_SELECTOR, SELECTORS["close_dialog"]):
+            button.click()
+    except Exception:
+        pass
+
+
+def browser_resource_usage(
+    driver: webdriver.Chrome, interval: float = 0.5
+) -> Optional[Dict[str, float]]:
+    """Measure the resident memory and CPU of the Chrome behind a driver.
+
+    Sums over chromedriver and all of its descendant processes (browser,
+    renderers, GPU and utility processes).
+
+    Returns:
+        ``processes``, ``rss_mb`` and ``cpu_percent`` (of one core, sampled
+        over ``interval`` seconds), or None if they cannot be measured.
+    """
+    try:
+        root_pid = driver.service.process.pid
+    except AttributeError:
+        return None
+
+    try:
+        return _psutil_resource_usage(root_pid, interval)
+    except ImportError:
+        return _proc_resource_usage(root_pid, interval)
+
+
+def _psutil_resource_usage(
+    root_pid: int, interval: float
+) -> Optional[Dict[str, float]]:
+    """Measure a process tree with psutil.
+
+    Raises:
+        ImportError: If psutil is not installed.
+    """
+    import psutil
+
+    try:
+        root = psutil.Process(root_pid)
+        processes = [root] + root.children(recursive=True)
+        for process in processes:
+            process.cpu_percent(None)
+        time.sleep(interval)
+
+        rss = 0
+        cpu = 0.0
+        for process in processes:
+            try:
+                cpu += process.cpu_percent(None)
+                rss += process.memory_info().rss
+            except psutil.NoSuchProcess:
+                continue
+    except psutil.Error:
+        return None
+
+    return {"processes": len(processes), "rss_mb": rss / 1e6, "cpu_percent": cpu}
+
+
+def _proc_resource_usage(root_pid: int, interval: float) -> Optional[Dict[str, float]]:
+    """Measure a process tree from /proc when psutil is not installed."""
+    pids = _proc_tree(root_pid)
+    if not pids:
+        return None
+
+    ticks_before = sum(_proc_stat(pid)[0] for pid in pids)
+    time.sleep(interval)
+    samples = [_proc_stat(pid) for pid in pids]
+    ticks_after = sum(ticks for ticks, _ in samples)
+    rss = sum(rss for _, rss in samples)
+
+    ticks_per_second = os.sysconf("SC_CLK_TCK")
+    cpu = (ticks_after - ticks_before) / ticks_per_second / interval * 100
+    return {"processes": len(pids), "rss_mb": rss / 1e6, "cpu_percent": cpu}
+
+
+def _proc_tree(root_pid: int) -> List[int]:
+    """Return a PID and all of its descendants, using /proc."""
+    children: Dict[int, List[int]] = {}
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return []
+
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # The command name may contain spaces; fields resume after ")"
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids = [root_pid]
+    for pid in pids:
+        pids.extend(children.get(pid, []))
+    return pids
+
+
+def _proc_stat(pid: int) -> Tuple[int, int]:
+    """Return (CPU ticks used, resident bytes) of a process, or zeros."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime and stime are fields 14 and 15, rss (pages) is field 24
+        ticks = int(fields[11]) + int(fields[12])
+        rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        return ticks, rss
+    except (OSError, ValueError, IndexError):
+        return 0, 0
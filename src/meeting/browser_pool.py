@@ -0,0 +1,234 @@
+"""Pool of pre-launched, logged-in Chrome instances for fast joins.
+
+Launching Chrome and signing in to Google is the slowest fixed cost of a
+join. The pool pays it ahead of time: browsers are launched and logged in
+in the background, a join checks one out, and leaving resets it and checks
+it back in instead of quitting it. Each pool slot has its own Chrome profile
+directory, so a slot stays logged in across relaunches.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from selenium import webdriver
+
+from .utils import ensure_google_session, setup_chrome_driver
+
+POOL_SIZE = int(os.getenv("GROQUETTE_BROWSER_POOL_SIZE", "2"))
+IDLE_TIMEOUT = float(os.getenv("GROQUETTE_BROWSER_IDLE_TIMEOUT", "600"))
+
+# Origins whose storage is cleared when a browser is returned
+MEETING_ORIGINS = ["https://meet.google.com"]
+
+
+class PooledBrowser:
+    """A warm browser and the pool slot it occupies."""
+
+    def __init__(self, driver: webdriver.Chrome, slot: int) -> None:
+        """Initialize the pooled browser."""
+        self.driver = driver
+        self.slot = slot
+        self.idle_since = time.monotonic()
+
+
+class BrowserPool:
+    """Hands out warm browsers and takes them back after a meeting.
+
+    Up to ``size`` browsers exist at once. Browsers that stay idle longer than
+    ``idle_timeout`` seconds are quit, but ``keep_warm`` of them are always
+    kept ready.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        idle_timeout: float = IDLE_TIMEOUT,
+        keep_warm: int = 1,
+        profile_root: Optional[str] = None,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            size: Maximum number of browsers, idle or in use.
+            idle_timeout: Seconds an idle browser is kept before it is quit.
+            keep_warm: Idle browsers that are never evicted.
+            profile_root: Base of the per-slot Chrome profile directories,
+                defaults to GROQUETTE_CHROME_PROFILE.
+        """
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.keep_warm = min(keep_warm, size)
+        self.profile_root = profile_root or os.getenv("GROQUETTE_CHROME_PROFILE")
+        self.email = os.getenv("GOOGLE_EMAIL")
+        self.password = os.getenv("GOOGLE_PASSWORD")
+
+        self._idle: List[PooledBrowser] = []
+        self._in_use: Dict[int, PooledBrowser] = {}
+        self._free_slots = list(range(size))
+        self._launching = 0
+        self._waiting = 0
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Launch the warm browsers in the background and start eviction."""
+        with self._condition:
+            for _ in range(self.keep_warm):
+                self._launch_async()
+        threading.Thread(target=self._evict_idle, daemon=True).start()
+        print(f"🏊 Browser pool started ({self.keep_warm} warm, max {self.size})")
+
+    def checkout(self, timeout: float = 120) -> webdriver.Chrome:
+        """Take a warm, logged-in browser, launching one if none is idle.
+
+        Raises:
+            TimeoutError: If no browser becomes available in time.
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        browser = self._idle.pop()
+                        self._in_use[id(browser.driver)] = browser
+                        # Replace the browser we took so the next join is warm too
+                        if len(self._idle) + self._launching < self.keep_warm:
+                            self._launch_async()
+                        return browser.driver
+
+                    # Cold-launch one browser per waiting join, within the size
+                    if self._launching < self._waiting:
+                        self._launch_async()
+
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("No browser available in the pool")
+                    self._condition.wait(remaining)
+            finally:
+                self._waiting -= 1
+
+    def checkin(self, driver: webdriver.Chrome) -> None:
+        """Reset a browser after a meeting and make it available again."""
+        with self._condition:
+            browser = self._in_use.pop(id(driver), None)
+        if browser is None:
+            return
+
+        try:
+            self._reset(driver)
+        except Exception as e:
+            print(f"⚠️ Could not reset browser, replacing it: {e}")
+            self._quit(browser)
+            return
+
+        browser.idle_since = time.monotonic()
+        with self._condition:
+            self._idle.append(browser)
+            self._condition.notify_all()
+
+    def discard(self, driver: webdriver.Chrome) -> None:
+        """Quit a checked-out browser that crashed or cannot be reused."""
+        with self._condition:
+            browser = self._in_use.pop(id(driver), None)
+        if browser is not None:
+            self._quit(browser)
+
+    def close(self) -> None:
+        """Quit every browser in the pool."""
+        self._stopped.set()
+        with self._condition:
+            browsers = self._idle + list(self._in_use.values())
+            self._idle = []
+            self._in_use = {}
+        for browser in browsers:
+            self._quit(browser, replace=False)
+
+    def _launch_async(self) -> None:
+        """Launch a browser into a free slot (call with the lock held)."""
+        if not self._free_slots or self._stopped.is_set():
+            return
+        slot = self._free_slots.pop(0)
+        self._launching += 1
+        threading.Thread(
+            target=self._launch, args=(slot,), name=f"browser-pool-{slot}", daemon=True
+        ).start()
+
+    def _launch(self, slot: int) -> None:
+        """Start Chrome in a slot and log in."""
+        browser = None
+        try:
+            start_time = time.perf_counter()
+            user_data_dir = None
+            if self.profile_root:
+                user_data_dir = f"{self.profile_root.rstrip('/')}-pool{slot}"
+            driver = setup_chrome_driver(user_data_dir)
+            browser = PooledBrowser(driver, slot)
+            ensure_google_session(driver, self.email, self.password)
+            driver.get("about:blank")
+            print(f"🏊 Browser {slot} warm in {time.perf_counter() - start_time:.2f}s")
+        except Exception as e:
+            print(f"❌ Could not launch pooled browser {slot}: {e}")
+            if browser is not None:
+                self._quit_driver(browser.driver)
+            browser = None
+
+        with self._condition:
+            self._launching -= 1
+            if browser is not None and not self._stopped.is_set():
+                self._idle.append(browser)
+            else:
+                self._free_slots.append(slot)
+                if browser is not None:
+                    self._quit_driver(browser.driver)
+            self._condition.notify_all()
+
+    def _reset(self, driver: webdriver.Chrome) -> None:
+        """Leave the meeting page and clear its state, keeping the login."""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        driver.get("about:blank")
+        for origin in MEETING_ORIGINS:
+            driver.execute_cdp_cmd(
+                "Storage.clearDataForOrigin",
+                {"origin": origin, "storageTypes": "local_storage,session_storage"},
+            )
+
+    def _evict_idle(self) -> None:
+        """Quit browsers that have been idle too long, down to keep_warm."""
+        while not self._stopped.wait(min(self.idle_timeout, 30)):
+            now = time.monotonic()
+            with self._condition:
+                # Oldest first, so the most recently used browsers stay warm
+                self._idle.sort(key=lambda browser: browser.idle_since)
+                evicted = []
+                while (
+                    len(self._idle) > self.keep_warm
+                    and now - self._idle[0].idle_since > self.idle_timeout
+                ):
+                    evicted.append(self._idle.pop(0))
+            for browser in evicted:
+                print(f"🧹 Evicting idle browser {browser.slot}")
+                self._quit(browser, replace=False)
+
+    def _quit(self, browser: PooledBrowser, replace: bool = True) -> None:
+        """Quit a browser, free its slot and optionally launch a replacement."""
+        self._quit_driver(browser.driver)
+        with self._condition:
+            self._free_slots.append(browser.slot)
+            if replace and len(self._idle) + self._launching < self.keep_warm:
+                self._launch_async()
+            self._condition.notify_all()
+
+    def _quit_driver(self, driver: webdriver.Chrome) -> None:
+        """Quit Chrome, ignoring a browser that already died."""
+        try:
+            driver.quit()
+        except Exception:
+            pass
@@ -0,0 +1,156 @@
+"""Minimal Chrome DevTools protocol client for a meeting's page.
+
+Selenium's execute_cdp_cmd can send DevTools commands but never delivers
+events. Page scripts report to Python through Runtime bindings, whose calls
+arrive as Runtime.bindingCalled events, so the meeting state mirror and the
+page audio transport open their own DevTools connection to the page target
+that chromedriver already exposes.
+"""
+
+import asyncio
+import json
+from typing import Any, Callable, Dict, Optional
+
+import aiohttp
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+CONNECT_TIMEOUT = 10.0  # Seconds to connect to a page
+
+EventHandler = Callable[[str, Dict[str, Any]], None]
+
+
+def page_endpoint(driver: webdriver.Chrome) -> Optional[str]:
+    """Return the DevTools WebSocket URL of the driver's page.
+
+    None if the browser does not expose a debugger address.
+    """
+    try:
+        address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+        target = driver.execute_cdp_cmd("Target.getTargetInfo", {})
+        target_id = target["targetInfo"]["targetId"]
+    except (KeyError, TypeError, WebDriverException) as e:
+        print(f"Could not find the page's DevTools endpoint: {e}")
+        return None
+    return f"ws://{address}/devtools/page/{target_id}"
+
+
+class DevToolsConnection:
+    """DevTools connection to one page target.
+
+    Commands are matched to their results by ID, like AsyncIPCClient does;
+    events go to on_event, on the event loop that connected.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        on_event: EventHandler,
+        on_close: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Initialize the connection.
+
+        Args:
+            endpoint: DevTools WebSocket URL of the page.
+            on_event: Called with the method and params of every event.
+            on_close: Called once the connection has closed, for any reason.
+        """
+        self.endpoint = endpoint
+        self.on_event = on_event
+        self.on_close = on_close
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._next_id = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+
+    @property
+    def closed(self) -> bool:
+        """Whether the connection is closed or was never opened."""
+        return self._ws is None or self._ws.closed
+
+    async def connect(self) -> None:
+        """Connect to the page.
+
+        Raises:
+            ConnectionError: If the page cannot be reached.
+        """
+        self._session = aiohttp.ClientSession()
+        try:
+            # No size limit: Meet's console messages arrive as events too
+            self._ws = await asyncio.wait_for(
+                self._session.ws_connect(self.endpoint, max_msg_size=0),
+                CONNECT_TIMEOUT,
+            )
+        except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as e:
+            await self.close()
+            raise ConnectionError(f"Cannot reach the page at {self.endpoint}: {e}")
+        self._reader = asyncio.create_task(self._read_loop(self._ws))
+
+    async def command(
+        self, method: str, params: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Send a command and wait for its result.
+
+        Raises:
+            ConnectionError: If the connection is closed.
+            RuntimeError: If the command fails.
+        """
+        if self.closed:
+            raise ConnectionError("DevTools connection is closed")
+        self._next_id += 1
+        command_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[command_id] = future
+        try:
+            await self._ws.send_str(
+                json.dumps({"id": command_id, "method": method, "params": params or {}})
+            )
+            response = await future
+        finally:
+            self._pending.pop(command_id, None)
+        if "error" in response:
+            raise RuntimeError(f"{method} failed: {response['error'].get('message')}")
+        return response.get("result", {})
+
+    async def wait_closed(self) -> None:
+        """Wait until the connection closes."""
+        if self._reader is not None:
+            await asyncio.gather(asyncio.shield(self._reader), return_exceptions=True)
+
+    async def close(self) -> None:
+        """Close the connection and wait for the reader to finish."""
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _read_loop(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Dispatch command results and events until the connection closes."""
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                message = json.loads(msg.data)
+                future = self._pending.get(message.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(message)
+                elif "method" in message:
+                    self._dispatch(message["method"], message.get("params", {}))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("DevTools connection closed"))
+            if self.on_close is not None:
+                self.on_close()
+
+    def _dispatch(self, method: str, params: Dict[str, Any]) -> None:
+        """Hand an event to on_event, keeping the reader alive on errors."""
+        try:
+            self.on_event(method, params)
+        except Exception as e:
+            print(f"Error handling DevTools event {method}: {e}")
@@ -0,0 +1,367 @@
+"""Fleet orchestration - run and supervise many meetings from one process.
+
+Each meeting gets its own MeetJoiner (browser, IPC socket, Chrome profile
+and audio devices), and all of them share one multi-meeting voice agent
+worker. A supervision loop health-checks every component and restarts only
+the one that failed: a dead browser is relaunched and rejoins, a lost agent
+session is reattached, a stopped IPC handler is restarted, and a dead worker
+is restarted with every active meeting reattached to it.
+"""
+
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .browser_pool import BrowserPool
+from .ipc_commands import DEFAULT_SOCKET_PATH, FLEET_SOCKET, IPCCommands
+from .meet_joiner import MeetJoiner
+from .utils import (
+    get_voice_agent_sessions,
+    is_voice_agent_daemon_running,
+    start_multi_worker_process,
+    stop_voice_agent_daemon,
+    wait_for_voice_agent_daemon,
+)
+
+# Meeting lifecycle states reported by status()
+SCHEDULED = "scheduled"
+JOINING = "joining"
+ACTIVE = "active"
+RESTARTING = "restarting"
+LEFT = "left"
+FAILED = "failed"
+
+
+class FleetMeeting:
+    """One meeting managed by the fleet, with its runtime status."""
+
+    def __init__(
+        self,
+        meeting_code: str,
+        start_at: Optional[float] = None,
+        mic_device: Optional[str] = None,
+        speaker_device: Optional[str] = None,
+    ) -> None:
+        """Initialize the meeting.
+
+        Args:
+            meeting_code: Google Meet code in format xxx-xxxx-xxx.
+            start_at: Unix time to join at, or None to join right away.
+            mic_device: Meet microphone label for this meeting's audio route.
+            speaker_device: Meet speaker label for this meeting's audio route.
+        """
+        self.meeting_code = meeting_code
+        self.meet_url = f"https://meet.google.com/{meeting_code}"
+        self.start_at = start_at
+        self.mic_device = mic_device
+        self.speaker_device = speaker_device
+
+        root, ext = os.path.splitext(DEFAULT_SOCKET_PATH)
+        self.socket_path = f"{root}_{meeting_code}{ext}"
+        profile = os.getenv("GROQUETTE_CHROME_PROFILE")
+        self.user_data_dir = (
+            f"{profile.rstrip('/')}-{meeting_code}" if profile else None
+        )
+
+        self.joiner: Optional[MeetJoiner] = None
+        self.state = SCHEDULED
+        self.restarts: Dict[str, int] = {"browser": 0, "agent": 0, "ipc": 0}
+        self.last_error: Optional[str] = None
+        self.joined_at: Optional[float] = None
+        self.busy = False  # A join or restart is running in the background
+        # Browser memory and CPU, measured by the supervision loop
+        self.browser_usage: Optional[Dict[str, float]] = None
+
+    def status(self) -> Dict[str, Any]:
+        """Return a machine-readable summary of the meeting."""
+        return {
+            "meeting_code": self.meeting_code,
+            "state": self.state,
+            "start_at": self.start_at,
+            "joined_at": self.joined_at,
+            "restarts": dict(self.restarts),
+            "last_error": self.last_error,
+            "browser": self.browser_usage if self.state == ACTIVE else None,
+        }
+
+
+class FleetOrchestrator:
+    """Joins scheduled meetings and keeps their components healthy."""
+
+    def __init__(
+        self,
+        meetings: List[FleetMeeting],
+        check_interval: float = 10.0,
+        max_restarts: int = 3,
+        socket_path: Optional[str] = None,
+        browser_pool: Optional[BrowserPool] = None,
+    ) -> None:
+        """Initialize the orchestrator.
+
+        Args:
+            meetings: Meetings to run.
+            check_interval: Seconds between health checks.
+            max_restarts: Restarts allowed per component of a meeting before
+                the meeting is marked failed.
+            socket_path: Status socket path, defaults to GROQUETTE_FLEET_SOCKET.
+            browser_pool: Started pool that meetings check browsers out of.
+        """
+        self.meetings = {meeting.meeting_code: meeting for meeting in meetings}
+        self.check_interval = check_interval
+        self.max_restarts = max_restarts
+        self.socket_path = socket_path or FLEET_SOCKET
+        self.browser_pool = browser_pool
+        self.worker_process: Optional[subprocess.Popen[bytes]] = None
+        self.worker_restarts = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        """Run until every meeting has ended or a shutdown is requested."""
+        control = IPCCommands(socket_path=self.socket_path, serve=True)
+        threading.Thread(
+            target=self._serve_control, args=(control,), daemon=True
+        ).start()
+        print(
+            f"🛰️ Fleet of {len(self.meetings)} meetings, status on {self.socket_path}"
+        )
+
+        try:
+            self._ensure_worker()
+            while not self._stopped.is_set():
+                self._start_due_meetings()
+                self._check_health()
+                self._measure_browsers()
+                if all(m.state in (LEFT, FAILED) for m in self.meetings.values()):
+                    print("🏁 All meetings have ended")
+                    break
+                self._stopped.wait(self.check_interval)
+        except KeyboardInterrupt:
+            print("\n🛑 Stopping fleet")
+        finally:
+            self.shutdown()
+            control.close()
+
+    def status(self) -> Dict[str, Any]:
+        """Return per-meeting status and the state of the shared worker."""
+        with self._lock:
+            meetings = [meeting.status() for meeting in self.meetings.values()]
+        return {
+            "meetings": meetings,
+            "worker_running": is_voice_agent_daemon_running(),
+            "worker_restarts": self.worker_restarts,
+        }
+
+    def shutdown(self) -> None:
+        """Leave every meeting and stop the worker if the fleet started it."""
+        self._stopped.set()
+        for meeting in self.meetings.values():
+            if meeting.joiner is not None and meeting.state not in (LEFT, FAILED):
+                self._leave(meeting, LEFT)
+        if self.worker_process is not None:
+            stop_voice_agent_daemon(self.worker_process)
+        if self.browser_pool is not None:
+            self.browser_pool.close()
+
+    def _serve_control(self, control: IPCCommands) -> None:
+        """Answer status and control requests, e.g. from `fleet.py --status`."""
+        while not self._stopped.is_set():
+            try:
+                cmd_data = control.check_for_command(timeout=1.0)
+            except Exception as e:
+                print(f"Error in fleet control handler: {e}")
+                break
+            if not cmd_data:
+                continue
+
+            command = cmd_data.get("command")
+            if command == "status":
+                control.send_response(self.status(), cmd_data.get("id"))
+            elif command == "leave":
+                meeting = self.meetings.get(cmd_data["params"].get("meeting_code"))
+                if meeting is None or meeting.joiner is None:
+                    control.send_response("Unknown meeting", cmd_data.get("id"), False)
+                    continue
+                self._leave(meeting, LEFT)
+                control.send_response("Left the meeting", cmd_data.get("id"))
+            elif command == "shutdown":
+                control.send_response("Shutting down", cmd_data.get("id"))
+                self._stopped.set()
+            else:
+                control.send_response("Unknown command", cmd_data.get("id"), False)
+
+    def _ensure_worker(self) -> None:
+        """Start the shared multi-meeting worker unless one is running."""
+        if is_voice_agent_daemon_running():
+            if get_voice_agent_sessions() is None:
+                print("⚠️ A single-meeting agent daemon is running, not a worker")
+            return
+        self.worker_process = start_multi_worker_process()
+        wait_for_voice_agent_daemon()
+
+    def _start_due_meetings(self) -> None:
+        """Join every scheduled meeting whose start time has come."""
+        now = time.time()
+        for meeting in self.meetings.values():
+            if meeting.state != SCHEDULED:
+                continue
+            if meeting.start_at is not None and meeting.start_at > now:
+                continue
+            meeting.state = JOINING
+            self._run_in_background(meeting, "join", lambda m=meeting: self._join(m))
+
+    def _join(self, meeting: FleetMeeting) -> None:
+        """Create the meeting's joiner and join."""
+        meeting.joiner = MeetJoiner(
+            meeting.meet_url,
+            socket_path=meeting.socket_path,
+            user_data_dir=meeting.user_data_dir,
+            mic_device=meeting.mic_device,
+            speaker_device=meeting.speaker_device,
+            browser_pool=self.browser_pool,
+        )
+        meeting.joiner.join_meeting()
+        meeting.joined_at = time.time()
+
+    def _check_health(self) -> None:
+        """Find failed components and restart only those."""
+        if not is_voice_agent_daemon_running():
+            self._restart_worker()
+            return
+        sessions = get_voice_agent_sessions()
+
+        for meeting in self.meetings.values():
+            joiner = meeting.joiner
+            if meeting.state != ACTIVE or meeting.busy or joiner is None:
+                continue
+
+            if not joiner.is_running:
+                # The agent or the user ended the meeting
+                print(f"👋 {meeting.meeting_code} has left the meeting")
+                meeting.state = LEFT
+            elif not joiner.is_browser_alive() or not joiner.is_in_meeting():
+                self._restart(meeting, "browser", joiner.restart_browser)
+            elif joiner.ipc_thread is None or not joiner.ipc_thread.is_alive():
+                self._restart(meeting, "ipc", joiner.start_ipc_handler)
+            elif sessions is not None and meeting.meet_url not in sessions:
+                self._restart(meeting, "agent", self._reattach_agent(joiner))
+
+    def _measure_browsers(self) -> None:
+        """Measure the browser of every active meeting for status().
+
+        Each measurement samples CPU over half a second, so they run side by
+        side rather than one after another.
+        """
+        meetings = [
+            meeting
+            for meeting in self.meetings.values()
+            if meeting.state == ACTIVE and meeting.joiner is not None
+        ]
+        if not meetings:
+            return
+        with ThreadPoolExecutor(max_workers=len(meetings)) as executor:
+            usages = list(
+                executor.map(lambda m: m.joiner.browser_resource_usage(), meetings)
+            )
+        with self._lock:
+            for meeting, usage in zip(meetings, usages):
+                meeting.browser_usage = usage
+
+    def _restart(
+        self, meeting: FleetMeeting, component: str, restart: Callable[[], Any]
+    ) -> None:
+        """Restart one component of a meeting, giving up after max_restarts."""
+        if meeting.restarts[component] >= self.max_restarts:
+            print(f"❌ {meeting.meeting_code}: {component} keeps failing, giving up")
+            meeting.last_error = f"{component} failed {self.max_restarts} times"
+            self._leave(meeting, FAILED)
+            return
+
+        meeting.restarts[component] += 1
+        meeting.state = RESTARTING
+        print(
+            f"🔁 {meeting.meeting_code}: restarting {component} "
+            f"({meeting.restarts[component]}/{self.max_restarts})"
+        )
+        self._run_in_background(meeting, component, restart)
+
+    def _restart_worker(self) -> None:
+        """Restart the shared worker and reattach every active meeting to it."""
+        self.worker_restarts += 1
+        print(f"🔁 Voice agent worker is down, restarting ({self.worker_restarts})")
+        if self.worker_process is not None and self.worker_process.poll() is None:
+            self.worker_process.kill()
+        self.worker_process = start_multi_worker_process()
+        if not wait_for_voice_agent_daemon():
+            return
+
+        for meeting in self.meetings.values():
+            if meeting.state == ACTIVE and not meeting.busy:
+                self._restart(meeting, "agent", self._reattach_agent(meeting.joiner))
+
+    def _reattach_agent(self, joiner: MeetJoiner) -> Callable[[], None]:
+        """Return a restart action that hands the meeting to the agent again."""
+
+        def reattach() -> None:
+            if not joiner.attach_agent():
+                raise RuntimeError("Voice agent refused the meeting")
+
+        return reattach
+
+    def _run_in_background(
+        self, meeting: FleetMeeting, action: str, func: Callable[[], Any]
+    ) -> None:
+        """Run a blocking join or restart without holding up supervision."""
+
+        def run() -> None:
+            try:
+                func()
+                meeting.state = ACTIVE
+            except Exception as e:
+                print(f"❌ {meeting.meeting_code}: {action} failed: {e}")
+                meeting.last_error = f"{action}: {e}"
+                # A failed join is retried like a browser failure
+                meeting.state = ACTIVE if meeting.joiner is not None else FAILED
+            finally:
+                meeting.busy = False
+
+        meeting.busy = True
+        threading.Thread(
+            target=run, name=f"fleet-{meeting.meeting_code}-{action}", daemon=True
+        ).start()
+
+    def _leave(self, meeting: FleetMeeting, state: str) -> None:
+        """Leave a meeting and record its final state."""
+        with self._lock:
+            meeting.state = state
+        if meeting.joiner is not None:
+            try:
+                meeting.joiner.leave_meeting()
+            except Exception as e:
+                print(f"⚠️ {meeting.meeting_code}: error while leaving: {e}")
+
+
+def print_fleet_status(status: Dict[str, Any]) -> None:
+    """Print a fleet status report as a table."""
+    worker = "running" if status["worker_running"] else "down"
+    print(f"🤖 Voice agent worker: {worker} ({status['worker_restarts']} restarts)")
+    for meeting in status["meetings"]:
+        restarts = ", ".join(
+            f"{component}={count}"
+            for component, count in meeting["restarts"].items()
+            if count
+        )
+        line = f"  {meeting['meeting_code']}  {meeting['state']:<10}"
+        if restarts:
+            line += f"  restarts: {restarts}"
+        if meeting.get("browser"):
+            line += (
+                f"  browser: {meeting['browser']['rss_mb']:.0f} MB, "
+                f"{meeting['browser']['cpu_percent']:.0f}% CPU"
+            )
+        if meeting["last_error"]:
+            line += f"  last error: {meeting['last_error']}"
+        print(line)
@@ -1,78 +1,430 @@
 """Inter-process communication for voice agent to control meeting UI."""
 
+import asyncio
 import json
 import os
+import selectors
+import socket
+import struct
+import threading
 import time
-from pathlib import Path
-from typing import Dict, Optional
+import uuid
+from typing import Any, Dict, List, Optional
+
+DEFAULT_SOCKET_PATH = os.getenv("GROQUETTE_IPC_SOCKET", "/tmp/groquette_ipc.sock")
+
+# Control socket of the long-lived voice agent daemon
+AGENT_DAEMON_SOCKET = os.getenv("GROQUETTE_AGENT_SOCKET", "/tmp/groquette_agent.sock")
+
+# Status and control socket of the fleet orchestrator
+FLEET_SOCKET = os.getenv("GROQUETTE_FLEET_SOCKET", "/tmp/groquette_fleet.sock")
+
+# Messages are a 4-byte big-endian length followed by a UTF-8 JSON payload
+HEADER = struct.Struct("!I")
+MAX_MESSAGE_SIZE = 1024 * 1024
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """Encode a message as a length-prefixed JSON frame."""
+    payload = json.dumps(message).encode("utf-8")
+    return HEADER.pack(len(payload)) + payload
+
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    """Decode the JSON payload of a frame."""
+    return json.loads(payload.decode("utf-8"))
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    """Read exactly size bytes, or return None if the peer closed the socket."""
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def recv_message(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Read one length-prefixed message from a socket."""
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+
+    (size,) = HEADER.unpack(header)
+    if size > MAX_MESSAGE_SIZE:
+        raise ValueError(f"IPC message too large: {size} bytes")
+
+    payload = _recv_exact(sock, size)
+    if payload is None:
+        return None
+    return decode_payload(payload)
 
 
 class IPCCommands:
-    """Simple file-based IPC for voice agent to send commands to Selenium process."""
-
-    def __init__(self):
-        """Initialize IPC with a command file in temp directory."""
-        self.command_file = Path("/tmp/groquette_commands.json")
-        self.response_file = Path("/tmp/groquette_responses.json")
-        self._clear_files()
-
-    def _clear_files(self):
-        """Clear command and response files."""
-        if self.command_file.exists():
-            self.command_file.unlink()
-        if self.response_file.exists():
-            self.response_file.unlink()
-
-    def send_command(self, command: str, params: Optional[Dict] = None) -> str:
-        """Send a command from voice agent to Selenium process."""
+    """Unix-domain-socket IPC for voice agent to send commands to Selenium process.
+
+    The Selenium process serves the socket (``serve=True``) and blocks in
+    check_for_command() until a command arrives. The voice agent connects as
+    a client; every command carries a request ID that its response echoes.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, serve: bool = False):
+        """Initialize IPC on a Unix domain socket.
+
+        Args:
+            socket_path: Path of the socket, defaults to GROQUETTE_IPC_SOCKET
+                or /tmp/groquette_ipc.sock.
+            serve: Listen for commands instead of sending them.
+        """
+        self.socket_path = socket_path or DEFAULT_SOCKET_PATH
+        self.serve = serve
+        self._server: Optional[socket.socket] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._pending: Dict[str, socket.socket] = {}
+        self._subscribers: List[socket.socket] = []
+        self._write_lock = threading.Lock()
+        self._last_request_id: Optional[str] = None
+
+        if serve:
+            self._start_server()
+
+    def _start_server(self) -> None:
+        """Bind the listening socket, replacing any stale socket file."""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        self._server.listen()
+        self._server.setblocking(False)
+
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ)
+
+    def request(
+        self, command: str, params: Optional[Dict] = None, timeout: float = 5.0
+    ) -> Dict[str, Any]:
+        """Send a command and wait for its full response.
+
+        Returns:
+            The response with ``result`` and ``ok`` keys. Failures to reach the
+            server are reported as ``ok=False`` responses.
+        """
+        request_id = uuid.uuid4().hex
         cmd_data = {
+            "id": request_id,
             "command": command,
             "params": params or {},
             "timestamp": time.time(),
         }
 
-        # Write command
-        with open(self.command_file, "w") as f:
-            json.dump(cmd_data, f)
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(encode_message(cmd_data))
 
-        # Wait for response (max 5 seconds)
-        start_time = time.time()
-        while time.time() - start_time < 5:
-            if self.response_file.exists():
-                try:
-                    with open(self.response_file, "r") as f:
-                        response = json.load(f)
+                while True:
+                    response = recv_message(sock)
+                    if response is None:
+                        break
+                    if response.get("id") == request_id:
+                        return response
+        except (socket.timeout, TimeoutError):
+            pass
+        except OSError as e:
+            return {"result": f"Could not reach meeting controller: {e}", "ok": False}
 
-                    # Clean up response file
-                    self.response_file.unlink()
+        return {"result": "Command sent but no response received", "ok": False}
 
-                    return response.get("result", "Command executed")
-                except Exception:
-                    pass
+    def send_command(
+        self, command: str, params: Optional[Dict] = None, timeout: float = 5.0
+    ) -> str:
+        """Send a command from voice agent to Selenium process."""
+        response = self.request(command, params, timeout)
+        return response.get("result", "Command executed")
 
-            time.sleep(0.1)
+    def check_for_command(self, timeout: Optional[float] = None) -> Optional[Dict]:
+        """Wait for a command from voice agent (used by Selenium process).
 
-        return "Command sent but no response received"
+        Args:
+            timeout: Seconds to block; None blocks until a command arrives.
 
-    def check_for_command(self) -> Optional[Dict]:
-        """Check for pending command from voice agent (used by Selenium process)."""
-        if not self.command_file.exists():
-            return None
+        Returns:
+            The command data, or None if the timeout expired first.
+        """
+        if self._selector is None:
+            raise RuntimeError("check_for_command requires IPCCommands(serve=True)")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+
+            for key, _ in self._selector.select(remaining):
+                if key.fileobj is self._server:
+                    self._accept()
+                    continue
+
+                cmd_data = self._read_command(key.fileobj)
+                if cmd_data is not None:
+                    return cmd_data
 
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+
+    def _accept(self) -> None:
+        """Accept a pending client connection."""
         try:
-            with open(self.command_file, "r") as f:
-                cmd_data = json.load(f)
+            conn, _ = self._server.accept()
+        except BlockingIOError:
+            return
+        conn.setblocking(True)
+        conn.settimeout(1.0)
+        self._selector.register(conn, selectors.EVENT_READ)
 
-            # Clean up command file
-            self.command_file.unlink()
+    def _read_command(self, conn: Any) -> Optional[Dict]:
+        """Read a command from a readable client connection."""
+        try:
+            cmd_data = recv_message(conn)
+        except (OSError, ValueError):
+            cmd_data = None
 
-            return cmd_data
-        except Exception:
+        if cmd_data is None:
+            self._drop_connection(conn)
             return None
 
-    def send_response(self, result: str):
-        """Send response back to voice agent (used by Selenium process)."""
-        response_data = {"result": result, "timestamp": time.time()}
+        request_id = cmd_data.get("id") or uuid.uuid4().hex
+        cmd_data["id"] = request_id
+        self._pending[request_id] = conn
+        self._last_request_id = request_id
+        return cmd_data
+
+    def _drop_connection(self, conn: Any) -> None:
+        """Forget and close a client connection."""
+        self._selector.unregister(conn)
+        for request_id, pending_conn in list(self._pending.items()):
+            if pending_conn is conn:
+                del self._pending[request_id]
+        with self._write_lock:
+            if conn in self._subscribers:
+                self._subscribers.remove(conn)
+        conn.close()
+
+    def subscribe(self, request_id: str) -> None:
+        """Push future events to the client that sent request_id."""
+        conn = self._pending.get(request_id)
+        with self._write_lock:
+            if conn is not None and conn not in self._subscribers:
+                self._subscribers.append(conn)
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        """Push an event to every subscribed client."""
+        frame = encode_message({"event": event, "data": data})
+        with self._write_lock:
+            for conn in list(self._subscribers):
+                try:
+                    conn.sendall(frame)
+                except OSError:
+                    self._subscribers.remove(conn)
+                    self._shut_down(conn)
+
+    def send_response(
+        self, result: Any, request_id: Optional[str] = None, ok: bool = True
+    ):
+        """Send response back to voice agent (used by Selenium process).
+
+        Args:
+            result: Result text for the command, or JSON-serializable data.
+            request_id: ID of the command being answered, defaults to the most
+                recently received command.
+            ok: Whether the command succeeded.
+        """
+        request_id = request_id or self._last_request_id
+        conn = self._pending.pop(request_id, None)
+        if conn is None:
+            return
+
+        response_data = {
+            "id": request_id,
+            "result": result,
+            "ok": ok,
+            "timestamp": time.time(),
+        }
+        try:
+            with self._write_lock:
+                conn.sendall(encode_message(response_data))
+        except OSError as e:
+            print(f"Could not send IPC response: {e}")
+            self._shut_down(conn)
+
+    @staticmethod
+    def _shut_down(conn: socket.socket) -> None:
+        """Hang up on a client after a failed or timed out write.
+
+        Part of the frame may have gone out, so the stream can no longer be
+        parsed. The client sees the connection close and reconnects; the
+        command loop then notices the hangup and drops the connection.
+        """
+        try:
+            conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Close all connections and remove the socket file."""
+        if self._selector is not None:
+            for key in list(self._selector.get_map().values()):
+                key.fileobj.close()
+            self._selector.close()
+            self._selector = None
+        self._pending.clear()
+        with self._write_lock:
+            self._subscribers.clear()
+
+        if self._server is not None:
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class AsyncIPCClient:
+    """Asyncio-native IPC client for the voice agent.
+
+    Keeps one connection to the Selenium process open and multiplexes
+    commands over it by request ID, so several commands can be in flight
+    without blocking the event loop. After subscribe_state(), meeting state
+    pushed by the Selenium process is mirrored in ``state``.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = 5.0):
+        """Initialize the client.
+
+        Args:
+            socket_path: Path of the socket served by the Selenium process.
+            timeout: Default seconds to wait for a response.
+        """
+        self.socket_path = socket_path or DEFAULT_SOCKET_PATH
+        self.timeout = timeout
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional["asyncio.Task[None]"] = None
+        self._pending: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+        # Created on first use, so the client can be built before a loop runs
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self.state: Dict[str, Any] = {}
+
+    async def _ensure_connected(self) -> asyncio.StreamWriter:
+        """Open the connection and start the response reader if needed."""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                reader, writer = await asyncio.open_unix_connection(self.socket_path)
+                self._writer = writer
+                self._reader_task = asyncio.create_task(
+                    self._read_responses(reader, writer)
+                )
+            return self._writer
+
+    async def _read_responses(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Resolve pending commands as their responses arrive."""
+        error = ConnectionError("IPC client closed")
+        try:
+            while True:
+                header = await reader.readexactly(HEADER.size)
+                (size,) = HEADER.unpack(header)
+                response = decode_payload(await reader.readexactly(size))
+
+                if response.get("event") == "state":
+                    self.state = response.get("data", {})
+                    continue
+
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except (asyncio.IncompleteReadError, OSError, ValueError) as e:
+            error = ConnectionError(f"IPC connection closed: {e}")
+        finally:
+            # Runs on cancellation too, which then propagates
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+
+    async def request(
+        self,
+        command: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Send a command and wait for its response.
+
+        Returns:
+            The response with ``result`` and ``ok`` keys. Failures to reach the
+            Selenium process are reported as ``ok=False`` responses.
+        """
+        request_id = uuid.uuid4().hex
+        cmd_data = {
+            "id": request_id,
+            "command": command,
+            "params": params or {},
+            "timestamp": time.time(),
+        }
+
+        future: "asyncio.Future[Dict[str, Any]]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        try:
+            writer = await self._ensure_connected()
+            # Registered once connected, so a reader closing an older
+            # connection cannot fail it
+            self._pending[request_id] = future
+            writer.write(encode_message(cmd_data))
+            await writer.drain()
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            return {"result": "Command sent but no response received", "ok": False}
+        except (ConnectionError, OSError) as e:
+            return {"result": f"Could not reach meeting controller: {e}", "ok": False}
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def send_command(
+        self,
+        command: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Send a command and return its result text."""
+        response = await self.request(command, params, timeout)
+        return response.get("result", "Command executed")
+
+    async def subscribe_state(self) -> bool:
+        """Ask the Selenium process to push meeting state changes to this client."""
+        response = await self.request("subscribe_state")
+        return bool(response.get("ok"))
+
+    async def retarget(self, socket_path: str) -> None:
+        """Point the client at another Selenium process, e.g. a new meeting."""
+        if socket_path == self.socket_path:
+            return
+        await self.close()
+        self.socket_path = socket_path
+        self.state = {}
 
-        with open(self.response_file, "w") as f:
-            json.dump(response_data, f)
+    async def close(self) -> None:
+        """Close the connection and fail any pending commands."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
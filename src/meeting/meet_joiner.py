@@ -4,148 +4,312 @@ import os
 import subprocess
 import threading
 import time
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from selenium.common.exceptions import (
-    ElementClickInterceptedException,
-    TimeoutException,
-)
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from .audio_only import (
+    browser_resource_usage,
+    is_audio_only_enabled,
+    set_lowest_receive_resolution,
+)
+from .browser_pool import BrowserPool
 from .ipc_commands import IPCCommands
+from .meet_state import MeetStateMirror
+from .page_audio import is_page_audio_enabled, PageAudioBridge
+from .startup import StartupOrchestrator, StartupTimeline, Step
+from .ui_actuator import SELECTORS, ui_latency, UIActuator
 from .utils import (
-    focus_chrome_window,
+    attach_voice_agent,
+    DEFAULT_MIC_DEVICE,
+    DEFAULT_SPEAKER_DEVICE,
+    detach_voice_agent,
+    ensure_google_session,
+    ensure_voice_agent_daemon,
     leave_meeting_cleanup,
-    login_to_google,
     set_microphone_to_blackhole,
     set_speaker_to_blackhole,
     setup_chrome_driver,
-    start_voice_agent_process,
+    stop_voice_agent_daemon,
     toggle_camera,
     turn_off_microphone,
     turn_on_microphone,
+    wait_for_voice_agent_daemon,
 )
 
 load_dotenv()
 
+# Handles one IPC command; returns (result, ok), or None if it already answered
+IPCHandler = Callable[[Dict[str, Any]], Optional[Tuple[str, bool]]]
+
 
 class MeetJoiner:
     """Google Meet Joiner - Automated meeting joining."""
 
-    def __init__(self, meet_url: str) -> None:
-        """Initialize the meet joiner."""
+    def __init__(
+        self,
+        meet_url: str,
+        socket_path: Optional[str] = None,
+        user_data_dir: Optional[str] = None,
+        mic_device: Optional[str] = None,
+        speaker_device: Optional[str] = None,
+        browser_pool: Optional[BrowserPool] = None,
+    ) -> None:
+        """Initialize the meet joiner.
+
+        Args:
+            meet_url: URL of the meeting to join.
+            socket_path: IPC socket for the voice agent, needed per meeting
+                when several joiners run on one host.
+            user_data_dir: Chrome profile directory, see setup_chrome_driver.
+            mic_device: Meet microphone label, defaults to BlackHole 2ch.
+            speaker_device: Meet speaker label, defaults to BlackHole.
+            browser_pool: Pool to check a warm, logged-in browser out of
+                instead of launching one; the browser is returned on leave.
+        """
         self.email = os.getenv("GOOGLE_EMAIL")
         self.password = os.getenv("GOOGLE_PASSWORD")
         self.meet_url = meet_url
-        self.driver = setup_chrome_driver()
+        self.user_data_dir = user_data_dir
+        self.mic_device = mic_device
+        self.speaker_device = speaker_device
+        self.browser_pool = browser_pool
+        self.driver: Optional[webdriver.Chrome] = None
         self.voice_agent_process: Optional[subprocess.Popen[bytes]] = None
-        self.ipc = IPCCommands()
+        self.ipc = IPCCommands(socket_path=socket_path, serve=True)
+        self.ipc_thread: Optional[threading.Thread] = None
+        self.meet_state = MeetStateMirror(on_change=self._publish_state)
+        # Carries the meeting audio through the page instead of BlackHole
+        self.page_audio = PageAudioBridge() if is_page_audio_enabled() else None
+        self.timeline = StartupTimeline()
         self.is_running = True
 
     def join_meeting(self) -> None:
-        """Complete process to join a Google Meet."""
+        """Complete process to join a Google Meet.
+
+        The voice agent warms up while the browser logs in and joins; it only
+        starts talking once it is attached after the join is confirmed.
+        """
         print(f"Joining meeting: {self.meet_url}")
 
-        login_to_google(self.driver, self.email, self.password)
-        self._navigate_to_meeting()
-        self._setup_meeting_preferences()
-        self._join_meeting()
+        self.start_ipc_handler()
+
+        orchestrator = StartupOrchestrator(self.timeline)
+        orchestrator.add_track("agent", [("Warm voice agent", self._warm_agent)])
+        orchestrator.add_track("browser", self._browser_steps())
+        orchestrator.run()
+
+        # Hand the meeting to the warm voice agent after a successful join
+        with self.timeline.step("Attach voice agent", "agent"):
+            self.attach_agent()
 
-        # Start voice agent after successful join
-        self.voice_agent_process = start_voice_agent_process()
+        self.timeline.print_report()
+        ui_latency.print_report()
+        self._report_browser_usage()
 
-        # Start IPC command handler in a separate thread
+    def start_ipc_handler(self) -> None:
+        """Start the IPC command handler in a separate thread."""
         self.ipc_thread = threading.Thread(target=self.handle_ipc_commands, daemon=True)
         self.ipc_thread.start()
         print("🔄 IPC command handler started")
 
+    def attach_agent(self) -> bool:
+        """Hand this meeting to the voice agent, routing it through our devices."""
+        return attach_voice_agent(
+            self.meet_url,
+            self.ipc.socket_path,
+            mic_device=self.mic_device,
+            speaker_device=self.speaker_device,
+            page_audio_endpoint=(
+                self.page_audio.endpoint(self.driver) if self.page_audio else None
+            ),
+        )
+
+    def restart_browser(self) -> None:
+        """Replace a crashed or ejected browser and rejoin.
+
+        The voice agent and the IPC channel stay up; only the browser side of
+        the join runs again. Page audio is tied to the old browser, so the
+        meeting is detached from the agent and attached again to the new page.
+        """
+        print(f"🔁 Restarting browser for {self.meet_url}")
+        if self.page_audio is not None:
+            detach_voice_agent(self.meet_url)
+        self._quit_driver()
+        timeline = StartupTimeline()
+        orchestrator = StartupOrchestrator(timeline)
+        orchestrator.add_track("browser", self._browser_steps())
+        orchestrator.run()
+        if self.page_audio is not None:
+            with timeline.step("Attach voice agent", "agent"):
+                self.attach_agent()
+        timeline.print_report()
+
+    def is_browser_alive(self) -> bool:
+        """Check whether the browser still answers WebDriver commands."""
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def is_in_meeting(self) -> bool:
+        """Check whether the browser is still in the call."""
+        if self.driver is None:
+            return False
+        if self.meet_state.has_state:
+            return bool(self.meet_state.snapshot()["in_call"])
+        return bool(self.driver.find_elements(By.CSS_SELECTOR, SELECTORS["leave_call"]))
+
+    @property
+    def actuator(self) -> UIActuator:
+        """UI actuator for the current browser."""
+        return UIActuator(self.driver)
+
+    def _browser_steps(self) -> List[Step]:
+        """Return the browser startup steps, from launch to joined."""
+        steps = [
+            ("Launch browser", self._launch_browser),
+            ("Login", self._login),
+            ("Navigate to meeting", self._navigate_to_meeting),
+            ("Meeting preferences", self._setup_meeting_preferences),
+            ("Join meeting", self._join_meeting),
+        ]
+        if is_audio_only_enabled():
+            steps.append(
+                (
+                    "Audio-only settings",
+                    lambda: set_lowest_receive_resolution(self.driver),
+                )
+            )
+        return steps
+
+    def browser_resource_usage(self) -> Optional[Dict[str, float]]:
+        """Return the resident memory and CPU of this meeting's browser."""
+        if self.driver is None:
+            return None
+        return browser_resource_usage(self.driver)
+
+    def _report_browser_usage(self) -> None:
+        """Print what this meeting's browser costs."""
+        usage = self.browser_resource_usage()
+        if usage is None:
+            print("📊 Browser resource usage unavailable")
+            return
+        print(
+            f"📊 Browser: {usage['rss_mb']:.0f} MB RSS, "
+            f"{usage['cpu_percent']:.0f}% CPU across {usage['processes']} processes"
+        )
+
+    def _launch_browser(self) -> None:
+        """Start Chrome and install the meeting state observer."""
+        if self.browser_pool is not None:
+            self.driver = self.browser_pool.checkout()
+        else:
+            self.driver = setup_chrome_driver(self.user_data_dir)
+        self.meet_state.install(self.driver)
+        if self.page_audio is not None:
+            self.page_audio.install(self.driver)
+
+    def _login(self) -> None:
+        """Make sure the browser is signed in to Google."""
+        if self.browser_pool is not None:
+            # Pooled browsers are signed in when they are launched
+            return
+        ensure_google_session(self.driver, self.email, self.password)
+
+    def _quit_driver(self) -> None:
+        """Quit the current browser, ignoring a browser that already died."""
+        if self.driver is None:
+            return
+        if self.browser_pool is not None:
+            self.browser_pool.discard(self.driver)
+        else:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+        self.driver = None
+
+    def _warm_agent(self) -> None:
+        """Start the voice agent daemon if needed and wait until it is warm."""
+        # Only the worker can route a meeting through chosen audio devices
+        self.voice_agent_process = ensure_voice_agent_daemon(
+            multi_worker=bool(self.page_audio or self.mic_device or self.speaker_device)
+        )
+        wait_for_voice_agent_daemon()
+
     def _navigate_to_meeting(self) -> None:
         """Navigate to the meeting URL."""
         self.driver.get(self.meet_url)
-        time.sleep(1)
+        try:
+            # The preview controls render once the green room is interactive
+            WebDriverWait(self.driver, 15, poll_frequency=0.1).until(
+                EC.presence_of_element_located(
+                    (
+                        By.CSS_SELECTOR,
+                        f'{SELECTORS["camera_on"]}, {SELECTORS["camera_off"]}',
+                    )
+                )
+            )
+        except TimeoutException:
+            print("⚠️ Meeting preview did not finish loading")
 
     def _setup_meeting_preferences(self) -> None:
         """Configure audio settings and turn off camera before joining."""
         toggle_camera(self.driver)
-        time.sleep(1)
-        set_microphone_to_blackhole(self.driver)
-        set_speaker_to_blackhole(self.driver)
+        if self.page_audio is not None:
+            # The page script supplies the microphone and taps the call audio
+            return
+        set_microphone_to_blackhole(self.driver, self.mic_device or DEFAULT_MIC_DEVICE)
+        set_speaker_to_blackhole(
+            self.driver, self.speaker_device or DEFAULT_SPEAKER_DEVICE
+        )
 
     def _join_meeting(self) -> None:
         """Click the join meeting button and wait if meeting is closed."""
-        # Wait for page to stabilize
-        time.sleep(1)
+        button_text = self._click_join_button()
 
-        # Find and click the join button
-        join_button, button_text = self._find_join_button()
-        self._click_button(join_button, button_text)
+        # Handle waiting to be let in
+        if "Ask to join" in button_text:
+            self._wait_for_ask_to_join_approval()
+            return
 
         # Check if we successfully joined
         if self._check_if_joined():
             print("✅ Successfully joined the meeting!")
             return
 
-        # Handle waiting to be let in
-        if button_text and "Ask to join" in button_text:
-            self._wait_for_ask_to_join_approval()
-        else:
-            self._wait_for_join_approval()
-
-    def _find_join_button(self):
-        """Find the join or ask to join button."""
-        focus_chrome_window(self.driver)
-        js_code = """
-        // First try specific class buttons
-        const buttons = document.querySelectorAll('button.UywwFc-LgbsSe');
-        for (let btn of buttons) {
-            const span = btn.querySelector('span.UywwFc-vQzf8d');
-            if (span && (span.textContent.includes('Join now') || span.textContent.includes('Ask to join'))) {
-                return btn;
-            }
-        }
-
-        // Fallback: check all buttons for text
-        const allButtons = document.querySelectorAll('button');
-        for (let btn of allButtons) {
-            if (btn.textContent.includes('Join now') || btn.textContent.includes('Ask to join')) {
-                return btn;
-            }
-        }
+        self._wait_for_join_approval()
 
-        return null;
-        """
-
-        try:
-            join_button = self.driver.execute_script(js_code)
-            if not join_button:
-                raise Exception("Could not find join button")
-
-            button_text = join_button.text
-            print(f"🔍 Found '{button_text}' button")
-            return join_button, button_text
-        except Exception as e:
-            raise Exception(f"Failed to find join button: {e}")
-
-    def _click_button(self, button, button_text):
-        """Click the button with fallback to JavaScript click."""
-        try:
-            button.click()
-            print(f"✓ Clicked '{button_text}' button")
-        except ElementClickInterceptedException:
-            # Fallback to JavaScript click if regular click is intercepted
-            self.driver.execute_script("arguments[0].click();", button)
-            print(f"✓ Clicked '{button_text}' button using JavaScript")
+    def _click_join_button(self) -> str:
+        """Click the join or ask to join button as soon as it renders."""
+        result = self.actuator.click_join(timeout=15)
+        if not result["ok"]:
+            raise Exception(f"Failed to find join button: {result.get('error')}")
+        print(f"✓ Clicked '{result['label']}' button")
+        return result["label"]
 
     def _check_if_joined(self):
         """Check if we successfully joined the meeting."""
+        return self._wait_until_in_meeting(10)
+
+    def _wait_until_in_meeting(self, timeout: float) -> bool:
+        """Wait until the in-call controls appear, returning as soon as they do."""
+        if self.meet_state.has_state:
+            return self.meet_state.wait_for(lambda state: state["in_call"], timeout)
+
         try:
-            wait = WebDriverWait(self.driver, 10)
-            wait.until(
+            WebDriverWait(self.driver, timeout, poll_frequency=0.2).until(
                 EC.presence_of_element_located(
-                    (By.CSS_SELECTOR, 'button[aria-label="Leave call"]')
+                    (By.CSS_SELECTOR, SELECTORS["leave_call"])
                 )
             )
             return True
@@ -157,102 +321,64 @@ class MeetJoiner:
         print("⏳ Asked to join. Waiting to be let into the meeting...")
 
         max_wait_time = 300
-        wait_interval = 3
-        elapsed_time = 0
+        retry_interval = 10
+        start_time = time.monotonic()
 
-        while elapsed_time < max_wait_time:
-            time.sleep(wait_interval)
-            elapsed_time += wait_interval
+        while time.monotonic() - start_time < max_wait_time:
+            remaining = max_wait_time - (time.monotonic() - start_time)
 
-            # Check if we've been let in
-            if self._is_in_meeting():
+            # Returns the moment the host admits us
+            if self._wait_until_in_meeting(min(retry_interval, remaining)):
                 print("✅ Successfully let into the meeting!")
                 return
 
             # Try clicking Ask to join again if needed
             self._retry_ask_to_join()
-            print(f"⏳ Still waiting... ({elapsed_time}s elapsed)")
+            elapsed_time = time.monotonic() - start_time
+            print(f"⏳ Still waiting... ({elapsed_time:.0f}s elapsed)")
 
         print("⚠️ Timeout waiting to be let into the meeting")
 
     def _wait_for_join_approval(self):
         """Wait briefly for 'Join now' approval."""
         print("⏳ Waiting to be let into the meeting...")
-        time.sleep(5)
 
-        # Final check
-        if self._is_in_meeting():
+        if self._wait_until_in_meeting(5):
             print("✅ Successfully joined the meeting!")
         else:
             print("⚠️ Could not confirm meeting join")
 
-    def _is_in_meeting(self):
-        """Check if we are in the meeting."""
-        try:
-            self.driver.find_element(By.CSS_SELECTOR, 'button[aria-label="Leave call"]')
-            return True
-        except Exception:
-            return False
+    def _publish_state(self, state: Dict[str, Any]) -> None:
+        """Forward meeting state changes to subscribed voice agents."""
+        self.ipc.publish("state", state)
 
     def _retry_ask_to_join(self):
         """Check and click 'Ask to join' button again if present."""
-        try:
-            js_check = """
-            const buttons = document.querySelectorAll('button');
-            for (let btn of buttons) {
-                if (btn.textContent.includes('Ask to join')) {
-                    return btn;
-                }
-            }
-            return null;
-            """
-            ask_again_button = self.driver.execute_script(js_check)
-            if ask_again_button:
-                self.driver.execute_script("arguments[0].click();", ask_again_button)
-                print("🔄 Clicked 'Ask to join' again")
-        except Exception:
-            pass
+        result = self.actuator.click_join(labels=["Ask to join"], timeout=0)
+        if result["ok"]:
+            print("🔄 Clicked 'Ask to join' again")
 
     def handle_ipc_commands(self) -> None:
         """Check and handle IPC commands from voice agent."""
+        handlers: Dict[str, IPCHandler] = {
+            "mute_microphone": self._mute_microphone,
+            "unmute_microphone": self._unmute_microphone,
+            "check_microphone_status": self._check_microphone_status,
+            "subscribe_state": self._subscribe_state,
+            "leave_meeting": self._leave_on_request,
+        }
         while self.is_running:
             try:
-                # Check for command
-                cmd_data = self.ipc.check_for_command()
-                if cmd_data:
-                    command = cmd_data.get("command")
-                    result = "Unknown command"
-
-                    # Handle different commands
-                    if command == "mute_microphone":
-                        turn_off_microphone(self.driver)
-                        result = "Microphone muted"
-                    elif command == "unmute_microphone":
-                        turn_on_microphone(self.driver)
-                        result = "Microphone unmuted"
-                    elif command == "check_microphone_status":
-                        # Check current microphone status
-                        try:
-                            focus_chrome_window(self.driver)
-                            mic_button = self.driver.find_element(
-                                By.CSS_SELECTOR, 'button[aria-label*="microphone"]'
-                            )
-                            aria_label = mic_button.get_attribute("aria-label")
-                            if "Turn off" in aria_label:
-                                result = "Microphone is currently unmuted"
-                            else:
-                                result = "Microphone is currently muted"
-                        except Exception:
-                            result = "Could not check microphone status"
-                    elif command == "leave_meeting":
-                        self.leave_meeting()
-                        result = "Left the meeting"
-                        self.is_running = False
-
-                    # Send response
-                    self.ipc.send_response(result)
-
-                time.sleep(0.1)  # Check every 100ms
+                # Block until a command arrives, waking up to check is_running
+                cmd_data = self.ipc.check_for_command(timeout=1.0)
+                if not cmd_data:
+                    continue
+                handler = handlers.get(cmd_data.get("command"))
+                response = handler(cmd_data) if handler else ("Unknown command", False)
+                # Handlers that answer themselves return None
+                if response is not None:
+                    result, ok = response
+                    self.ipc.send_response(result, cmd_data.get("id"), ok)
 
             except KeyboardInterrupt:
                 print("\n🛑 Stopping IPC handler")
@@ -261,7 +387,62 @@ class MeetJoiner:
                 print(f"Error in IPC handler: {e}")
                 time.sleep(1)
 
-    def leave_meeting(self) -> None:
-        """Leave meeting and cleanup."""
+    def _mute_microphone(self, cmd_data: Dict[str, Any]) -> Tuple[str, bool]:
+        """Mute the microphone in Meet."""
+        ok = turn_off_microphone(self.driver)
+        return ("Microphone muted" if ok else "Could not mute"), ok
+
+    def _unmute_microphone(self, cmd_data: Dict[str, Any]) -> Tuple[str, bool]:
+        """Unmute the microphone in Meet."""
+        ok = turn_on_microphone(self.driver)
+        return ("Microphone unmuted" if ok else "Could not unmute"), ok
+
+    def _check_microphone_status(self, cmd_data: Dict[str, Any]) -> Tuple[str, bool]:
+        """Report whether the microphone is muted."""
+        mic_muted = self.meet_state.snapshot()["mic_muted"]
+        if mic_muted is None:
+            # Mirror not populated yet, read the page directly
+            mic_muted = self.actuator.read_status().get("mic_muted")
+        if mic_muted is None:
+            return "Could not check microphone status", False
+        if mic_muted:
+            return "Microphone is currently muted", True
+        return "Microphone is currently unmuted", True
+
+    def _subscribe_state(self, cmd_data: Dict[str, Any]) -> None:
+        """Stream meeting state changes to the caller, starting with the current one."""
+        self.ipc.subscribe(cmd_data.get("id"))
+        self.ipc.send_response("Subscribed", cmd_data.get("id"))
+        self._publish_state(self.meet_state.snapshot())
+
+    def _leave_on_request(self, cmd_data: Dict[str, Any]) -> None:
+        """Leave the meeting when the voice agent asks to."""
+        # Acknowledge first, leaving closes the IPC socket
+        self.ipc.send_response("Left the meeting", cmd_data.get("id"))
+        self.leave_meeting()
         self.is_running = False
-        leave_meeting_cleanup(self.driver, self.voice_agent_process)
+
+    def leave_meeting(self, stop_agent: bool = False) -> None:
+        """Leave meeting and cleanup.
+
+        Args:
+            stop_agent: Also shut down the voice agent daemon instead of only
+                detaching it, e.g. when the application exits.
+        """
+        self.is_running = False
+        if stop_agent:
+            stop_voice_agent_daemon(self.voice_agent_process)
+        else:
+            detach_voice_agent(self.meet_url)
+        if self.browser_pool is not None and self.driver is not None:
+            # Hand the browser back warm instead of quitting it
+            leave_meeting_cleanup(self.driver, None, quit_driver=False)
+            self.meet_state.uninstall(self.driver)
+            if self.page_audio is not None:
+                self.page_audio.uninstall(self.driver)
+            self.browser_pool.checkin(self.driver)
+            self.driver = None
+        else:
+            leave_meeting_cleanup(self.driver, None)
+        self.meet_state.close()
+        self.ipc.close()
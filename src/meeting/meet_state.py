@@ -0,0 +1,287 @@
+"""Live Google Meet state mirror kept up to date from the browser.
+
+An injected page script watches the Meet DOM with a MutationObserver and
+pushes a compact state snapshot whenever it changes, through a DevTools
+Runtime binding. A background thread receives the snapshots, so status
+reads never need a WebDriver round trip, nothing polls the page, and the
+page needs no network access or CSP exception to report its state.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from selenium import webdriver
+
+from .devtools import DevToolsConnection, page_endpoint
+from .ui_actuator import SELECTORS
+
+DEFAULT_STATE: Dict[str, Any] = {
+    "in_call": False,
+    "mic_muted": None,
+    "camera_off": None,
+    "participant_count": 0,
+    "active_speaker": None,
+    "url": None,
+    "updated_at": None,
+}
+
+# Runtime binding the page pushes JSON snapshots through
+STATE_BINDING = "__groquetteMeetState"
+
+# Injected into every document; %(selectors)s is the shared selector registry
+# and %(binding)s the binding name
+STATE_OBSERVER_SCRIPT = """
+(() => {
+    if (window.__groquetteStateObserver || window !== window.top) return;
+
+    const SELECTORS = %(selectors)s;
+    const BINDING = "%(binding)s";
+    const q = (name) => document.querySelector(SELECTORS[name]);
+
+    const readState = () => {
+        const micOff = q("mic_off");
+        const micOn = q("mic_on");
+        const cameraOff = q("camera_off");
+        const cameraOn = q("camera_on");
+
+        const participants = new Set();
+        document.querySelectorAll(SELECTORS.participant).forEach((tile) => {
+            participants.add(tile.getAttribute("data-participant-id"));
+        });
+        const badge = document.querySelector(
+            '[aria-label^="Show everyone"] [data-avatar-count], ' +
+            '[aria-label*="participants" i] [data-avatar-count]');
+        const badgeCount = badge ? parseInt(badge.getAttribute("data-avatar-count"), 10) : 0;
+
+        const speakingTile = document.querySelector(
+            '[data-participant-id][data-audio-level]:not([data-audio-level="0"])');
+        const speakerName = speakingTile
+            ? speakingTile.querySelector("[data-self-name]")
+            : null;
+
+        return {
+            in_call: !!q("leave_call"),
+            mic_muted: micOff ? true : (micOn ? false : null),
+            camera_off: cameraOff ? true : (cameraOn ? false : null),
+            participant_count: Math.max(participants.size, badgeCount || 0),
+            active_speaker: speakerName
+                ? speakerName.getAttribute("data-self-name") || speakerName.textContent
+                : null,
+            url: location.href,
+        };
+    };
+
+    let lastBody = "";
+    let scheduled = false;
+    const push = () => {
+        scheduled = false;
+        // The binding only exists while the mirror is connected
+        if (typeof window[BINDING] !== "function") return;
+        const body = JSON.stringify(readState());
+        if (body === lastBody) return;
+        lastBody = body;
+        window[BINDING](body);
+    };
+    const schedule = () => {
+        if (scheduled) return;
+        scheduled = true;
+        setTimeout(push, 50);
+    };
+
+    const start = () => {
+        new MutationObserver(schedule).observe(document.documentElement, {
+            subtree: true,
+            childList: true,
+            attributes: true,
+            attributeFilter: ["aria-label", "aria-pressed", "data-participant-id",
+                              "data-audio-level"],
+        });
+        push();
+    };
+
+    // Lets a newly connected mirror ask for the current state
+    window.__groquetteStateObserver = {
+        resend: () => {
+            lastBody = "";
+            push();
+        },
+    };
+
+    if (document.readyState === "loading") {
+        document.addEventListener("DOMContentLoaded", start);
+    } else {
+        start();
+    }
+})();
+"""
+
+# Asks the observer of the current document to push its state again
+RESEND_STATE_SCRIPT = (
+    "window.__groquetteStateObserver && window.__groquetteStateObserver.resend()"
+)
+
+
+class MeetStateMirror:
+    """Thread-safe local copy of the meeting state kept by the page."""
+
+    def __init__(
+        self, on_change: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> None:
+        """Initialize an empty mirror; install() starts following a browser.
+
+        Args:
+            on_change: Called with a snapshot every time the state changes.
+        """
+        self.on_change = on_change
+        self.has_state = False
+        self._state: Dict[str, Any] = dict(DEFAULT_STATE)
+        self._condition = threading.Condition()
+        self._script_id: Optional[str] = None
+        # Follower thread, with the event loop and connection it runs
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connection: Optional[DevToolsConnection] = None
+        self._stop = threading.Event()
+
+    def install(self, driver: webdriver.Chrome) -> None:
+        """Inject the observer into the current and all future documents.
+
+        Installing into a new browser, e.g. after a restart, first stops
+        following the old one and forgets its state.
+        """
+        self._stop_following()
+        with self._condition:
+            self._state = dict(DEFAULT_STATE)
+            self.has_state = False
+
+        script = STATE_OBSERVER_SCRIPT % {
+            "selectors": json.dumps(SELECTORS),
+            "binding": STATE_BINDING,
+        }
+        try:
+            result = driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument", {"source": script}
+            )
+            self._script_id = result.get("identifier")
+            driver.execute_script(script)
+            print("👀 Meeting state observer installed")
+        except Exception as e:
+            print(f"Could not install meeting state observer: {e}")
+            return
+
+        endpoint = page_endpoint(driver)
+        if endpoint is None:
+            return
+        # A fresh event per browser, so the old follower keeps its own stop
+        self._stop = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._connection = DevToolsConnection(endpoint, self._handle_event)
+        self._thread = threading.Thread(
+            target=self._follow,
+            args=(self._loop, self._connection, self._stop),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def uninstall(self, driver: webdriver.Chrome) -> None:
+        """Stop following the browser, e.g. before it is reused."""
+        self._stop_following()
+        if self._script_id is None:
+            return
+        try:
+            driver.execute_cdp_cmd(
+                "Page.removeScriptToEvaluateOnNewDocument",
+                {"identifier": self._script_id},
+            )
+        except Exception as e:
+            print(f"Could not remove meeting state observer: {e}")
+        self._script_id = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a copy of the latest meeting state."""
+        with self._condition:
+            return dict(self._state)
+
+    def wait_for(
+        self, predicate: Callable[[Dict[str, Any]], bool], timeout: float
+    ) -> bool:
+        """Block until the state satisfies predicate or the timeout expires."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: predicate(self._state), timeout=timeout
+            )
+
+    def update(self, state: Dict[str, Any]) -> None:
+        """Merge a state snapshot pushed by the page."""
+        with self._condition:
+            self._state.update(
+                {key: state[key] for key in DEFAULT_STATE if key in state}
+            )
+            self._state["updated_at"] = time.time()
+            self.has_state = True
+            snapshot = dict(self._state)
+            self._condition.notify_all()
+
+        if self.on_change is not None:
+            try:
+                self.on_change(snapshot)
+            except Exception as e:
+                print(f"Error publishing meeting state: {e}")
+
+    def close(self) -> None:
+        """Stop following the browser."""
+        self._stop_following()
+
+    def _follow(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        connection: DevToolsConnection,
+        stop: threading.Event,
+    ) -> None:
+        """Receive state pushed by the page until stopped (follower thread)."""
+        try:
+            loop.run_until_complete(self._receive(connection, stop))
+        finally:
+            loop.close()
+
+    async def _receive(
+        self, connection: DevToolsConnection, stop: threading.Event
+    ) -> None:
+        """Connect to the page, add the binding and wait for the connection to end."""
+        try:
+            await connection.connect()
+            if stop.is_set():
+                return
+            await connection.command("Runtime.addBinding", {"name": STATE_BINDING})
+            await connection.command("Runtime.enable")
+            await connection.command(
+                "Runtime.evaluate", {"expression": RESEND_STATE_SCRIPT}
+            )
+            await connection.wait_closed()
+        except (ConnectionError, RuntimeError) as e:
+            if not stop.is_set():
+                print(f"Meeting state observer disconnected: {e}")
+        finally:
+            await connection.close()
+
+    def _handle_event(self, method: str, params: Dict[str, Any]) -> None:
+        """Apply a snapshot the page pushed through the binding."""
+        if method == "Runtime.bindingCalled" and params.get("name") == STATE_BINDING:
+            self.update(json.loads(params["payload"]))
+
+    def _stop_following(self) -> None:
+        """Close the DevTools connection and wait for the follower thread."""
+        thread, loop, connection = self._thread, self._loop, self._connection
+        self._thread = self._loop = self._connection = None
+        if thread is None:
+            return
+        self._stop.set()
+        try:
+            asyncio.run_coroutine_threadsafe(connection.close(), loop)
+        except RuntimeError:
+            # The follower already finished and closed its loop
+            pass
+        thread.join(timeout=5)
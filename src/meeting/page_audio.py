@@ -0,0 +1,238 @@
+"""Meeting audio transport through the page instead of virtual devices.
+
+An injected script taps the remote WebRTC audio tracks of the call and
+hands Meet a synthetic microphone track. Both directions are carried as
+16-bit mono PCM over the Chrome DevTools protocol: the voice agent worker
+connects to the meeting's page target, receives the captured audio through
+Runtime bindings and plays its speech by evaluating calls into the page.
+Nothing is loaded from or sent to the network, so Meet's Content Security
+Policy stays in force. No system audio device (and no BlackHole driver) is
+involved, and every meeting gets its own channel to its own page.
+"""
+
+import os
+from typing import Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from .devtools import page_endpoint
+
+PAGE_AUDIO_SAMPLE_RATE = 24000
+# ScriptProcessorNode block size, about 21 ms at 24 kHz
+PAGE_AUDIO_BLOCK_SAMPLES = 512
+
+# Runtime bindings the worker installs: captured audio as base64 PCM, and
+# playback progress reports as JSON
+PAGE_AUDIO_BINDING = "__groquetteAudioFrame"
+PAGE_REPORT_BINDING = "__groquetteAudioReport"
+
+# Let the page create running AudioContexts and find a (fake) microphone on
+# hosts without sound hardware; the synthetic track replaces it anyway
+PAGE_AUDIO_CHROME_ARGS = [
+    "--autoplay-policy=no-user-gesture-required",
+    "--use-fake-device-for-media-stream",
+]
+
+# Injected into every new document before Meet's own scripts run. Audio is
+# processed with ScriptProcessorNodes, since an AudioWorklet module would
+# have to be loaded from a URL that Meet's CSP allows.
+PAGE_AUDIO_SCRIPT = """
+(() => {
+    if (window.__groquettePageAudio || location.hostname !== "meet.google.com") {
+        return;
+    }
+
+    const SAMPLE_RATE = %(sample_rate)d;
+    const BLOCK_SAMPLES = %(block_samples)d;
+    const REPORT_SAMPLES = SAMPLE_RATE / 10;
+    const AUDIO_BINDING = "%(audio_binding)s";
+    const REPORT_BINDING = "%(report_binding)s";
+
+    const encode = (samples) =>
+        btoa(String.fromCharCode.apply(null, new Uint8Array(samples.buffer)));
+    const decode = (text) => {
+        const binary = atob(text);
+        const bytes = new Uint8Array(binary.length);
+        for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+        return new Int16Array(bytes.buffer);
+    };
+    // The bindings only exist while the worker is attached to this page
+    const send = (binding, payload) => {
+        if (typeof window[binding] === "function") window[binding](payload);
+    };
+
+    const context = new AudioContext({sampleRate: SAMPLE_RATE, latencyHint: "interactive"});
+    // Keep both processors pulled by the graph without hearing them
+    const mute = context.createGain();
+    mute.gain.value = 0;
+    mute.connect(context.destination);
+
+    // Capture mixes every tapped remote track into Int16 blocks
+    const capture = context.createScriptProcessor(BLOCK_SAMPLES, 1, 1);
+    capture.onaudioprocess = (event) => {
+        if (typeof window[AUDIO_BINDING] !== "function") return;
+        const input = event.inputBuffer.getChannelData(0);
+        const block = new Int16Array(input.length);
+        for (let i = 0; i < input.length; i++) {
+            block[i] = Math.max(-1, Math.min(1, input[i])) * 32767;
+        }
+        send(AUDIO_BINDING, encode(block));
+    };
+    capture.connect(mute);
+
+    // Playback plays PCM from the agent and reports how far it got, using
+    // start/end markers queued in order with the audio
+    let queue = [];
+    let offset = 0;
+    let segment = null;
+    let played = 0;
+    let unreported = 0;
+    const report = (type) => {
+        send(REPORT_BINDING, JSON.stringify({type, segment, played}));
+        unreported = 0;
+    };
+    const playback = context.createScriptProcessor(BLOCK_SAMPLES, 1, 1);
+    playback.onaudioprocess = (event) => {
+        const output = event.outputBuffer.getChannelData(0);
+        let written = 0;
+        while (written < output.length && queue.length) {
+            const item = queue[0];
+            if (item.type === "start") {
+                segment = item.segment;
+                played = 0;
+                queue.shift();
+            } else if (item.type === "end") {
+                report("finished");
+                segment = null;
+                queue.shift();
+            } else {
+                const count = Math.min(output.length - written, item.data.length - offset);
+                for (let i = 0; i < count; i++) {
+                    output[written + i] = item.data[offset + i] / 32768;
+                }
+                written += count;
+                offset += count;
+                played += count;
+                unreported += count;
+                if (offset === item.data.length) {
+                    queue.shift();
+                    offset = 0;
+                }
+            }
+        }
+        output.fill(0, written);
+        if (segment !== null && unreported >= REPORT_SAMPLES) report("progress");
+    };
+    const microphone = context.createMediaStreamDestination();
+    playback.connect(microphone);
+    playback.connect(mute);
+
+    // Called by the worker with a batch of audio and control messages
+    window.__groquettePageAudio = {
+        receive(messages) {
+            context.resume();
+            for (const message of messages) {
+                if (message.type === "clear") {
+                    queue = [];
+                    offset = 0;
+                    segment = null;
+                } else if (message.type === "audio") {
+                    queue.push({type: "audio", data: decode(message.data)});
+                } else {
+                    queue.push(message);
+                }
+            }
+        },
+    };
+
+    // Feed every remote audio track into the capture mix
+    const tapped = new Set();
+    const tap = (track) => {
+        if (tapped.has(track.id)) return;
+        tapped.add(track.id);
+        context.resume();
+        const source = context.createMediaStreamSource(new MediaStream([track]));
+        source.connect(capture);
+        track.addEventListener("ended", () => {
+            source.disconnect();
+            tapped.delete(track.id);
+        });
+    };
+    const NativePeerConnection = window.RTCPeerConnection;
+    window.RTCPeerConnection = class extends NativePeerConnection {
+        constructor(...args) {
+            super(...args);
+            this.addEventListener("track", (event) => {
+                if (event.track.kind === "audio") tap(event.track);
+            });
+        }
+    };
+
+    // Hand Meet the agent's voice whenever it asks for a microphone
+    const mediaDevices = navigator.mediaDevices;
+    const getUserMedia = mediaDevices.getUserMedia.bind(mediaDevices);
+    mediaDevices.getUserMedia = async (constraints) => {
+        if (!constraints || !constraints.audio) return getUserMedia(constraints);
+        const tracks = [microphone.stream.getAudioTracks()[0].clone()];
+        if (constraints.video) {
+            const video = await getUserMedia({video: constraints.video});
+            tracks.push(...video.getVideoTracks());
+        }
+        return new MediaStream(tracks);
+    };
+})();
+"""
+
+
+def is_page_audio_enabled() -> bool:
+    """Check whether GROQUETTE_AUDIO_TRANSPORT selects the page transport."""
+    return os.getenv("GROQUETTE_AUDIO_TRANSPORT", "device").lower() == "page"
+
+
+def add_page_audio_options(opt: Options) -> None:
+    """Add the Chrome flags the page transport needs to the driver options."""
+    for arg in PAGE_AUDIO_CHROME_ARGS:
+        opt.add_argument(arg)
+
+
+class PageAudioBridge:
+    """Page side of one meeting's audio channel to the voice agent worker."""
+
+    def __init__(self) -> None:
+        """Initialize the bridge; install() injects the page script."""
+        self._script_id: Optional[str] = None
+
+    def install(self, driver: webdriver.Chrome) -> None:
+        """Inject the audio script into every future Meet document."""
+        script = PAGE_AUDIO_SCRIPT % {
+            "sample_rate": PAGE_AUDIO_SAMPLE_RATE,
+            "block_samples": PAGE_AUDIO_BLOCK_SAMPLES,
+            "audio_binding": PAGE_AUDIO_BINDING,
+            "report_binding": PAGE_REPORT_BINDING,
+        }
+        try:
+            result = driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument", {"source": script}
+            )
+            self._script_id = result.get("identifier")
+            print("🎧 Page audio transport installed")
+        except Exception as e:
+            print(f"Could not install page audio transport: {e}")
+
+    def endpoint(self, driver: webdriver.Chrome) -> Optional[str]:
+        """Return the DevTools WebSocket URL the worker carries the audio over."""
+        return page_endpoint(driver)
+
+    def uninstall(self, driver: webdriver.Chrome) -> None:
+        """Stop injecting the audio script, e.g. before a browser is reused."""
+        if self._script_id is None:
+            return
+        try:
+            driver.execute_cdp_cmd(
+                "Page.removeScriptToEvaluateOnNewDocument",
+                {"identifier": self._script_id},
+            )
+        except Exception as e:
+            print(f"Could not remove page audio transport: {e}")
+        self._script_id = None
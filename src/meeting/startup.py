@@ -0,0 +1,132 @@
+"""Parallel startup orchestration with a per-run critical-path timeline."""
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+Step = Tuple[str, Callable[[], Any]]
+
+
+class StartupTimeline:
+    """Records when each startup step ran, relative to the start of the run."""
+
+    def __init__(self) -> None:
+        """Start the clock."""
+        self.start_time = time.perf_counter()
+        self.steps: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name: str, track: str = "main") -> Iterator[None]:
+        """Time a step on the given track."""
+        start = time.perf_counter() - self.start_time
+        try:
+            yield
+        finally:
+            end = time.perf_counter() - self.start_time
+            with self._lock:
+                self.steps.append(
+                    {"track": track, "name": name, "start": start, "end": end}
+                )
+            print(f"⏱️ [{track}] {name} took {end - start:.2f}s")
+
+    def critical_track(self) -> Optional[str]:
+        """Return the track whose last step finished latest."""
+        if not self.steps:
+            return None
+        return max(self.steps, key=lambda step: step["end"])["track"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the timeline in a machine-readable form."""
+        with self._lock:
+            steps = sorted(self.steps, key=lambda step: step["start"])
+        return {
+            "total": max((step["end"] for step in steps), default=0.0),
+            "critical_track": self.critical_track(),
+            "steps": steps,
+        }
+
+    def print_report(self) -> None:
+        """Print every step in start order, marking the critical path."""
+        report = self.to_dict()
+        critical = report["critical_track"]
+        print(
+            f"📊 Startup timeline: {report['total']:.2f}s total, "
+            f"critical path: {critical}"
+        )
+        width = max((len(step["track"]) for step in report["steps"]), default=0)
+        for step in report["steps"]:
+            marker = "*" if step["track"] == critical else " "
+            print(
+                f"  {marker} [{step['track']:<{width}}] "
+                f"{step['start']:6.2f}s → {step['end']:6.2f}s  {step['name']} "
+                f"({step['end'] - step['start']:.2f}s)"
+            )
+
+
+class StartupOrchestrator:
+    """Runs independent startup tracks concurrently.
+
+    Steps within a track run in order; tracks run in parallel threads. The
+    first exception raised by any track is re-raised right away: the other
+    tracks stop before their next step, and run() does not wait for the step
+    they are in.
+    """
+
+    def __init__(self, timeline: Optional[StartupTimeline] = None) -> None:
+        """Initialize the orchestrator."""
+        self.timeline = timeline or StartupTimeline()
+        self._tracks: Dict[str, List[Step]] = {}
+
+    def add_track(self, track: str, steps: List[Step]) -> None:
+        """Register an ordered list of (name, callable) steps as a track."""
+        self._tracks[track] = steps
+
+    def run(self) -> None:
+        """Run all tracks and wait for them to finish, or for the first failure."""
+        results: "queue.Queue[Optional[BaseException]]" = queue.Queue()
+        stop = threading.Event()
+        threads = [
+            threading.Thread(
+                target=self._run_track,
+                args=(track, steps, results, stop),
+                name=f"startup-{track}",
+                daemon=True,
+            )
+            for track, steps in self._tracks.items()
+        ]
+
+        for thread in threads:
+            thread.start()
+        for _ in threads:
+            error = results.get()
+            if error is not None:
+                stop.set()
+                raise error
+
+    def _run_track(
+        self,
+        track: str,
+        steps: List[Step],
+        results: "queue.Queue[Optional[BaseException]]",
+        stop: threading.Event,
+    ) -> None:
+        """Run one track's steps in order and report how it ended.
+
+        Stops at the first failure, or before the next step once another
+        track has failed.
+        """
+        error = None
+        for name, func in steps:
+            if stop.is_set():
+                break
+            try:
+                with self.timeline.step(name, track):
+                    func()
+            except BaseException as e:
+                print(f"❌ Startup step '{name}' failed: {e}")
+                error = e
+                break
+        results.put(error)
@@ -0,0 +1,293 @@
+"""Batched Google Meet UI actuation.
+
+Every meeting operation (toggle the microphone, pick an audio device, read
+the controls) runs as a single injected script that finds, clicks, waits in
+the page and returns a structured result. That is one WebDriver round trip
+per operation instead of one per find_element, click and attribute read.
+The CSS selectors for Meet's controls live in one registry shared by the
+actuator, the state observer and the joiner, and each operation's latency
+is recorded in a histogram.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Sequence
+
+from selenium import webdriver
+
+# Meet controls, shared by every script and Selenium lookup
+SELECTORS: Dict[str, str] = {
+    # The microphone and camera buttons are labelled with the action they take
+    "mic_on": 'button[aria-label*="Turn off microphone"]',
+    "mic_off": 'button[aria-label*="Turn on microphone"]',
+    "camera_on": '[role="button"][aria-label*="Turn off camera"]',
+    "camera_off": '[role="button"][aria-label*="Turn on camera"]',
+    "leave_call": 'button[aria-label="Leave call"]',
+    "join_button": "button.UywwFc-LgbsSe",
+    "mic_menu": 'button[aria-label*="Microphone"][aria-haspopup="menu"]',
+    "speaker_menu": 'button[aria-label*="Speaker"][aria-haspopup="menu"]',
+    "menu_option": 'li[role="menuitemradio"]',
+    "more_options": 'button[aria-label="More options"]',
+    "close_dialog": 'button[aria-label="Close dialog"]',
+    "participant": "[data-participant-id]",
+}
+
+JOIN_LABELS = ["Join now", "Ask to join"]
+
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Shared prelude: arguments[0] holds the operation's args, the last argument
+# is the async callback. waitFor polls in the page, so waiting costs no
+# extra round trips.
+_PRELUDE = """
+const SELECTORS = __SELECTORS__;
+const args = arguments[0];
+const done = arguments[arguments.length - 1];
+const q = (name) => document.querySelector(SELECTORS[name]);
+const visible = (el) => !!el && el.getClientRects().length > 0;
+const waitFor = (fn, timeout) => new Promise((resolve) => {
+    const deadline = Date.now() + timeout;
+    const tick = () => {
+        const value = fn();
+        if (value || Date.now() >= deadline) {
+            resolve(value || null);
+        } else {
+            setTimeout(tick, 20);
+        }
+    };
+    tick();
+});
+const run = async () => {
+__BODY__
+};
+run().then(done, (e) => done({ok: false, error: String(e)}));
+"""
+
+_OPERATIONS: Dict[str, str] = {
+    # args: {control: "mic" | "camera", off: bool, timeout}
+    "set_toggle": """
+    const target = args.off ? args.control + "_off" : args.control + "_on";
+    const source = args.off ? args.control + "_on" : args.control + "_off";
+    if (q(target)) return {ok: true, changed: false};
+    const button = q(source);
+    if (!button) return {ok: false, error: args.control + " button not found"};
+    button.click();
+    const confirmed = await waitFor(() => q(target), args.timeout);
+    return {ok: !!confirmed, changed: true,
+            error: confirmed ? null : args.control + " state did not change"};
+""",
+    # args: {menu: "mic_menu" | "speaker_menu", device, timeout}
+    "select_device": """
+    const label = () => {
+        const menu = q(args.menu);
+        return menu ? menu.getAttribute("aria-label") || "" : "";
+    };
+    const menu = q(args.menu);
+    if (!menu) return {ok: false, error: "device menu not found"};
+    if (label().includes(args.device)) {
+        return {ok: true, changed: false, selected: label()};
+    }
+    menu.click();
+    const options = () => Array.from(document.querySelectorAll(SELECTORS.menu_option))
+        .filter(visible);
+    const option = await waitFor(
+        () => options().find((o) => o.textContent.includes(args.device)), args.timeout);
+    if (!option) {
+        const available = options().map((o) => o.textContent.trim());
+        document.body.click();
+        return {ok: false, error: "device not in menu", options: available};
+    }
+    option.click();
+    const selected = await waitFor(
+        () => label().includes(args.device) ? label() : null, args.timeout);
+    return {ok: true, changed: true, selected: selected || label(),
+            confirmed: !!selected};
+""",
+    "read_status": """
+    const menuLabel = (name) => {
+        const menu = q(name);
+        return menu ? menu.getAttribute("aria-label") : null;
+    };
+    return {
+        ok: true,
+        in_call: !!q("leave_call"),
+        mic_muted: q("mic_off") ? true : (q("mic_on") ? false : null),
+        camera_off: q("camera_off") ? true : (q("camera_on") ? false : null),
+        mic_device: menuLabel("mic_menu"),
+        speaker_device: menuLabel("speaker_menu"),
+    };
+""",
+    # args: {labels, timeout}
+    "click_join": """
+    const labelOf = (b) => args.labels.find((l) => b.textContent.includes(l));
+    // Prefer Meet's join button class, fall back to any button with the text
+    const find = () =>
+        Array.from(document.querySelectorAll(SELECTORS.join_button)).find(labelOf) ||
+        Array.from(document.querySelectorAll("button")).find(labelOf);
+    const button = await waitFor(find, args.timeout);
+    if (!button) return {ok: false, error: "join button not found"};
+    const label = labelOf(button);
+    button.click();
+    return {ok: true, label: label};
+""",
+    "leave_call": """
+    const button = q("leave_call");
+    if (!button) return {ok: false, error: "not in a call"};
+    button.click();
+    return {ok: true};
+""",
+}
+
+
+def _build_script(body: str) -> str:
+    """Combine the prelude, the selector registry and an operation body."""
+    return _PRELUDE.replace("__SELECTORS__", json.dumps(SELECTORS)).replace(
+        "__BODY__", body
+    )
+
+
+SCRIPTS: Dict[str, str] = {
+    name: _build_script(body) for name, body in _OPERATIONS.items()
+}
+
+
+class LatencyHistogram:
+    """Thread-safe per-operation latency histogram."""
+
+    def __init__(
+        self, buckets_ms: Sequence[float] = LATENCY_BUCKETS_MS, max_samples: int = 1000
+    ) -> None:
+        """Initialize the histogram.
+
+        Args:
+            buckets_ms: Upper bounds of the histogram buckets in milliseconds.
+            max_samples: Recent samples kept per operation for percentiles.
+        """
+        self.buckets_ms = tuple(buckets_ms)
+        self.max_samples = max_samples
+        self._counts: Dict[str, list] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float) -> None:
+        """Record one operation's latency."""
+        latency_ms = seconds * 1000
+        index = next(
+            (i for i, bound in enumerate(self.buckets_ms) if latency_ms <= bound),
+            len(self.buckets_ms),
+        )
+        with self._lock:
+            counts = self._counts.setdefault(
+                operation, [0] * (len(self.buckets_ms) + 1)
+            )
+            counts[index] += 1
+            samples = self._samples.setdefault(
+                operation, deque(maxlen=self.max_samples)
+            )
+            samples.append(latency_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return counts, percentiles and bucket counts per operation."""
+        labels = [f"<={bound:g}ms" for bound in self.buckets_ms]
+        labels.append(f">{self.buckets_ms[-1]:g}ms")
+
+        with self._lock:
+            report = {}
+            for operation, counts in self._counts.items():
+                samples = sorted(self._samples[operation])
+                report[operation] = {
+                    "count": sum(counts),
+                    "p50_ms": samples[len(samples) // 2],
+                    "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+                    "max_ms": samples[-1],
+                    "buckets": dict(zip(labels, counts)),
+                }
+        return report
+
+    def print_report(self) -> None:
+        """Print one line per operation."""
+        report = self.snapshot()
+        if not report:
+            return
+        print("📊 UI operation latency:")
+        for operation, stats in sorted(report.items()):
+            print(
+                f"  {operation:<14} n={stats['count']:<4} "
+                f"p50={stats['p50_ms']:.0f}ms p95={stats['p95_ms']:.0f}ms "
+                f"max={stats['max_ms']:.0f}ms"
+            )
+
+
+# Shared by every actuator in the process
+ui_latency = LatencyHistogram()
+
+
+class UIActuator:
+    """Runs Meet UI operations as single injected scripts."""
+
+    def __init__(
+        self,
+        driver: webdriver.Chrome,
+        histogram: Optional[LatencyHistogram] = None,
+        timeout: float = 3.0,
+    ) -> None:
+        """Initialize the actuator.
+
+        Args:
+            driver: Browser showing the meeting.
+            histogram: Where latencies are recorded, defaults to ui_latency.
+            timeout: Seconds each operation waits in the page for the UI.
+        """
+        self.driver = driver
+        self.histogram = histogram or ui_latency
+        self.timeout = timeout
+
+    def run(self, operation: str, **args: Any) -> Dict[str, Any]:
+        """Run one operation script and return its structured result.
+
+        WebDriver errors are reported as ``ok=False`` results.
+        """
+        args.setdefault("timeout", self.timeout * 1000)
+        start_time = time.perf_counter()
+        try:
+            result = self.driver.execute_async_script(SCRIPTS[operation], args)
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+        self.histogram.record(operation, time.perf_counter() - start_time)
+        return result or {"ok": False, "error": "no result"}
+
+    def set_microphone(self, muted: bool) -> Dict[str, Any]:
+        """Mute or unmute the microphone, confirming the button flipped."""
+        return self.run("set_toggle", control="mic", off=muted)
+
+    def set_camera(self, off: bool) -> Dict[str, Any]:
+        """Turn the camera off or on, confirming the button flipped."""
+        return self.run("set_toggle", control="camera", off=off)
+
+    def select_audio_device(self, kind: str, device_name: str) -> Dict[str, Any]:
+        """Select a device by label in the microphone or speaker menu.
+
+        Args:
+            kind: "microphone" or "speaker".
+            device_name: Part of the device label shown by Meet.
+        """
+        menu = "mic_menu" if kind == "microphone" else "speaker_menu"
+        return self.run("select_device", menu=menu, device=device_name)
+
+    def read_status(self) -> Dict[str, Any]:
+        """Read call, microphone, camera and device state in one call."""
+        return self.run("read_status")
+
+    def click_join(
+        self, labels: Sequence[str] = JOIN_LABELS, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """Wait for a join button, click it and return its label."""
+        if timeout is None:
+            timeout = self.timeout
+        return self.run("click_join", labels=list(labels), timeout=timeout * 1000)
+
+    def leave_call(self) -> Dict[str, Any]:
+        """Click the leave call button."""
+        return self.run("leave_call")
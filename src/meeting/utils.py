@@ -4,18 +4,63 @@ import os
 import subprocess
 import sys
 import time
-from typing import Optional
+from typing import List, Optional
 
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .audio_only import (
+    add_audio_only_options,
+    install_audio_only_mode,
+    is_audio_only_enabled,
+    is_headless_enabled,
+)
+from .ipc_commands import AGENT_DAEMON_SOCKET, IPCCommands
+from .page_audio import add_page_audio_options, is_page_audio_enabled
+from .ui_actuator import SELECTORS, UIActuator
+
+GOOGLE_LOGIN_URL = "https://accounts.google.com/ServiceLogin?hl=en&passive=true&continue=https://www.google.com/&ec=GAZAAQ"
+
+# Meet device labels the agent's audio is routed through by default
+DEFAULT_MIC_DEVICE = "BlackHole 2ch (Virtual)"
+DEFAULT_SPEAKER_DEVICE = "BlackHole"
+
+
+def setup_chrome_driver(
+    user_data_dir: Optional[str] = None, audio_only: Optional[bool] = None
+) -> webdriver.Chrome:
+    """Initialize Chrome driver with meeting-optimized settings.
+
+    Args:
+        user_data_dir: Persistent Chrome profile directory, defaults to
+            GROQUETTE_CHROME_PROFILE. A saved Google session in the profile
+            lets ensure_google_session skip the login flow. Each concurrently
+            running Chrome needs its own directory.
+        audio_only: Use the low-footprint audio-only profile, defaults to
+            GROQUETTE_AUDIO_ONLY. Runs headless unless GROQUETTE_HEADLESS=0.
+    """
+    if audio_only is None:
+        audio_only = is_audio_only_enabled()
 
-
-def setup_chrome_driver() -> webdriver.Chrome:
-    """Initialize Chrome driver with meeting-optimized settings."""
     opt = Options()
+    user_data_dir = user_data_dir or os.getenv("GROQUETTE_CHROME_PROFILE")
+    if user_data_dir:
+        user_data_dir = os.path.abspath(os.path.expanduser(user_data_dir))
+        os.makedirs(user_data_dir, exist_ok=True)
+        opt.add_argument(f"--user-data-dir={user_data_dir}")
+        opt.add_argument("--profile-directory=Default")
+        print(f"🗂️ Using persistent Chrome profile: {user_data_dir}")
     opt.add_argument("--disable-blink-features=AutomationControlled")
-    opt.add_argument("--start-maximized")
+    if audio_only:
+        add_audio_only_options(opt, headless=is_headless_enabled())
+    else:
+        opt.add_argument("--start-maximized")
+    if is_page_audio_enabled():
+        add_page_audio_options(opt)
     opt.add_experimental_option(
         "prefs",
         {
@@ -24,7 +69,10 @@ def setup_chrome_driver() -> webdriver.Chrome:
             "profile.default_content_setting_values.notifications": 1,
         },
     )
-    return webdriver.Chrome(options=opt)
+    driver = webdriver.Chrome(options=opt)
+    if audio_only:
+        install_audio_only_mode(driver)
+    return driver
 
 
 def focus_chrome_window(driver: webdriver.Chrome) -> None:
@@ -36,156 +84,135 @@ def focus_chrome_window(driver: webdriver.Chrome) -> None:
         print(f"Could not focus Chrome window: {e}")
 
 
-def login_to_google(driver: webdriver.Chrome, email: str, password: str) -> None:
-    """Login to Google account."""
-    driver.get(
-        "https://accounts.google.com/ServiceLogin?hl=en&passive=true&continue=https://www.google.com/&ec=GAZAAQ"
-    )
-    driver.find_element(By.ID, "identifierId").send_keys(email)
-    driver.find_element(By.ID, "identifierNext").click()
-    time.sleep(2)
-
-    driver.find_element(
-        By.XPATH, '//*[@id="password"]/div[1]/div/div[1]/input'
-    ).send_keys(password)
-    driver.find_element(By.ID, "passwordNext").click()
-    time.sleep(2)
+def has_google_session(driver: webdriver.Chrome, timeout: float = 10) -> bool:
+    """Check whether the browser profile holds a valid Google session.
 
-
-def toggle_camera(driver: webdriver.Chrome) -> None:
-    """Turn off camera."""
+    The passive sign-in URL redirects straight to its continue URL when the
+    session cookies are still valid, and shows the identifier form otherwise.
+    """
+    driver.get(GOOGLE_LOGIN_URL)
     try:
-        focus_chrome_window(driver)
-        camera_button = driver.find_element(
-            By.CSS_SELECTOR, '[role="button"][aria-label="Turn off camera"]'
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(
+            lambda d: not d.current_url.startswith("https://accounts.google.com")
+            or d.find_elements(By.ID, "identifierId")
         )
+    except TimeoutException:
+        return False
+    return not driver.current_url.startswith("https://accounts.google.com")
 
-        camera_button.click()
-    except Exception as e:
-        print(f"Could not turn off camera: {e}")
 
+def ensure_google_session(driver: webdriver.Chrome, email: str, password: str) -> None:
+    """Reuse a saved Google session, logging in only if it has expired."""
+    if has_google_session(driver):
+        print("✅ Reusing saved Google session")
+        return
 
-def turn_off_microphone(driver: webdriver.Chrome) -> None:
-    """Turn off microphone."""
-    try:
-        focus_chrome_window(driver)
-        driver.find_element(
-            By.CSS_SELECTOR, 'button[aria-label="Turn off microphone"]'
-        ).click()
-    except Exception as e:
-        print(f"Could not turn off microphone: {e}")
+    print("🔑 No valid Google session, logging in...")
+    login_to_google(driver, email, password)
 
 
-def turn_on_microphone(driver) -> None:
-    """Turn on microphone."""
-    try:
-        focus_chrome_window(driver)
-        driver.find_element(
-            By.CSS_SELECTOR, 'button[aria-label="Turn on microphone"]'
-        ).click()
-        print("🔊 Microphone turned on")
-    except Exception as e:
-        print(f"Could not turn on microphone: {e}")
+def login_to_google(driver: webdriver.Chrome, email: str, password: str) -> None:
+    """Login to Google account."""
+    # has_google_session may already have left us on the identifier form
+    if not driver.find_elements(By.ID, "identifierId"):
+        driver.get(GOOGLE_LOGIN_URL)
+    wait = WebDriverWait(driver, 15, poll_frequency=0.1)
 
+    wait.until(EC.element_to_be_clickable((By.ID, "identifierId"))).send_keys(email)
+    driver.find_element(By.ID, "identifierNext").click()
 
-def set_microphone_to_blackhole(driver: webdriver.Chrome) -> None:
-    """Set microphone input to BlackHole."""
-    try:
-        focus_chrome_window(driver)
-        mic_dropdown = driver.find_element(
-            By.CSS_SELECTOR, 'button[aria-label*="Microphone"][aria-haspopup="menu"]'
-        )
-        print(
-            f"🔍 Found microphone dropdown: {mic_dropdown.get_attribute('aria-label')}"
+    wait.until(
+        EC.element_to_be_clickable(
+            (By.XPATH, '//*[@id="password"]/div[1]/div/div[1]/input')
         )
+    ).send_keys(password)
+    driver.find_element(By.ID, "passwordNext").click()
 
-        mic_dropdown.click()
-        print("🖱️ Clicked microphone dropdown")
-
-        blackhole_option = driver.find_element(
-            By.XPATH,
-            "//span[contains(text(), 'BlackHole 2ch (Virtual)')]//ancestor::li[@role='menuitemradio']",
+    # Login is done once Google redirects away from the sign-in pages
+    try:
+        wait.until(
+            lambda d: not d.current_url.startswith("https://accounts.google.com")
         )
-        print(f"🔍 Found BlackHole option: {blackhole_option.text}")
+    except TimeoutException:
+        print("⚠️ Still on the Google sign-in page after submitting the password")
 
-        driver.execute_script("arguments[0].click();", blackhole_option)
-        print("✅ Successfully selected BlackHole input device")
 
-    except Exception as e:
-        print(f"Could not configure microphone to BlackHole: {e}")
+def toggle_camera(driver: webdriver.Chrome) -> None:
+    """Turn off camera."""
+    result = UIActuator(driver).set_camera(off=True)
+    if not result["ok"]:
+        print(f"Could not turn off camera: {result.get('error')}")
 
 
-def set_speaker_to_blackhole(driver: webdriver.Chrome) -> None:
-    """Set speaker output to BlackHole with direct index selection."""
-    try:
-        focus_chrome_window(driver)
-        print("🔍 Setting speaker to BlackHole...")
+def turn_off_microphone(driver: webdriver.Chrome) -> bool:
+    """Turn off microphone, returning whether it is now muted."""
+    result = UIActuator(driver).set_microphone(muted=True)
+    if not result["ok"]:
+        print(f"Could not turn off microphone: {result.get('error')}")
+    return bool(result["ok"])
 
-        # Open the speaker dropdown
-        speaker_dropdown = driver.find_element(
-            By.CSS_SELECTOR, 'button[aria-label*="Speaker"][aria-haspopup="menu"]'
-        )
-        current_label = speaker_dropdown.get_attribute("aria-label")
-        print(f"  Current speaker: {current_label}")
-
-        # Check if already set to BlackHole
-        if "BlackHole" in current_label:
-            print("  ✅ Speaker already set to BlackHole")
-            return
-
-        speaker_dropdown.click()
-        time.sleep(0.5)
-
-        # Find BlackHole option by looking through menu items
-        menu_items = driver.find_elements(By.CSS_SELECTOR, 'li[role="menuitemradio"]')
-        blackhole_found = False
-
-        for idx, item in enumerate(menu_items):
-            if "BlackHole" in item.text:
-                print(f"  Found BlackHole at index {idx}: {item.text}")
-                # Force click the item
-                driver.execute_script("arguments[0].click();", item)
-                print("  ✅ Clicked BlackHole option")
-                blackhole_found = True
-                break
-
-        if not blackhole_found:
-            print("  ❌ BlackHole option not found in menu")
-            # Close menu
-            driver.find_element(By.TAG_NAME, "body").click()
-            return
-
-        # Wait for change to take effect
-        time.sleep(0.5)
-
-        # Verify the selection
-        selected_label = driver.find_element(
-            By.CSS_SELECTOR, 'button[aria-label*="Speaker"][aria-haspopup="menu"]'
-        ).get_attribute("aria-label")
-
-        if "BlackHole" in selected_label:
-            print(f"  ✅ Speaker successfully set to: {selected_label}")
-        else:
-            print(f"  ⚠️ Speaker label not updated: {selected_label}")
-            print("  ⚠️ Audio may still route through BlackHole despite the label")
 
-    except Exception as e:
-        print(f"❌ Could not configure speaker to BlackHole: {e}")
-        import traceback
+def turn_on_microphone(driver: webdriver.Chrome) -> bool:
+    """Turn on microphone, returning whether it is now unmuted."""
+    result = UIActuator(driver).set_microphone(muted=False)
+    if not result["ok"]:
+        print(f"Could not turn on microphone: {result.get('error')}")
+    return bool(result["ok"])
+
 
-        traceback.print_exc()
+def set_microphone_to_blackhole(
+    driver: webdriver.Chrome, device_name: str = DEFAULT_MIC_DEVICE
+) -> None:
+    """Set microphone input to BlackHole, or another device by label."""
+    _select_audio_device(driver, "microphone", device_name)
 
 
-def start_voice_agent_process() -> Optional[subprocess.Popen[bytes]]:
-    """Start the voice agent in a separate console process."""
+def set_speaker_to_blackhole(
+    driver: webdriver.Chrome, device_name: str = DEFAULT_SPEAKER_DEVICE
+) -> None:
+    """Set speaker output to BlackHole, or another device by label."""
+    _select_audio_device(driver, "speaker", device_name)
+
+
+def _select_audio_device(driver: webdriver.Chrome, kind: str, device_name: str) -> None:
+    """Select a Meet audio device and report the outcome."""
+    result = UIActuator(driver).select_audio_device(kind, device_name)
+    if not result["ok"]:
+        print(f"❌ Could not set {kind} to {device_name}: {result.get('error')}")
+        if result.get("options"):
+            print(f"  Available: {', '.join(result['options'])}")
+    elif not result.get("changed"):
+        print(f"✅ {kind.capitalize()} already set to: {result['selected']}")
+    elif result.get("confirmed"):
+        print(f"✅ {kind.capitalize()} set to: {result['selected']}")
+    else:
+        print(f"⚠️ Selected {device_name} but the {kind} label did not update")
+
+
+def start_voice_agent_process(
+    daemon: bool = False,
+) -> Optional[subprocess.Popen[bytes]]:
+    """Start the voice agent in a separate console process.
+
+    Args:
+        daemon: Start the long-lived agent that warms up once and then waits
+            for attach requests on the agent control socket.
+    """
     try:
         print("🤖 Starting voice agent console process...")
 
         current_dir = os.path.dirname(os.path.abspath(__file__))
         agent_script = os.path.join(current_dir, "..", "ai", "voice_agent.py")
         project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+        env = dict(os.environ)
+        if daemon:
+            env["GROQUETTE_AGENT_DAEMON"] = "1"
         voice_agent_process = subprocess.Popen(
-            [sys.executable, agent_script, "console"], cwd=project_root
+            [sys.executable, agent_script, "console"],
+            cwd=project_root,
+            env=env,
+            # The daemon outlives application restarts
+            start_new_session=daemon,
         )
         print("✅ Voice agent console process started")
         return voice_agent_process
@@ -195,10 +222,167 @@ def start_voice_agent_process() -> Optional[subprocess.Popen[bytes]]:
         return None
 
 
+def start_multi_worker_process() -> Optional[subprocess.Popen[bytes]]:
+    """Start the multi-meeting voice agent worker in a separate process."""
+    try:
+        print("🤖 Starting multi-meeting voice agent worker...")
+
+        current_dir = os.path.dirname(os.path.abspath(__file__))
+        worker_script = os.path.join(current_dir, "..", "ai", "multi_worker.py")
+        project_root = os.path.abspath(os.path.join(current_dir, "..", ".."))
+        worker_process = subprocess.Popen(
+            [sys.executable, worker_script],
+            cwd=project_root,
+            start_new_session=True,
+        )
+        print("✅ Multi-meeting worker process started")
+        return worker_process
+
+    except Exception as e:
+        print(f"Failed to start multi-meeting worker: {e}")
+        return None
+
+
+def get_voice_agent_sessions() -> Optional[List[str]]:
+    """Return the meeting URLs the voice agent worker has sessions for.
+
+    Returns:
+        The meeting URLs, or None if the worker is unreachable or does not
+        report sessions (the single-meeting daemon).
+    """
+    response = IPCCommands(socket_path=AGENT_DAEMON_SOCKET).request(
+        "status", timeout=2.0
+    )
+    if not response.get("ok"):
+        return None
+    return [session["meeting_url"] for session in response["result"]["sessions"]]
+
+
+def is_voice_agent_daemon_running() -> bool:
+    """Check whether a warm voice agent daemon answers on its control socket."""
+    response = IPCCommands(socket_path=AGENT_DAEMON_SOCKET).request("ping", timeout=1.0)
+    return bool(response.get("ok"))
+
+
+def ensure_voice_agent_daemon(
+    multi_worker: bool = False,
+) -> Optional[subprocess.Popen[bytes]]:
+    """Start the voice agent daemon unless one is already running.
+
+    Args:
+        multi_worker: Need the multi-meeting worker rather than the
+            single-meeting daemon, e.g. for the page audio transport or
+            per-meeting audio devices. A running single-meeting daemon is
+            then replaced by the worker.
+
+    Returns:
+        The spawned process, or None if an existing daemon was reused.
+    """
+    if is_voice_agent_daemon_running():
+        # Only the worker reports its sessions
+        if not multi_worker or get_voice_agent_sessions() is not None:
+            print("🔥 Reusing warm voice agent")
+            return None
+        print("🔄 Replacing the single-meeting voice agent with the worker")
+        stop_voice_agent_daemon()
+        wait_for_voice_agent_daemon_stopped()
+    if multi_worker:
+        return start_multi_worker_process()
+    return start_voice_agent_process(daemon=True)
+
+
+def wait_for_voice_agent_daemon(timeout: float = 60) -> bool:
+    """Wait for a just-started voice agent daemon to finish warming up."""
+    deadline = time.monotonic() + timeout
+    while not is_voice_agent_daemon_running():
+        if time.monotonic() >= deadline:
+            print("❌ Voice agent daemon did not come up")
+            return False
+        time.sleep(0.2)
+    return True
+
+
+def wait_for_voice_agent_daemon_stopped(timeout: float = 10) -> bool:
+    """Wait until no voice agent daemon answers on the control socket."""
+    deadline = time.monotonic() + timeout
+    while is_voice_agent_daemon_running():
+        if time.monotonic() >= deadline:
+            print("⚠️ Voice agent daemon did not shut down")
+            return False
+        time.sleep(0.2)
+    return True
+
+
+def attach_voice_agent(
+    meet_url: str,
+    ipc_socket: str,
+    timeout: float = 60,
+    mic_device: Optional[str] = None,
+    speaker_device: Optional[str] = None,
+    page_audio_endpoint: Optional[str] = None,
+) -> bool:
+    """Hand a joined meeting to the voice agent daemon.
+
+    Waits for the daemon to finish warming up if it was only just started.
+
+    Args:
+        mic_device: Device Meet uses as microphone, which the agent speaks into.
+        speaker_device: Device Meet plays to, which the agent listens on.
+        page_audio_endpoint: Carry the audio through the page transport,
+            over this DevTools WebSocket URL of the meeting page, instead of
+            audio devices.
+    """
+    if not wait_for_voice_agent_daemon(timeout):
+        return False
+
+    params = {"meeting_url": meet_url, "ipc_socket": ipc_socket}
+    if mic_device:
+        params["output_device"] = mic_device
+    if speaker_device:
+        params["input_device"] = speaker_device
+    if page_audio_endpoint:
+        params["audio_transport"] = "page"
+        params["page_audio_endpoint"] = page_audio_endpoint
+    response = IPCCommands(socket_path=AGENT_DAEMON_SOCKET).request(
+        "attach", params, timeout=30
+    )
+    print(f"🤖 {response.get('result')}")
+    return bool(response.get("ok"))
+
+
+def detach_voice_agent(meet_url: Optional[str] = None) -> None:
+    """Detach the voice agent daemon from its meeting, keeping it warm.
+
+    The meeting URL picks the session to stop when a multi-meeting worker
+    hosts several meetings.
+    """
+    params = {"meeting_url": meet_url} if meet_url else None
+    IPCCommands(socket_path=AGENT_DAEMON_SOCKET).request("detach", params, timeout=5)
+
+
+def stop_voice_agent_daemon(
+    voice_agent_process: Optional[subprocess.Popen[bytes]] = None,
+) -> None:
+    """Shut the voice agent daemon down."""
+    IPCCommands(socket_path=AGENT_DAEMON_SOCKET).request("shutdown", timeout=5)
+    if voice_agent_process:
+        try:
+            voice_agent_process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            voice_agent_process.terminate()
+
+
 def leave_meeting_cleanup(
-    driver: webdriver.Chrome, voice_agent_process: Optional[subprocess.Popen[bytes]]
+    driver: webdriver.Chrome,
+    voice_agent_process: Optional[subprocess.Popen[bytes]],
+    quit_driver: bool = True,
 ) -> None:
-    """Leave meeting and cleanup resources."""
+    """Leave meeting and cleanup resources.
+
+    Args:
+        quit_driver: Quit the browser after leaving; pass False to keep it
+            running, e.g. to return it to a browser pool.
+    """
     # Stop voice agent process
     if voice_agent_process:
         try:
@@ -210,10 +394,9 @@ def leave_meeting_cleanup(
     # Leave the meeting
     if driver:
         try:
-            driver.find_element(
-                By.CSS_SELECTOR, 'button[aria-label="Leave call"]'
-            ).click()
+            driver.find_element(By.CSS_SELECTOR, SELECTORS["leave_call"]).click()
         except Exception:
             pass
 
-        driver.quit()
+        if quit_driver:
+            driver.quit()
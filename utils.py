@@ -2,10 +2,12 @@
 """Utility functions for AI Video Call Assistant."""
 
 import argparse
+import os
 import subprocess
 import sys
 from typing import Optional
 
+from src.meeting.browser_pool import BrowserPool
 from src.meeting.meet_joiner import MeetJoiner
 
 
@@ -35,20 +37,34 @@ def parse_meeting_code() -> str:
         meeting_code = args.meeting_code
 
     # Validate meeting code format
-    code_parts = meeting_code.split("-")
-    if (
-        len(code_parts) != 3
-        or len(code_parts[0]) != 3
-        or len(code_parts[1]) != 4
-        or len(code_parts[2]) != 3
-    ):
+    if not is_valid_meeting_code(meeting_code):
         print("Invalid meeting code format. Expected format: xxx-xxxx-xxx")
         sys.exit(1)
 
     return meeting_code
 
 
-def run_assistant(meeting_code: str) -> str:
+def is_valid_meeting_code(meeting_code: str) -> bool:
+    """Check that a meeting code has the xxx-xxxx-xxx format."""
+    code_parts = meeting_code.split("-")
+    return (
+        len(code_parts) == 3
+        and len(code_parts[0]) == 3
+        and len(code_parts[1]) == 4
+        and len(code_parts[2]) == 3
+    )
+
+
+def create_browser_pool() -> Optional[BrowserPool]:
+    """Start a warm browser pool if GROQUETTE_BROWSER_POOL_SIZE is set."""
+    if not os.getenv("GROQUETTE_BROWSER_POOL_SIZE"):
+        return None
+    browser_pool = BrowserPool()
+    browser_pool.start()
+    return browser_pool
+
+
+def run_assistant(meeting_code: str, browser_pool: Optional[BrowserPool] = None) -> str:
     """Run the assistant for a given meeting code."""
     # Create meeting URL
     meet_url = f"https://meet.google.com/{meeting_code}"
@@ -56,7 +72,7 @@ def run_assistant(meeting_code: str) -> str:
     print("Starting AI Video Call Assistant...")
 
     # Initialize meeting joiner
-    joiner = MeetJoiner(meet_url)
+    joiner = MeetJoiner(meet_url, browser_pool=browser_pool)
 
     try:
         # Join the meeting
@@ -79,7 +95,7 @@ def run_assistant(meeting_code: str) -> str:
 
                 elif user_input == "q" or user_input == "quit":
                     print("Exiting...")
-                    joiner.leave_meeting()
+                    joiner.leave_meeting(stop_agent=True)
                     return "quit"
 
                 else:
@@ -89,16 +105,16 @@ def run_assistant(meeting_code: str) -> str:
                         )
 
             except EOFError:
-                joiner.leave_meeting()
+                joiner.leave_meeting(stop_agent=True)
                 return "quit"
 
     except KeyboardInterrupt:
         print("\nLeaving meeting...")
-        joiner.leave_meeting()
+        joiner.leave_meeting(stop_agent=True)
         return "quit"
     except Exception as e:
         print(f"Error: {e}")
-        joiner.leave_meeting()
+        joiner.leave_meeting(stop_agent=True)
         return "quit"
 
 